@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import argparse
+import itertools
+import datetime
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+import indicators
+import price_cache
+import scoring
+from storage import atomic_write_json
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+WATCHLIST_FILE = os.path.join(DATA_DIR, "watchlist.json")
+BACKTEST_RESULTS_FILE = os.path.join(DATA_DIR, "backtest_results.json")
+
+TRADING_DAYS = 252
+
+# The live scanner's rules. Sentiment and fundamentals have no point-in-time
+# history, so they are replayed as constants (neutral by default).
+DEFAULT_PARAMS = {
+    "rsi_buy": 30.0, "rsi_sell": 70.0,
+    "weights": dict(scoring.WEIGHTS),
+    "buy_score": scoring.BUY_SCORE, "sell_score": scoring.SELL_SCORE,
+    "high_priority_only": True,
+    "allocation": scoring.ALLOCATION, "min_allocation": scoring.MIN_ALLOCATION,
+    "stop_loss": scoring.STOP_LOSS, "take_profit": scoring.TAKE_PROFIT,
+    "sentiment_bias": 0.0, "fundamental_score": 50.0,
+    "starting_cash": scoring.STARTING_CASH,
+}
+
+def load_local_history(symbols, start=None, csv_dir=None, db_path=price_cache.PRICE_DB_FILE):
+    """{symbol: OHLCV frame} from the local price store, or from <csv_dir>/<SYMBOL>.csv. Never touches the network."""
+    frames = {}
+    conn = None if csv_dir else price_cache.connect(db_path)
+    try:
+        for sym in symbols:
+            if csv_dir:
+                path = os.path.join(csv_dir, f"{sym}.csv")
+                if not os.path.exists(path): continue
+                df = pd.read_csv(path, index_col=0, parse_dates=True)
+                if start: df = df[df.index >= pd.Timestamp(start)]
+            else:
+                df = price_cache.read_bars(conn, sym, start)
+            if len(df): frames[sym] = df
+    finally:
+        if conn: conn.close()
+    return frames
+
+def prepare(frames):
+    """Aligned close panel plus every indicator, computed once and shared by all parameter sets."""
+    dates, symbols, close = indicators.build_panel(frames)
+    out, _ = indicators.compute(close)
+    return {"dates": np.asarray(dates.strftime("%Y-%m-%d")), "symbols": symbols, "close": close,
+            "rsi": out["rsi"], "macd": out["macd"], "macd_signal": out["macd_signal"]}
+
+def simulate(data, params=None):
+    """Replays the scanner's scoring and paper-trading rules over the whole panel.
+
+    Scores, actions and exit conditions are computed for every date x symbol
+    at once; only the cash-constrained buy sequence on each day is walked in
+    order, as run_pipeline does.
+    """
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    close = data["close"]
+    T, N = close.shape
+    t_score = scoring.technical_score(data["rsi"], data["macd"], data["macd_signal"], p["rsi_buy"], p["rsi_sell"])
+    score = scoring.master_score(t_score, p["sentiment_bias"], p["fundamental_score"], p["weights"])
+    score = np.where(np.isnan(data["rsi"]), np.nan, score)  # No signal until indicators have warmed up
+    action = scoring.action_code(score, p["buy_score"], p["sell_score"])
+    buy = action == 1
+    if p["high_priority_only"]: buy &= scoring.priority_code(score) == 2
+    sell = action == -1
+    valid = ~np.isnan(close)
+    mark = pd.DataFrame(close).ffill().to_numpy()
+
+    cash = p["starting_cash"]
+    qty = np.zeros(N, dtype=np.int64)
+    avg = np.zeros(N)
+    equity = np.empty(T)
+    traded_value = 0.0
+    profits = []
+    n_buys = 0
+
+    for t in range(T):
+        px = close[t]
+        held = qty > 0
+        with np.errstate(invalid="ignore"):
+            exit_ = held & valid[t] & (sell[t] | (px < avg * p["stop_loss"]) | (px > avg * p["take_profit"]))
+        if exit_.any():
+            proceeds = qty[exit_] * px[exit_]
+            cash += proceeds.sum()
+            traded_value += proceeds.sum()
+            profits.extend((proceeds - qty[exit_] * avg[exit_]).tolist())
+            qty[exit_] = 0
+            avg[exit_] = 0.0
+        for j in np.nonzero(buy[t] & valid[t] & (qty == 0))[0]:
+            alloc = cash * p["allocation"]
+            if alloc <= p["min_allocation"]: break
+            q = int(alloc / px[j])
+            if q > 0:
+                cash -= q * px[j]
+                traded_value += q * px[j]
+                qty[j], avg[j] = q, px[j]
+                n_buys += 1
+        equity[t] = cash + np.nansum(qty * mark[t])
+
+    return {"params": p, "equity": equity, "profits": np.asarray(profits), "buys": n_buys,
+            "traded_value": traded_value, "open_positions": int((qty > 0).sum())}
+
+def summarize(data, sim):
+    equity = sim["equity"]
+    if not len(equity): return {"params": sim["params"], "error": "no data"}
+    start_cash = sim["params"]["starting_cash"]
+    peak = np.maximum.accumulate(equity)
+    years = max(len(equity) / TRADING_DAYS, 1e-9)
+    profits = sim["profits"]
+    return {
+        "params": sim["params"],
+        "start": str(data["dates"][0]), "end": str(data["dates"][-1]),
+        "final_value": round(float(equity[-1]), 2),
+        "total_return_pct": round(float(equity[-1] / start_cash - 1) * 100, 2),
+        "cagr_pct": round(float((equity[-1] / start_cash) ** (1 / years) - 1) * 100, 2),
+        "max_drawdown_pct": round(float(((equity - peak) / peak).min()) * 100, 2),
+        "closed_trades": int(len(profits)),
+        "hit_rate_pct": round(float((profits > 0).mean()) * 100, 2) if len(profits) else None,
+        "buys": sim["buys"],
+        "open_positions": sim["open_positions"],
+        "annual_turnover": round(float(sim["traded_value"] / equity.mean() / years), 2),
+    }
+
+def run_backtest(data, params=None):
+    sim = simulate(data, params)
+    summary = summarize(data, sim)
+    summary["equity_curve"] = [round(float(v), 2) for v in sim["equity"]]
+    return summary
+
+# --- Parameter sweeps ---
+
+_worker_data = None
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+def _sweep_one(params):
+    return summarize(_worker_data, simulate(_worker_data, params))
+
+def expand_grid(grid):
+    """{"rsi_buy": [25, 30], "stop_loss": [0.9, 0.95]} -> list of param dicts (cartesian product)."""
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+def sweep(data, grid, workers=None):
+    """Runs every combination of grid across a process pool. Results are sorted by total return."""
+    combos = expand_grid(grid)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+        results = list(pool.map(_sweep_one, combos, chunksize=max(1, len(combos) // (4 * (workers or os.cpu_count() or 1)))))
+    return sorted(results, key=lambda r: r.get("total_return_pct", float("-inf")), reverse=True)
+
+DEFAULT_GRID = {
+    "rsi_buy": [25.0, 30.0, 35.0],
+    "rsi_sell": [65.0, 70.0, 75.0],
+    "stop_loss": [0.90, 0.95],
+    "take_profit": [1.10, 1.15, 1.25],
+}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline walk-through of the scanner's scoring and paper-trading rules.")
+    ap.add_argument("symbols", nargs="*", help="defaults to data/watchlist.json")
+    ap.add_argument("--start", help="first date (YYYY-MM-DD)")
+    ap.add_argument("--csv-dir", help="read <SYMBOL>.csv files instead of the local price store")
+    ap.add_argument("--backfill", type=float, metavar="YEARS", help="first fetch up to YEARS of older bars into the price store")
+    ap.add_argument("--sweep", action="store_true", help="run DEFAULT_GRID (or --grid) across CPU cores")
+    ap.add_argument("--grid", help="JSON file with a parameter grid")
+    ap.add_argument("--fundamental-score", type=float, default=DEFAULT_PARAMS["fundamental_score"],
+                    help="constant fundamental score replayed for every symbol (no point-in-time fundamentals)")
+    ap.add_argument("--sentiment-bias", type=float, default=DEFAULT_PARAMS["sentiment_bias"],
+                    help="constant news bias in [-15, 15]")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--out", default=BACKTEST_RESULTS_FILE)
+    args = ap.parse_args(argv)
+
+    symbols = args.symbols
+    if not symbols:
+        with open(WATCHLIST_FILE, "r") as f:
+            symbols = json.load(f)
+    if args.backfill:
+        for sym in symbols:
+            try:
+                n = price_cache.backfill(sym, int(args.backfill * 365))
+                print(f"[*] {sym}: {n} older bars added", file=sys.stderr)
+            except Exception as e:
+                print(f"[!] Backfill failed for {sym}: {e}", file=sys.stderr)
+    frames = load_local_history(symbols, args.start, args.csv_dir)
+    if not frames:
+        print("[!] No local price history found. Run a scan first to fill the price store.", file=sys.stderr)
+        return 1
+    data = prepare(frames)
+    fixed = {"fundamental_score": args.fundamental_score, "sentiment_bias": args.sentiment_bias}
+    print(f"[*] {len(data['symbols'])} symbols x {len(data['dates'])} days", file=sys.stderr)
+
+    if args.sweep or args.grid:
+        grid = DEFAULT_GRID
+        if args.grid:
+            with open(args.grid, "r") as f:
+                grid = json.load(f)
+        results = sweep(data, {**{k: [v] for k, v in fixed.items()}, **grid}, args.workers)
+        report = {"generated": datetime.datetime.now().isoformat(), "symbols": data["symbols"], "sweep": results}
+        for r in results[:5]:
+            print(f"{r['total_return_pct']:>8}%  dd {r['max_drawdown_pct']:>7}%  hit {r['hit_rate_pct']}%  "
+                  + json.dumps({k: r["params"][k] for k in grid}))
+    else:
+        result = run_backtest(data, fixed)
+        report = {"generated": datetime.datetime.now().isoformat(), "symbols": data["symbols"], "backtest": result}
+        print(json.dumps({k: v for k, v in result.items() if k not in ("equity_curve", "params")}, indent=2))
+    atomic_write_json(report, args.out)
+    print(f"[*] Results saved to {args.out}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+import statistics
+import numpy as np
+import pandas as pd
+import data_provider
+from storage import atomic_write_json
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+BASELINE_FILE = os.path.join(DATA_DIR, "benchmark_baseline.json")
+BENCHMARK_RESULTS_FILE = os.path.join(DATA_DIR, "benchmark_results.json")
+
+SIZES = [10, 100, 1000]     # Watchlist sizes for the full-pipeline runs
+SAMPLE = 20                 # Extra symbols timed call by call (kept out of the watchlist so they start cold)
+HISTORY_BARS = 400          # Synthetic daily bars per symbol
+TOLERANCE = 1.25            # A metric regresses when it is this much slower than the baseline...
+MIN_DELTA_MS = 5.0          # ...and at least this many milliseconds slower
+SIZE_TIMEOUT = 1800         # Seconds one size may take
+
+# --- Synthetic fixtures ---
+
+_WORDS = ["surge", "gain", "profit", "growth", "record", "bullish", "strong", "upgrade",
+          "fall", "loss", "decline", "weak", "bearish", "downgrade", "crash", "concern",
+          "market", "shares", "investors", "quarter", "index", "sector", "outlook", "demand"]
+
+def synthetic_symbols(n, prefix="SYN"):
+    return [f"{prefix}{i:04d}.NS" for i in range(n)]
+
+def write_synthetic(root, symbols, bars=HISTORY_BARS, seed=7):
+    """Deterministic history/info/nse_eq fixtures for symbols, plus news for every sentiment topic."""
+    import sentiment_engine
+    store = data_provider.FixtureStore(root)
+    end = pd.Timestamp(datetime.date.today())
+    dates = pd.bdate_range(end=end, periods=bars)
+    for sym in symbols:
+        rng = np.random.default_rng(zlib.crc32(sym.encode()) ^ seed)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, bars)))
+        spread = close * rng.uniform(0.002, 0.02, bars)
+        df = pd.DataFrame({"Open": close * (1 + rng.normal(0, 0.005, bars)), "High": close + spread,
+                           "Low": close - spread, "Close": close, "Volume": rng.integers(1e4, 1e7, bars)},
+                          index=pd.DatetimeIndex(dates, name="Date"))
+        store.write_history(sym, df)
+        store.write_json("info", sym, {"shortName": f"Synthetic {sym.split('.')[0]}",
+                                       "forwardPE": round(float(rng.uniform(5, 60)), 2),
+                                       "returnOnEquity": round(float(rng.uniform(-0.05, 0.35)), 4),
+                                       "debtToEquity": round(float(rng.uniform(0, 300)), 2),
+                                       "dividendYield": round(float(rng.uniform(0, 0.05)), 4)})
+        store.write_json("nse_eq", sym.replace(".NS", ""), {"metadata": {"pdSectorPe": round(float(rng.uniform(10, 40)), 2)}})
+    rng = np.random.default_rng(seed)
+    for cat, query in sentiment_engine.TOPICS.items():
+        items = [{"title": " ".join(rng.choice(_WORDS, 8)) + f" for Synthetic {rng.choice(symbols).split('.')[0]}", "snippet": " ".join(rng.choice(_WORDS, 30)),
+                  "source": "synthetic", "date": end.isoformat(), "url": f"https://example.invalid/{cat}/{i}"}
+                 for i in range(10)]
+        store.write_json("news", data_provider.news_key(query), {"query": query, "items": items})
+
+# --- One size, run in its own process against its own data directory ---
+
+def _per_call(fn, args_list):
+    times = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append((time.perf_counter() - t0) * 1000)
+    return round(statistics.median(times), 3)
+
+def run_size(n):
+    """Times the scanner against replayed synthetic data. Expects ORACLE_DATA_DIR/ORACLE_DATA_MODE set by the parent."""
+    watch, sample = synthetic_symbols(n), synthetic_symbols(SAMPLE, prefix="SMP")
+    write_synthetic(data_provider.FIXTURE_DIR, watch + sample)
+    t0 = time.perf_counter()
+    import market_scanner
+    timings = {"import_ms": round((time.perf_counter() - t0) * 1000, 3)}
+    market_scanner.save_json(watch, market_scanner.WATCHLIST_FILE)
+
+    t0 = time.perf_counter()
+    news = market_scanner.sentiment_engine.run_sentiment_pipeline()
+    timings["news_sync_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    timings["news_sentiment_cold_ms"] = _per_call(market_scanner.get_symbol_sentiment, [(watch, news)])
+    timings["news_sentiment_warm_ms"] = _per_call(market_scanner.get_symbol_sentiment, [(watch, news)] * 5)
+
+    calls = [(s,) for s in sample]
+    timings["fundamental_score_cold_ms"] = _per_call(market_scanner.get_fundamental_score, calls)
+    timings["fundamental_score_warm_ms"] = _per_call(market_scanner.get_fundamental_score, calls)
+    calls = [(s, 30.0, 70.0, 0, True) for s in sample]
+    timings["analyze_ticker_cold_ms"] = _per_call(market_scanner.analyze_ticker, calls)
+    timings["analyze_ticker_warm_ms"] = _per_call(market_scanner.analyze_ticker, calls)
+
+    for label in ("cold", "warm"):
+        t0 = time.perf_counter()
+        scan = market_scanner.run_pipeline()
+        timings[f"pipeline_{label}_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    timings["pipeline_scored"] = len(scan)
+
+    import dashboard_data
+    timings["dashboard_load_cold_ms"] = _per_call(dashboard_data.load, [()])
+    timings["dashboard_load_ms"] = _per_call(dashboard_data.load, [()] * 5)
+    timings["dashboard_trades_ms"] = _per_call(dashboard_data.trades_page, [()] * 5)
+    timings["dashboard_chart_cold_ms"] = _per_call(dashboard_data.price_chart, [(s,) for s in watch[:5]])
+    timings["dashboard_history_ms"] = _per_call(dashboard_data.snapshots.history, [(s,) for s in watch[:5]])
+    return timings
+
+def run(sizes=SIZES, keep=False):
+    results = {"date": datetime.datetime.now().isoformat(), "python": platform.python_version(),
+               "machine": platform.machine(), "sample": SAMPLE, "sizes": {}}
+    for n in sizes:
+        tmp = tempfile.mkdtemp(prefix=f"oracle-bench-{n}-")
+        env = dict(os.environ, ORACLE_DATA_DIR=tmp, ORACLE_DATA_MODE="replay",
+                   ORACLE_FIXTURES=os.path.join(tmp, "fixtures"))
+        print(f"[*] Benchmarking {n} symbols in {tmp}", file=sys.stderr)
+        try:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", str(n)], env=env,
+                                  cwd=SCRIPT_DIR, capture_output=True, text=True, timeout=SIZE_TIMEOUT)
+            if proc.returncode != 0:
+                results["sizes"][str(n)] = {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+            else:
+                results["sizes"][str(n)] = json.loads(proc.stdout.strip().splitlines()[-1])
+        except subprocess.TimeoutExpired:
+            results["sizes"][str(n)] = {"error": f"timed out after {SIZE_TIMEOUT}s"}
+        finally:
+            if not keep: shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+def compare(results, baseline, tolerance=TOLERANCE, min_delta=MIN_DELTA_MS):
+    """Metrics (*_ms) slower than the baseline by both the ratio and the absolute margin."""
+    regressions = []
+    for size, timings in results.get("sizes", {}).items():
+        base = baseline.get("sizes", {}).get(size, {})
+        for key, value in timings.items():
+            old = base.get(key)
+            if not key.endswith("_ms") or not isinstance(old, (int, float)) or not isinstance(value, (int, float)): continue
+            if value > old * tolerance and value - old > min_delta:
+                regressions.append({"size": int(size), "metric": key, "baseline_ms": old, "current_ms": value,
+                                    "ratio": round(value / old, 2) if old else None})
+    return regressions
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Time the scanner against replayed synthetic data and compare with a baseline.")
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated watchlist sizes")
+    ap.add_argument("--save-baseline", action="store_true", help=f"store this run as {BASELINE_FILE}")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE)
+    ap.add_argument("--keep", action="store_true", help="keep the per-size data directories")
+    ap.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.worker is not None:
+        timings = run_size(args.worker)
+        sys.stdout.write(json.dumps(timings) + "\n")
+        sys.stdout.flush()
+        os._exit(0)  # Skip waiting on background fundamentals refreshes
+
+    results = run([int(s) for s in args.sizes.split(",") if s.strip()], keep=args.keep)
+    try:
+        with open(BASELINE_FILE, "r") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = None
+    results["regressions"] = compare(results, baseline, args.tolerance) if baseline else []
+    atomic_write_json(results, BENCHMARK_RESULTS_FILE)
+    if args.save_baseline:
+        atomic_write_json(results, BASELINE_FILE)
+        print(f"[*] Baseline saved to {BASELINE_FILE}", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+    if results["regressions"]:
+        print(f"[!] {len(results['regressions'])} metric(s) regressed against {BASELINE_FILE}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,200 @@
+import os
+import json
+import argparse
+import datetime
+import itertools
+import numpy as np
+import price_cache
+import scoring
+import storage
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+PREDICTION_LOG_FILE = os.path.join(DATA_DIR, "prediction_log.json")
+
+HORIZON = 5             # Trading days between a prediction and the bar it is judged against
+FOLDS = 4               # Walk-forward folds (by prediction date)
+MIN_SAMPLES = 50        # Evaluated predictions needed before parameters are changed
+MIN_SIGNALS = 10        # BUY/SELL calls a parameter set must produce to be considered
+GRID_CELLS = 4_000_000  # Parameter sets x predictions scored per array block in search()
+
+GRID = {
+    "rsi_buy": [20.0, 25.0, 30.0, 35.0, 40.0],
+    "rsi_sell": [60.0, 65.0, 70.0, 75.0, 80.0],
+    "technical": [0.3, 0.4, 0.5, 0.6],
+    "sentiment": [0.1, 0.2, 0.3],
+}
+
+# --- Realized outcomes ---
+
+def update_outcomes(horizon=HORIZON, db_path=storage.ORACLE_DB_FILE, price_db=price_cache.PRICE_DB_FILE):
+    """Computes forward returns for predictions that do not have one yet, from local prices only.
+
+    Predictions whose horizon has not elapsed stay pending and are retried on
+    the next call, so a nightly run only touches new predictions.
+    """
+    pending = storage.pending_outcomes(horizon, db_path)
+    by_symbol = {}
+    for p in pending: by_symbol.setdefault(p["symbol"], []).append(p)
+    outcomes = []
+    conn = price_cache.connect(price_db)
+    try:
+        for sym, preds in by_symbol.items():
+            bars = price_cache.read_bars(conn, sym)
+            if bars.empty: continue
+            bar_days = bars.index.strftime("%Y-%m-%d").to_numpy()
+            close = bars["Close"].to_numpy(dtype=float)
+            days = np.array([p["date"][:10] for p in preds])
+            exit_idx = np.searchsorted(bar_days, days, side="right") + horizon - 1
+            ok = exit_idx < len(close)
+            entry = np.array([p["price"] for p in preds], dtype=float)
+            fwd = np.where(ok, close[np.minimum(exit_idx, len(close) - 1)] / entry - 1, np.nan)
+            outcomes += [(p["id"], r) for p, r in zip(preds, fwd) if np.isfinite(r)]
+    finally:
+        conn.close()
+    storage.save_outcomes(outcomes, horizon, db_path)
+    return len(outcomes), len(pending) - len(outcomes)
+
+def _features(record, run_bias):
+    """(rsi, macd_bullish, sentiment_bias, fundamental) for one stored prediction, or None."""
+    comp = record.get("components")
+    f = (record.get("fundamentals") or {}).get("score")
+    rsi, score = record.get("rsi"), record.get("score")
+    if comp:
+        return rsi, comp["macd_bullish"], comp["sentiment_bias"], comp["fundamental"]
+    if None in (rsi, score, f, run_bias): return None
+    # Records written before components were stored used the fixed 0.4/0.3/0.3 weights, so the
+    # technical score (and from it the MACD term, always +/-10) can be recovered exactly.
+    t = (score - float(scoring.sentiment_score(run_bias)) * 0.3 - f * 0.3) / 0.4
+    return rsi, round(t - 50) in (35, 10, -15), run_bias, f
+
+def load_dataset(horizon=HORIZON, db_path=storage.ORACLE_DB_FILE):
+    rows = []
+    for record, run_bias, fwd in storage.load_outcomes(horizon, db_path):
+        feat = _features(record, run_bias)
+        if feat: rows.append((record.get("timestamp", "")[:10], *feat, fwd))
+    if not rows: return None
+    cols = list(zip(*rows))
+    return {"date": np.array(cols[0]), "rsi": np.array(cols[1], dtype=float), "macd_bullish": np.array(cols[2], dtype=bool),
+            "bias": np.array(cols[3], dtype=float), "fundamental": np.array(cols[4], dtype=float), "fwd": np.array(cols[5], dtype=float)}
+
+# --- Search ---
+
+def expand_grid(grid=GRID):
+    combos = []
+    for rb, rs, wt, ws in itertools.product(grid["rsi_buy"], grid["rsi_sell"], grid["technical"], grid["sentiment"]):
+        wf = round(1.0 - wt - ws, 4)
+        if rb < rs and wf >= 0.1:
+            combos.append({"rsi_buy": rb, "rsi_sell": rs, "weights": {"technical": wt, "sentiment": ws, "fundamental": wf}})
+    return combos
+
+def evaluate(data, params, mask=None):
+    """Directional accuracy of BUY/SELL calls: a BUY is right if the price rose over the horizon, a SELL if it fell."""
+    d = data if mask is None else {k: v[mask] for k, v in data.items()}
+    # macd_bullish (0/1) against 0.5 reproduces the "macd > signal" test of the live scorer
+    t = scoring.technical_score(d["rsi"], d["macd_bullish"].astype(float), 0.5, params["rsi_buy"], params["rsi_sell"])
+    act = scoring.action_code(scoring.master_score(t, d["bias"], d["fundamental"], params["weights"]))
+    calls = act != 0
+    n = int(calls.sum())
+    if n == 0: return {"accuracy": None, "signals": 0, "mean_return_pct": None}
+    signed = d["fwd"][calls] * act[calls]
+    return {"accuracy": round(float((signed > 0).mean()) * 100, 2), "signals": n,
+            "mean_return_pct": round(float(signed.mean()) * 100, 3)}
+
+def _rank_key(res):
+    if res["signals"] < MIN_SIGNALS or res["accuracy"] is None: return (-1.0, -1e9)
+    return (res["accuracy"], res["mean_return_pct"])
+
+def evaluate_grid(data, combos, mask=None):
+    """evaluate() for every parameter set at once: one (sets x predictions) array per block."""
+    d = data if mask is None else {k: v[mask] for k, v in data.items()}
+    results = []
+    step = max(1, GRID_CELLS // max(1, len(d["fwd"])))
+    for i in range(0, len(combos), step):
+        block = combos[i:i + step]
+        col = lambda f: np.array([f(c) for c in block], dtype=float)[:, None]
+        t = scoring.technical_score(d["rsi"], d["macd_bullish"].astype(float), 0.5,
+                                    col(lambda c: c["rsi_buy"]), col(lambda c: c["rsi_sell"]))
+        weights = {k: col(lambda c: c["weights"][k]) for k in ("technical", "sentiment", "fundamental")}
+        act = scoring.action_code(scoring.master_score(t, d["bias"], d["fundamental"], weights))
+        signed = d["fwd"] * act
+        n = (act != 0).sum(axis=1)
+        hits = (signed > 0).sum(axis=1)
+        total = signed.sum(axis=1)
+        for k in range(len(block)):
+            if n[k] == 0:
+                results.append({"accuracy": None, "signals": 0, "mean_return_pct": None})
+            else:
+                results.append({"accuracy": round(float(hits[k] / n[k]) * 100, 2), "signals": int(n[k]),
+                                "mean_return_pct": round(float(total[k] / n[k]) * 100, 3)})
+    return results
+
+def search(data, combos, mask=None):
+    """Best parameter set on the rows selected by mask."""
+    return max(zip(combos, evaluate_grid(data, combos, mask)), key=lambda x: _rank_key(x[1]))
+
+def walk_forward(data, combos, folds=FOLDS):
+    """Expanding-window validation: pick parameters on earlier dates, score them on the next block."""
+    days = np.unique(data["date"])
+    edges = [days[int(len(days) * k / folds)] for k in range(1, folds)]
+    hits = calls = 0
+    for i, edge in enumerate(edges):
+        train = data["date"] < edge
+        test = (data["date"] >= edge) & (data["date"] < (edges[i + 1] if i + 1 < len(edges) else "9999"))
+        if not train.any() or not test.any(): continue
+        params, _ = search(data, combos, train)
+        res = evaluate(data, params, test)
+        if res["signals"]:
+            hits += res["accuracy"] / 100 * res["signals"]
+            calls += res["signals"]
+    return round(hits / calls * 100, 2) if calls else None, calls
+
+def calibrate(horizon=HORIZON, dry_run=False, db_path=storage.ORACLE_DB_FILE, pred_log_file=PREDICTION_LOG_FILE):
+    """Updates outcomes, searches thresholds and weights, and writes the winner to prediction_log.json.
+
+    accuracy_score is the pooled out-of-sample hit rate from walk-forward
+    validation, not the in-sample figure of the chosen parameters.
+    """
+    added, waiting = update_outcomes(horizon, db_path)
+    data = load_dataset(horizon, db_path)
+    n = 0 if data is None else len(data["fwd"])
+    report = {"horizon": horizon, "samples": n, "new_outcomes": added, "pending": waiting}
+    if n < MIN_SAMPLES:
+        report["status"] = f"waiting for data ({n}/{MIN_SAMPLES} evaluated predictions)"
+        return report
+
+    combos = expand_grid()
+    oos_accuracy, oos_signals = walk_forward(data, combos)
+    params, in_sample = search(data, combos)
+
+    report.update({"status": "ok", "params": params, "in_sample": in_sample,
+                   "oos_accuracy": oos_accuracy, "oos_signals": oos_signals})
+    if in_sample["signals"] < MIN_SIGNALS or oos_accuracy is None:
+        report["status"] = "no parameter set produced enough signals; prediction log unchanged"
+        return report
+    if not dry_run:
+        try:
+            with open(pred_log_file, "r") as f:
+                pred_log = json.load(f)
+        except (OSError, ValueError):
+            pred_log = {}
+        pred_log.update({
+            "last_updated": datetime.datetime.now().isoformat(),
+            "buy_rsi_threshold": params["rsi_buy"],
+            "sell_rsi_threshold": params["rsi_sell"],
+            "weights": params["weights"],
+            "accuracy_score": oos_accuracy,
+            "calibration": {"horizon": horizon, "samples": n, "folds": FOLDS, "oos_signals": oos_signals,
+                            "in_sample_accuracy": in_sample["accuracy"], "in_sample_mean_return_pct": in_sample["mean_return_pct"]},
+        })
+        storage.atomic_write_json(pred_log, pred_log_file)
+    return report
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Re-fit RSI thresholds and score weights against realized returns.")
+    ap.add_argument("--horizon", type=int, default=HORIZON)
+    ap.add_argument("--dry-run", action="store_true", help="report without updating prediction_log.json")
+    args = ap.parse_args()
+    print(json.dumps(calibrate(args.horizon, args.dry_run), indent=2))
@@ -5,42 +5,86 @@ import os
 import datetime
 import plotly.express as px
 import sys
+import re
+import time
+import subprocess
+import scanner_service
+import storage
+import metrics
+import dashboard_data
 
 st.set_page_config(page_title="Lyra Market Oracle", layout="wide")
 
 # --- Configuration (Relative Paths) ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(SCRIPT_DIR)
-DATA_DIR = os.path.join(BASE_DIR, "data")
-SCAN_FILE = os.path.join(DATA_DIR, "scan_results.json")
-PORTFOLIO_FILE = os.path.join(DATA_DIR, "portfolio.json")
-PRED_LOG_FILE = os.path.join(DATA_DIR, "prediction_log.json")
-NEWS_FILE = os.path.join(DATA_DIR, "latest_news.json")
-WATCHLIST_FILE = os.path.join(DATA_DIR, "watchlist.json")
-
-def load_json(path, default=None):
-    if os.path.exists(path):
-        try:
-            with open(path, "r") as f:
-                return json.load(f)
-        except: return default
-    return default
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+WATCHLIST_FILE = dashboard_data.WATCHLIST_FILE
 
 def save_json(data, path):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    storage.atomic_write_json(data, path)
+
+def trigger_sync(python_exe, scanner_script):
+    """Runs a full sync on the scanner service with a progress bar; falls back to a one-off scanner process."""
+    if scanner_service.start_background(python_exe):
+        try:
+            job = scanner_service.submit_sync()
+            bar = st.progress(0.0, text="Queued...")
+            while job["status"] in ("queued", "running"):
+                time.sleep(0.5)
+                job = scanner_service.job_status(job["id"])
+                p = job["progress"]
+                bar.progress(min(1.0, p["done"] / p["total"]) if p["total"] else 0.0,
+                             text=f"{(p['stage'] or 'queued').title()}: {p['done']}/{p['total']}")
+            if job["status"] == "failed":
+                st.error(f"Sync failed: {job['error']}")
+                return False
+            return True
+        except scanner_service.ServiceError as e:
+            st.warning(f"Scanner service error ({e}); running a one-off sync instead. Service log: {scanner_service.SERVICE_LOG_FILE}")
+    else:
+        st.warning(f"Scanner service did not start; running a one-off sync instead. Service log: {scanner_service.SERVICE_LOG_FILE}")
+    os.system(f'"{python_exe}" "{scanner_script}"')
+    return True
+
+def run_custom_analysis(python_exe, scanner_script, ticker):
+    """Returns (results, errors, raw_output) from the scanner service, or a one-off scanner process if it is down."""
+    if scanner_service.start_background(python_exe):
+        try:
+            resp = scanner_service.analyze([ticker])
+            return resp["results"], resp["errors"], None
+        except scanner_service.ServiceError as e:
+            st.warning(f"Scanner service error ({e}); running a one-off scan instead. Service log: {scanner_service.SERVICE_LOG_FILE}")
+    else:
+        st.warning(f"Scanner service did not start; running a one-off scan instead. Service log: {scanner_service.SERVICE_LOG_FILE}")
+    result = subprocess.run([python_exe, scanner_script, ticker], capture_output=True, text=True)
+    # Extract JSON block using regex if there's surrounding text
+    raw_out = result.stdout.strip()
+    json_match = re.search(r'\[.*\]', raw_out, re.DOTALL)
+    try:
+        return json.loads(json_match.group() if json_match else raw_out), {}, None
+    except ValueError:
+        return [], {ticker: "could not parse scanner output"}, (result.stdout, result.stderr)
 
 def main():
     st.title("🌌 Lyra Market Oracle: Integrated Wealth Intelligence")
     st.caption("Technical Analysis + Global News Sentiment + Fundamental Health")
+
+    # Written atomically by market_pulse.py (--stream keeps it current during the session)
+    data = dashboard_data.load()
+    pulse = data["pulse"]
+    if pulse and pulse.get("data"):
+        cols = st.columns(len(pulse["data"]))
+        for col, (name, d) in zip(cols, pulse["data"].items()):
+            if "price" in d:
+                col.metric(name, d["price"], f"{d['change_pct']}%")
+            else:
+                col.metric(name, "N/A")
+        st.caption(f"Market {pulse.get('market_status', '?')} · pulse at {pulse.get('timestamp', '')[:19]}")
     
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📡 Daily Scanner", "💼 Portfolio & Trades", "🧠 Model Evolution", "📰 Current Affairs", "🔍 Custom Analysis"])
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["📡 Daily Scanner", "💼 Portfolio & Trades", "🧠 Model Evolution", "📰 Current Affairs", "🔍 Custom Analysis", "⏱️ Performance", "🕰️ Time Travel"])
     
-    scan_data = load_json(SCAN_FILE)
-    portfolio = load_json(PORTFOLIO_FILE)
-    pred_log = load_json(PRED_LOG_FILE)
-    news_data = load_json(NEWS_FILE)
-    watchlist = load_json(WATCHLIST_FILE, ["RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "SBIN.NS", "MCX.NS", "SILVERBEES.NS", "BSE.NS"])
+    portfolio, pred_log, news_data, watchlist = data["portfolio"], data["pred_log"], data["news"], data["watchlist"]
 
     # Use the local venv from the submodule
     python_exe = os.path.join(BASE_DIR, "venv/bin/python3")
@@ -51,8 +95,8 @@ def main():
 
     # --- TAB 1: SCANNER ---
     with tab1:
-        if scan_data:
-            df = pd.DataFrame(scan_data)
+        df = data["scan_df"]
+        if not df.empty:
             st.subheader("🎯 High-Probability Targets")
             
             buys = df[df['action'] == 'BUY'].sort_values('score', ascending=False)
@@ -72,25 +116,42 @@ def main():
                         st.write(f"**{row['symbol']}** | Score: {row['score']} | RSI: {row['rsi']}")
                 else: st.write("No urgent sell signals.")
                 
+            feed = dashboard_data.recent_changes()
+            if feed:
+                st.subheader("🔔 Signal Changes")
+                rows = [{"time": e["time"], "symbol": c["symbol"], "from": " / ".join(c.get("from", ["-"])),
+                         "to": " / ".join(c.get("to", ["-"])), "score": c.get("score"), "price": c.get("price")}
+                        for e in feed for c in e["changes"]]
+                last = feed[0]
+                st.caption(f"Scheduler cycle {last['seq']} at {last['time']}: re-scored {last['rescored']} "
+                           f"({', '.join(f'{k} {v}' for k, v in last['reasons'].items())}), reused {last['reused']}.")
+                if rows: st.dataframe(pd.DataFrame(rows), width="stretch", hide_index=True)
+
             st.divider()
             st.subheader("📊 Market Overview (Technical + Fundamental)")
-            # Flatten fundamentals for dataframe
-            display_df = df.copy()
-            display_df['PE'] = display_df['fundamentals'].apply(lambda x: x.get('pe'))
-            display_df['ROE%'] = display_df['fundamentals'].apply(lambda x: x.get('roe_pct'))
-            display_df['Health'] = display_df['fundamentals'].apply(lambda x: f"{x.get('score')}/100")
-            
-            st.dataframe(display_df[['symbol', 'name', 'price', 'action', 'priority', 'score', 'PE', 'ROE%', 'Health']], width="stretch")
+            st.dataframe(df[['symbol', 'name', 'price', 'action', 'priority', 'score', 'PE', 'ROE%', 'Health']], width="stretch")
+
+            st.subheader("📈 Price History")
+            symbols = list(dict.fromkeys(list(df["symbol"]) + list(portfolio.get("holdings", {}))))
+            c1, c2 = st.columns([3, 1])
+            chart_sym = c1.selectbox("Symbol", symbols, key="chart_symbol")
+            windows = dashboard_data.chart_windows(chart_sym)
+            years = c2.selectbox("Window", windows, format_func=lambda y: f"{y}y", key="chart_window")
+            bars = dashboard_data.price_chart(chart_sym, start=datetime.date.today() - datetime.timedelta(days=365 * years))
+            if bars.empty:
+                st.caption("No local price history for this symbol yet.")
+            else:
+                st.plotly_chart(px.line(bars.reset_index(), x="Date", y="Close", title=f"{chart_sym} close ({len(bars)} points)"))
+                if windows == [1]:
+                    st.caption(f"Only the last year is stored. `python scripts/backtest.py {chart_sym} --backfill 10` fetches older bars.")
             
             if st.button("🔄 Trigger Market & News Sync"):
-                os.system(f'"{python_exe}" "{scanner_script}"')
-                st.rerun()
+                if trigger_sync(python_exe, scanner_script): st.rerun()
         else:
             st.info("No scan data found. Please trigger an initial sync to populate the dashboard.")
             if st.button("🚀 Trigger Initial Market & News Sync"):
                 with st.spinner("Initializing Market Engine..."):
-                    os.system(f'"{python_exe}" "{scanner_script}"')
-                    st.rerun()
+                    if trigger_sync(python_exe, scanner_script): st.rerun()
 
     # --- TAB 2: PORTFOLIO ---
     with tab2:
@@ -103,26 +164,48 @@ def main():
             m3.metric("Invested", f"₹{portfolio['invested']:,.2f}")
             
             st.subheader("📦 Active Holdings")
-            holdings = portfolio.get('holdings', {})
-            if holdings:
-                h_data = []
-                for s, d in holdings.items():
-                    curr_p = next((x['price'] for x in (scan_data or []) if x['symbol']==s), d['avg_price'])
-                    h_data.append({"Symbol": s, "Qty": d['qty'], "Avg Price": d['avg_price'], "Curr Price": curr_p, "P&L": round((curr_p - d['avg_price'])*d['qty'], 2)})
-                st.dataframe(pd.DataFrame(h_data), width="stretch")
+            if not data["holdings_df"].empty:
+                st.dataframe(data["holdings_df"], width="stretch", hide_index=True)
             
             st.subheader("📜 Trade History")
-            hist = portfolio.get('trade_history', [])
-            if hist:
-                st.dataframe(pd.DataFrame(hist).sort_values('date', ascending=False), width="stretch")
+            today = datetime.date.today()
+            c1, c2, c3 = st.columns([2, 1, 1])
+            span = c1.date_input("Date range", (today - datetime.timedelta(days=90), today), key="trade_range")
+            page_size = c2.selectbox("Per page", [25, 50, 100, 250], index=1, key="trade_page_size")
+            if isinstance(span, (tuple, list)) and len(span) == 2:
+                _, total = dashboard_data.trades_page(span[0], span[1], 1, page_size)
+                pages = max(1, -(-total // page_size))
+                page = c3.number_input("Page", min_value=1, max_value=pages, value=1, key="trade_page")
+                hist, _ = dashboard_data.trades_page(span[0], span[1], page, page_size)
+                if hist:
+                    st.dataframe(pd.DataFrame(hist).drop(columns=['id', 'run_id']), width="stretch", hide_index=True)
+                    st.caption(f"Page {page} of {pages} · {total} trades")
+                else: st.write("No trades in this range.")
         else: st.warning("Portfolio not initialized.")
 
+        table, curves = dashboard_data.strategy_view()
+        if not table.empty:
+            st.subheader("🧪 Strategy Comparison")
+            st.caption("Every sync trades each strategy's own paper book against the same scan (rules in data/strategies.json).")
+            st.dataframe(table, width="stretch", hide_index=True)
+            shown = st.multiselect("Equity curves", list(table["strategy"]), default=list(table["strategy"].head(5)), key="strategy_curves")
+            if shown and not curves.empty:
+                st.plotly_chart(px.line(curves[curves["strategy"].isin(shown)], x="date", y="total_value", color="strategy", markers=True))
+
     # --- TAB 3: BRAIN ---
     with tab3:
         if pred_log:
             st.subheader("📈 Learning Progress")
             acc = pred_log.get('accuracy_score', 50)
-            st.metric("Model Prediction Accuracy", f"{acc}%")
+            cal = pred_log.get('calibration', {})
+            w = pred_log.get('weights', {"technical": 0.4, "sentiment": 0.3, "fundamental": 0.3})
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Model Prediction Accuracy", f"{acc}%", help="Out-of-sample BUY/SELL hit rate from walk-forward calibration")
+            m2.metric("RSI Buy / Sell", f"{pred_log.get('buy_rsi_threshold')} / {pred_log.get('sell_rsi_threshold')}")
+            m3.metric("Weights (T/S/F)", f"{w['technical']:.0%} / {w['sentiment']:.0%} / {w['fundamental']:.0%}")
+            if cal:
+                st.caption(f"Last calibrated {pred_log.get('last_updated', '?')[:16]} on {cal.get('samples')} predictions "
+                           f"({cal.get('horizon')}-day horizon, {cal.get('folds')} folds). In-sample accuracy {cal.get('in_sample_accuracy')}%.")
             st.info("The model updates its weights based on technical mean-reversion, fundamental value, and news impact.")
 
     # --- TAB 4: NEWS ---
@@ -141,6 +224,23 @@ def main():
                     else: st.error(f"Error: {items}")
         else: st.info("No news data found.")
 
+        st.subheader("🗄️ News Archive")
+        c1, c2, c3 = st.columns([2, 2, 1])
+        query = c1.text_input("Keywords", placeholder="e.g. rbi rate*", key="archive_query")
+        today = datetime.date.today()
+        window = c2.date_input("Published between", (today - datetime.timedelta(days=30), today), key="archive_window")
+        start, end = (list(window) + [None, None])[:2] if isinstance(window, (list, tuple)) else (window, None)
+        found, archive_sources, archive_stats = dashboard_data.news_search(query.strip() or None, start, end)
+        source = c3.selectbox("Source", ["All"] + archive_sources, key="archive_source")
+        if source != "All":
+            found = dashboard_data.news_search(query.strip() or None, start, end, source)[0]
+        st.caption(f"{len(found)} shown · {archive_stats['articles']} articles archived"
+                   + (f" since {archive_stats['oldest'][:10]}" if archive_stats["oldest"] else ""))
+        for item in found:
+            st.markdown(f"**{item.get('title') or 'No Title'}**")
+            st.write(item.get('snippet') or '')
+            st.caption(f"{item['date'][:10]} | {item.get('source') or 'Unknown'} | {item.get('category')} | [Link]({item.get('url') or '#'})")
+
     # --- TAB 5: CUSTOM ANALYSIS ---
     with tab5:
         st.subheader("🔍 Deep Fundamental & Technical Analysis")
@@ -148,18 +248,8 @@ def main():
         if st.button("Analyze Deeply"):
             if new_ticker:
                 with st.spinner(f"Running deep-scan on {new_ticker}..."):
-                    import subprocess
-                    import re
-                    result = subprocess.run([python_exe, scanner_script, new_ticker], capture_output=True, text=True)
+                    res_data, errors, raw = run_custom_analysis(python_exe, scanner_script, new_ticker)
                     try:
-                        # Extract JSON block using regex if there's surrounding text
-                        raw_out = result.stdout.strip()
-                        json_match = re.search(r'\[.*\]', raw_out, re.DOTALL)
-                        if json_match:
-                            res_data = json.loads(json_match.group())
-                        else:
-                            res_data = json.loads(raw_out)
-                            
                         if res_data:
                             item = res_data[0]
                             f = item.get('fundamentals', {})
@@ -188,15 +278,86 @@ def main():
                             
                             if st.button("➕ Add to Main Watchlist"):
                                 if item['symbol'] not in watchlist:
-                                    watchlist.append(item['symbol'])
-                                    save_json(watchlist, WATCHLIST_FILE)
+                                    save_json(watchlist + [item['symbol']], WATCHLIST_FILE)
                                     st.success(f"Added {item['symbol']} to watchlist.")
-                        else: st.error("No data found for this ticker.")
+                        else: st.error(f"No data found for this ticker. {' '.join(errors.values())}")
                     except Exception as e:
                         st.error(f"Analysis failed: {e}")
+                    if raw:
                         st.write("Raw output for debugging:")
-                        st.code(result.stdout)
-                        st.code(result.stderr)
+                        st.code(raw[0])
+                        st.code(raw[1])
+
+    # --- TAB 6: PERFORMANCE ---
+    with tab6:
+        runs = metrics.load_runs(limit=50)
+        if not runs:
+            st.info("No run metrics yet. Every sync writes one to data/metrics/.")
+        else:
+            trend = pd.DataFrame([{"run": r["started"][:19], "kind": r["kind"], "duration_s": round(r["duration_ms"] / 1000, 1),
+                                   "scanned": r.get("scanned"), "failed": r.get("failed")} for r in runs])
+            st.plotly_chart(px.line(trend, x="run", y="duration_s", color="kind", markers=True, title="Sync duration"))
+
+            labels = {f"{r['started'][:19]} ({r['kind']})": r for r in reversed(runs)}
+            run = labels[st.selectbox("Run", list(labels))]
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Duration", f"{run['duration_ms'] / 1000:.1f}s")
+            m2.metric("Symbols", run.get("scanned", len(run["symbols"])))
+            m3.metric("Failed", run.get("failed", 0))
+            if run.get("profile"): st.caption(f"cProfile dump: {run['profile']}")
+
+            c1, c2 = st.columns(2)
+            with c1:
+                st.subheader("Latency by stage")
+                st.caption("Spans nest (scan contains history, fundamentals, ...), so totals overlap.")
+                stages = pd.DataFrame([{"stage": k, **v} for k, v in run["stages"].items()])
+                if not stages.empty:
+                    st.plotly_chart(px.bar(stages, x="total_ms", y="stage", orientation="h", hover_data=["count", "max_ms"]))
+            with c2:
+                st.subheader("Counters")
+                st.dataframe(pd.DataFrame(list(run["counters"].items()), columns=["counter", "count"]), width="stretch", hide_index=True)
+
+            st.subheader("🐢 Slowest symbols")
+            slow = sorted(run["symbols"].items(), key=lambda kv: -kv[1]["total_ms"])[:15]
+            st.dataframe(pd.DataFrame([{"symbol": s, "total_ms": v["total_ms"], **v["stages"], "errors": "; ".join(v["errors"])}
+                                       for s, v in slow]), width="stretch", hide_index=True)
+
+            # Symbols that were among the 10 slowest in any run, tracked across runs
+            top = {s for r in runs for s, _ in sorted(r["symbols"].items(), key=lambda kv: -kv[1]["total_ms"])[:10]}
+            hist = pd.DataFrame([{"run": r["started"][:19], "symbol": s, "total_ms": v["total_ms"]}
+                                 for r in runs for s, v in r["symbols"].items() if s in top])
+            if not hist.empty:
+                st.plotly_chart(px.line(hist, x="run", y="total_ms", color="symbol", markers=True, title="Slowest symbols over time"))
+
+    # --- TAB 7: SCAN HISTORY ---
+    with tab7:
+        runs = dashboard_data.snapshot_runs()
+        if not runs:
+            st.info("No scan snapshots yet. Every sync writes one to data/snapshots/.")
+        else:
+            st.caption(f"{len(runs)} runs from {runs[0]['date'][:10]} to {runs[-1]['date'][:10]}")
+            st.subheader("📜 Symbol History")
+            c1, c2 = st.columns([3, 1])
+            hist_sym = c1.selectbox("Symbol", list(data["scan_df"]["symbol"]), key="history_symbol")
+            days = c2.selectbox("Window", [30, 90, 365, None], format_func=lambda d: f"{d}d" if d else "All", key="history_window")
+            start = datetime.date.today() - datetime.timedelta(days=days) if days else None
+            hist = dashboard_data.symbol_history(hist_sym, start) if hist_sym else pd.DataFrame()
+            if hist.empty:
+                st.info("No snapshots for this symbol in the window.")
+            else:
+                st.plotly_chart(px.line(hist, x="date", y=["score", "rsi"], markers=True, title=f"{hist_sym} score and RSI"))
+                st.plotly_chart(px.scatter(hist, x="date", y="action", color="priority", title=f"{hist_sym} action",
+                                           category_orders={"action": ["BUY", "HOLD", "SELL"]}))
+
+            st.subheader("🔀 Compare Runs")
+            labels = {f"#{e['run_id']} · {e['date'][:16]} ({e['buys']} BUY / {e['sells']} SELL)": e["run_id"] for e in reversed(runs)}
+            c1, c2 = st.columns(2)
+            run_b = labels[c1.selectbox("Run", list(labels), key="diff_run_b")]
+            run_a = labels[c2.selectbox("Against", list(labels), index=min(1, len(labels) - 1), key="diff_run_a")]
+            changed = dashboard_data.run_diff(run_a, run_b)
+            st.caption(f"{len(changed)} symbols changed action or priority, appeared or dropped out")
+            st.dataframe(changed[["symbol", "status", "action_a", "priority_a", "action_b", "priority_b", "score_a", "score_b",
+                                  "score_change", "price_change_pct"]], width="stretch", hide_index=True)
 
 if __name__ == "__main__":
     main()
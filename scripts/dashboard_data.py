@@ -0,0 +1,226 @@
+import os
+import json
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+import price_cache
+import storage
+import news_archive
+import strategies
+import snapshots
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+SCAN_FILE = os.path.join(DATA_DIR, "scan_results.json")
+PRED_LOG_FILE = os.path.join(DATA_DIR, "prediction_log.json")
+NEWS_FILE = os.path.join(DATA_DIR, "latest_news.json")
+WATCHLIST_FILE = os.path.join(DATA_DIR, "watchlist.json")
+PULSE_FILE = os.path.join(DATA_DIR, "daily_pulse.json")
+CHANGES_FILE = os.path.join(DATA_DIR, "scan_changes.jsonl")   # Written by scheduler.py
+
+DEFAULT_WATCHLIST = ["RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "SBIN.NS", "MCX.NS", "SILVERBEES.NS", "BSE.NS"]
+CHART_POINTS = 500      # Points handed to plotly per series after downsampling
+CHART_WINDOWS = [1, 3, 5, 10]   # Years
+TRADE_PAGE_SIZE = 50
+MAX_CACHED_QUERIES = 64
+
+# Streamlit reruns the script on every interaction but keeps imported modules, so these
+# caches live as long as the dashboard process. Cached values are shared: treat them as read-only.
+_lock = threading.Lock()
+_cache = {}
+
+def file_key(*paths):
+    """Changes whenever any of the files is written, replaced or removed."""
+    key = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            key.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+def db_key(db_path):
+    # Commits land in the -wal file and checkpoints in the main file, so both are watched
+    return file_key(db_path, db_path + "-wal")
+
+def cached(name, key, build):
+    """build() once per distinct key; the previous value for name is dropped when the key changes."""
+    with _lock:
+        hit = _cache.get(name)
+        if hit and hit[0] == key: return hit[1]
+    value = build()
+    with _lock:
+        _cache[name] = (key, value)
+        if len(_cache) > MAX_CACHED_QUERIES + 16:
+            for stale in [n for n in _cache if isinstance(n, tuple)][:len(_cache) // 2]:
+                del _cache[stale]
+    return value
+
+def _read_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def load_json(path, default=None):
+    """Parsed JSON, re-read only when the file's mtime or size changes."""
+    return cached(("json", path), file_key(path), lambda: _read_json(path, default))
+
+# --- Views ---
+
+def scan_key(path=SCAN_FILE, root=snapshots.SNAPSHOT_DIR):
+    return file_key(path, os.path.join(root, "manifest.json"))
+
+def scan_view(path=SCAN_FILE, root=snapshots.SNAPSHOT_DIR):
+    """Display DataFrame for the latest scan, built once per run.
+
+    Read from the newest memory-mapped Arrow snapshot; scan_results.json is
+    only flattened when no snapshot has been written yet.
+    """
+    def build():
+        _, table = snapshots.latest(root)
+        if table is None:
+            table = snapshots.flatten(_read_json(path, None) or [], 0, datetime.datetime.now())
+        df = table.to_pandas()
+        df[["action", "priority"]] = df[["action", "priority"]].astype(object)
+        df["PE"] = df["pe"]
+        df["ROE%"] = df["roe_pct"]
+        df["Health"] = df["f_score"].map(lambda v: f"{v:g}/100", na_action="ignore")
+        return df
+    return cached("scan", scan_key(path, root), build)
+
+def portfolio_view(scan_path=SCAN_FILE, db_path=storage.ORACLE_DB_FILE):
+    """(portfolio, holdings DataFrame priced from the latest scan)."""
+    def build():
+        portfolio = storage.load_portfolio(db_path)
+        holdings = portfolio.get("holdings", {})
+        if not holdings: return portfolio, pd.DataFrame()
+        df = pd.DataFrame.from_dict(holdings, orient="index")
+        df.index.name = "Symbol"
+        scan = scan_view(scan_path)
+        prices = pd.Series(scan["price"].to_numpy(), index=scan["symbol"])
+        df["Curr Price"] = pd.Series(df.index.map(prices), index=df.index, dtype=float).fillna(df["avg_price"])
+        df["P&L"] = ((df["Curr Price"] - df["avg_price"]) * df["qty"]).round(2)
+        df = df.rename(columns={"qty": "Qty", "avg_price": "Avg Price", "date_bought": "Bought"}).reset_index()
+        return portfolio, df[["Symbol", "Qty", "Avg Price", "Curr Price", "P&L", "Bought"]]
+    return cached("portfolio", (scan_key(scan_path), db_key(db_path)), build)
+
+def trades_page(start=None, end=None, page=1, page_size=TRADE_PAGE_SIZE, symbol=None, db_path=storage.ORACLE_DB_FILE):
+    """(rows for one page, newest first, total matching trades)."""
+    key = db_key(db_path)
+    total = cached(("trade_count", str(start), str(end), symbol), key,
+                   lambda: storage.count_trades(start, end, symbol, db_path=db_path))
+    rows = cached(("trades", str(start), str(end), symbol, page, page_size), key,
+                  lambda: storage.load_trades(start, end, symbol, limit=page_size, offset=(max(1, page) - 1) * page_size, db_path=db_path))
+    return rows, total
+
+def strategy_view(db_path=storage.ORACLE_DB_FILE):
+    """(comparison DataFrame, equity history DataFrame) for the paper-trading strategies."""
+    def build():
+        return pd.DataFrame(strategies.compare(db_path)), pd.DataFrame(storage.load_strategy_equity(db_path))
+    return cached("strategies", db_key(db_path), build)
+
+def recent_changes(limit=20, path=CHANGES_FILE):
+    """The newest `limit` scheduler cycles from the change feed, newest first."""
+    def build():
+        try:
+            with open(path, "r") as f:
+                lines = f.readlines()[-limit:]
+        except OSError:
+            return []
+        entries = []
+        for line in reversed(lines):
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+    return cached(("changes", path, limit), file_key(path), build)
+
+def load(db_path=storage.ORACLE_DB_FILE):
+    """Everything the tabs read on a rerun. Unchanged files are not re-read."""
+    scan_df = scan_view()
+    portfolio, holdings_df = portfolio_view(db_path=db_path)
+    return {"scan_df": scan_df, "portfolio": portfolio, "holdings_df": holdings_df,
+            "pred_log": load_json(PRED_LOG_FILE), "news": load_json(NEWS_FILE),
+            "watchlist": load_json(WATCHLIST_FILE, DEFAULT_WATCHLIST), "pulse": load_json(PULSE_FILE)}
+
+# --- News archive ---
+
+def news_search(text=None, start=None, end=None, source=None, limit=news_archive.SEARCH_LIMIT, db_path=news_archive.NEWS_DB_FILE):
+    """(matching articles, distinct sources, archive stats), cached until the archive changes."""
+    def build():
+        with news_archive.connect(db_path) as conn:
+            return (news_archive.search(conn, text, start, end, source, limit=limit),
+                    news_archive.sources(conn), news_archive.stats(conn))
+    return cached(("news_search", text, str(start), str(end), source, limit), db_key(db_path), build)
+
+# --- Scan history ---
+
+def snapshot_runs(root=snapshots.SNAPSHOT_DIR):
+    """The snapshot manifest, oldest run first."""
+    path = os.path.join(root, "manifest.json")
+    return cached("snapshot_runs", file_key(path), lambda: snapshots.load_manifest(path))
+
+def symbol_history(symbol, start=None, root=snapshots.SNAPSHOT_DIR):
+    return cached(("symbol_history", symbol, str(start)), file_key(os.path.join(root, "manifest.json")),
+                  lambda: snapshots.history(symbol, start, root=root))
+
+def run_diff(run_a, run_b, root=snapshots.SNAPSHOT_DIR):
+    """snapshots.diff between two run ids."""
+    def build():
+        runs = {e["run_id"]: e for e in snapshot_runs(root)}
+        return snapshots.diff(runs[run_a], runs[run_b], root)
+    return cached(("run_diff", run_a, run_b), file_key(os.path.join(root, "manifest.json")), build)
+
+# --- Price charts ---
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the series' visual shape."""
+    n = len(x)
+    if threshold >= n or threshold < 3: return np.arange(n)
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    idx = np.empty(threshold, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        nhi = min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = x[hi:nhi].mean(), y[hi:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+def chart_windows(symbol, db_path=price_cache.PRICE_DB_FILE):
+    """CHART_WINDOWS the stored bars can fill: each longer window needs bars older than the one before it."""
+    def build():
+        conn = price_cache.connect(db_path)
+        try:
+            first = conn.execute("SELECT MIN(date) FROM bars WHERE symbol = ?", (symbol,)).fetchone()[0]
+        finally:
+            conn.close()
+        if not first: return CHART_WINDOWS[:1]
+        span = (datetime.date.today() - datetime.date.fromisoformat(first)).days / 365
+        return CHART_WINDOWS[:1] + [y for prev, y in zip(CHART_WINDOWS, CHART_WINDOWS[1:]) if span > prev]
+    return cached(("chart_windows", symbol), db_key(db_path), build)
+
+def price_chart(symbol, start=None, points=CHART_POINTS, db_path=price_cache.PRICE_DB_FILE):
+    """Close (and volume) for symbol from the local price store, downsampled to at most `points` rows."""
+    def build():
+        conn = price_cache.connect(db_path)
+        try:
+            bars = price_cache.read_bars(conn, symbol, start)
+        finally:
+            conn.close()
+        bars = bars.dropna(subset=["Close"])
+        if len(bars) <= points: return bars
+        keep = lttb(bars.index.asi8, bars["Close"].to_numpy(), points)
+        return bars.iloc[keep]
+    return cached(("chart", symbol, str(start), points), db_key(db_path), build)
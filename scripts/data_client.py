@@ -0,0 +1,126 @@
+import time
+import random
+import threading
+from concurrent.futures import Future
+import metrics
+
+# Per-host request budget: (tokens per second, burst), keyed by the logical name of the
+# library-backed fetcher.
+HOST_LIMITS = {
+    "yahoo": (5.0, 10),
+    "nse": (2.0, 4),
+    "ddg": (1.0, 3),
+}
+DEFAULT_LIMIT = (5.0, 10)
+
+MAX_RETRIES = 4         # Extra attempts after the first for a retryable failure
+BACKOFF_BASE = 0.5      # Seconds; attempt n waits a random time in [0, min(cap, base * 2**n)]
+BACKOFF_CAP = 20.0
+
+class FetchError(Exception):
+    """A fetch still failed after retries."""
+
+class Throttled(FetchError):
+    """The host kept rate-limiting the request until the retries ran out."""
+
+def is_throttle(exc):
+    """The rate-limit exceptions of yfinance (YFRateLimitError) and DDGS (RatelimitException), and 429 messages."""
+    name, msg = type(exc).__name__.lower(), str(exc).lower()
+    return "ratelimit" in name or "too many requests" in msg or "rate limit" in msg
+
+def is_retryable(exc):
+    if is_throttle(exc): return True
+    name = type(exc).__name__.lower()
+    return isinstance(exc, (ConnectionError, TimeoutError)) or "timeout" in name or "connection" in name
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate, self.burst = float(rate), float(burst)
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class Client:
+    """Shared access path for every fetcher: rate limits, retries and request coalescing per host.
+
+    call() wraps library calls (yfinance, nsepython, DDGS), which keep their own
+    pooled sessions.
+    """
+    def __init__(self, limits=None, retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_cap=BACKOFF_CAP, sleep=time.sleep):
+        self.limits = dict(HOST_LIMITS, **(limits or {}))
+        self.retries, self.backoff_base, self.backoff_cap = retries, backoff_base, backoff_cap
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.inflight = {}
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(*self.limits.get(host, DEFAULT_LIMIT))
+            return self.buckets[host]
+
+    def call(self, host, key, fn, *args, **kwargs):
+        """Runs fn under host's limits. A call for a (host, key) already in flight waits for that result instead."""
+        with self.lock:
+            fut = self.inflight.get((host, key))
+            owner = fut is None
+            if owner:
+                fut = self.inflight[(host, key)] = Future()
+        if not owner:
+            metrics.count("client.coalesced")
+            return fut.result()
+        try:
+            result = self._attempt(host, key, fn, args, kwargs)
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop((host, key), None)
+
+    def _attempt(self, host, key, fn, args, kwargs):
+        bucket = self.bucket(host)
+        for attempt in range(self.retries + 1):
+            if bucket.acquire(): metrics.count(f"client.rate_limited.{host}")
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e): raise
+                if attempt == self.retries:
+                    if is_throttle(e):
+                        metrics.count(f"client.throttled.{host}")
+                        raise Throttled(f"{host} throttled {key} ({attempt + 1} attempts): {e}") from e
+                    raise FetchError(f"{host} failed {key} ({attempt + 1} attempts): {e}") from e
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                delay = max(delay, getattr(e, "retry_after", None) or 0)
+                metrics.count("retry")
+                metrics.count(f"client.retry.{host}")
+                self.sleep(delay)
+
+_lock = threading.Lock()
+_client = None
+
+def get():
+    """The process-wide client shared by all fetchers."""
+    global _client
+    with _lock:
+        if _client is None: _client = Client()
+        return _client
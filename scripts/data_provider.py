@@ -0,0 +1,244 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import pandas as pd
+import data_client
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+FIXTURE_DIR = os.environ.get("ORACLE_FIXTURES") or os.path.join(DATA_DIR, "fixtures")
+
+# live: straight to yfinance / nsepython / DuckDuckGo
+# record: live, and every response is also written to FIXTURE_DIR
+# replay: served from FIXTURE_DIR only; nothing touches the network
+MODE = os.environ.get("ORACLE_DATA_MODE", "live")
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+class FixtureMissing(LookupError):
+    """Replay was asked for something that was never recorded."""
+
+class LiveProvider:
+    """yfinance, nsepython and DDGS behind the shared client's rate limits, retries and coalescing.
+
+    Each host keeps one session for the life of the provider: a single DDGS
+    instance here, and the process-wide sessions yfinance and nsepython (2.101+)
+    already hold, so cookies and connections are reused across calls.
+    """
+    name = "live"
+
+    def __init__(self, client=None):
+        self.client = client or data_client.get()
+        self._ddgs = None
+        self._ddgs_lock = threading.Lock()
+
+    def ddgs(self):
+        from duckduckgo_search import DDGS
+        with self._ddgs_lock:
+            if self._ddgs is None: self._ddgs = DDGS()
+            return self._ddgs
+
+    def history(self, symbol, start, end):
+        import yfinance as yf
+        # raise_errors surfaces rate limiting instead of an empty frame
+        return self.client.call("yahoo", f"history:{symbol}:{start}:{end}",
+                                lambda: yf.Ticker(symbol).history(start=str(start), end=str(end), raise_errors=True))
+
+    def download(self, symbols, period, auto_adjust=True):
+        """Batched daily bars, columns grouped by ticker (yf.download group_by="ticker")."""
+        import yfinance as yf
+        symbols = list(symbols)
+        return self.client.call("yahoo", f"download:{period}:{auto_adjust}:{','.join(symbols)}",
+                                lambda: yf.download(symbols, period=period, group_by="ticker", threads=True, progress=False, auto_adjust=auto_adjust))
+
+    def info(self, symbol):
+        import yfinance as yf
+        return self.client.call("yahoo", f"info:{symbol}", lambda: yf.Ticker(symbol).info)
+
+    def nse_eq(self, symbol):
+        from nsepython import nse_eq
+        return self.client.call("nse", f"nse_eq:{symbol}", nse_eq, symbol)
+
+    def holidays(self):
+        """NSE's trading-holiday calendar, keyed by segment (nsepython nse_holidays)."""
+        from nsepython import nse_holidays
+        return self.client.call("nse", "holidays:trading", nse_holidays, "trading")
+
+    def news(self, query, max_results=10):
+        """One DDGS news query, normalised to the archive's article shape."""
+        ddgs = self.ddgs()
+
+        def fetch():
+            with self._ddgs_lock:  # DDGS paces its own requests through shared state
+                results = ddgs.news(query, max_results=max_results)
+            return [{
+                "title": r.get('title'),
+                "snippet": r.get('body'),
+                "source": r.get('source'),
+                "date": r.get('date'),
+                "url": r.get('url')
+            } for r in results]
+        return self.client.call("ddg", f"news:{query}:{max_results}", fetch)
+
+# --- Fixtures on disk ---
+
+def _safe(name):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name)
+
+def news_key(query, max_results=10):
+    return hashlib.sha1(f"{query}|{max_results}".encode()).hexdigest()[:16]
+
+class FixtureStore:
+    """history/<SYM>.csv, info/<SYM>.json, nse_eq/<SYM>.json, holidays/trading.json and news/<key>.json under root."""
+    def __init__(self, root=FIXTURE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+
+    def path(self, kind, name, ext):
+        return os.path.join(self.root, kind, f"{_safe(name)}.{ext}")
+
+    def read_json(self, kind, name):
+        try:
+            with open(self.path(kind, name, "json"), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise FixtureMissing(f"no {kind} fixture for {name}")
+
+    def write_json(self, kind, name, value):
+        path = self.path(kind, name, "json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(value, f, default=str)
+        os.replace(tmp, path)
+
+    def read_history(self, symbol):
+        path = self.path("history", symbol, "csv")
+        if not os.path.exists(path): raise FixtureMissing(f"no history fixture for {symbol}")
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+        df.index.name = "Date"
+        return df
+
+    def write_history(self, symbol, df):
+        """Merges df into the stored bars (newer rows win), so incremental fetches accumulate."""
+        if df is None or df.empty: return
+        df = df[[c for c in COLUMNS if c in df.columns]].copy()
+        df.index = pd.DatetimeIndex(pd.DatetimeIndex(df.index).strftime("%Y-%m-%d"), name="Date")
+        with self.lock:
+            try:
+                df = pd.concat([self.read_history(symbol), df])
+                df = df[~df.index.duplicated(keep="last")].sort_index()
+            except FixtureMissing:
+                pass
+            path = self.path("history", symbol, "csv")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df.to_csv(path)
+
+class RecordingProvider:
+    """Passes every call through to `inner` and stores the response as a fixture."""
+    name = "record"
+
+    def __init__(self, inner=None, root=FIXTURE_DIR):
+        self.inner = inner or LiveProvider()
+        self.store = FixtureStore(root)
+
+    def history(self, symbol, start, end):
+        df = self.inner.history(symbol, start, end)
+        self.store.write_history(symbol, df)
+        return df
+
+    def download(self, symbols, period, auto_adjust=True):
+        raw = self.inner.download(symbols, period, auto_adjust)
+        if raw is not None and isinstance(raw.columns, pd.MultiIndex):
+            for sym in set(raw.columns.get_level_values(0)):
+                self.store.write_history(sym, raw[sym].dropna(how="all"))
+        return raw
+
+    def info(self, symbol):
+        value = self.inner.info(symbol)
+        self.store.write_json("info", symbol, value)
+        return value
+
+    def nse_eq(self, symbol):
+        value = self.inner.nse_eq(symbol)
+        self.store.write_json("nse_eq", symbol, value)
+        return value
+
+    def holidays(self):
+        value = self.inner.holidays()
+        self.store.write_json("holidays", "trading", value)
+        return value
+
+    def news(self, query, max_results=10):
+        items = self.inner.news(query, max_results)
+        self.store.write_json("news", news_key(query, max_results), {"query": query, "items": items})
+        return items
+
+class ReplayProvider:
+    """Serves recorded fixtures; anything not recorded raises FixtureMissing."""
+    name = "replay"
+
+    def __init__(self, root=FIXTURE_DIR):
+        self.store = FixtureStore(root)
+
+    def history(self, symbol, start, end):
+        df = self.store.read_history(symbol)
+        return df[(df.index >= pd.Timestamp(str(start))) & (df.index < pd.Timestamp(str(end)))]
+
+    def download(self, symbols, period, auto_adjust=True):
+        m = re.fullmatch(r"(\d+)(d|mo|y)", period)
+        if not m: raise ValueError(f"unsupported period {period!r}")
+        n, unit = int(m.group(1)), m.group(2)
+        frames = {}
+        for sym in symbols:
+            try:
+                df = self.store.read_history(sym)
+            except FixtureMissing:
+                continue
+            if unit == "d" or df.empty:
+                frames[sym] = df.tail(n)  # yfinance counts "d" periods in trading days
+            else:
+                days = n * (365 if unit == "y" else 30)
+                frames[sym] = df[df.index > df.index[-1] - pd.Timedelta(days=days)]
+        if not frames: return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def info(self, symbol):
+        return self.store.read_json("info", symbol)
+
+    def nse_eq(self, symbol):
+        return self.store.read_json("nse_eq", symbol)
+
+    def holidays(self):
+        return self.store.read_json("holidays", "trading")
+
+    def news(self, query, max_results=10):
+        return self.store.read_json("news", news_key(query, max_results))["items"]
+
+# --- Active provider ---
+
+_lock = threading.Lock()
+_provider = None
+
+def make(mode=MODE, root=FIXTURE_DIR):
+    if mode == "live": return LiveProvider()
+    if mode == "record": return RecordingProvider(root=root)
+    if mode == "replay": return ReplayProvider(root)
+    raise ValueError(f"unknown data mode {mode!r} (expected live, record or replay)")
+
+def get():
+    """The process-wide provider, chosen by ORACLE_DATA_MODE on first use."""
+    global _provider
+    with _lock:
+        if _provider is None: _provider = make()
+        return _provider
+
+def use(provider):
+    """Replaces the process-wide provider (e.g. a ReplayProvider over a fixture directory)."""
+    global _provider
+    with _lock:
+        _provider = provider
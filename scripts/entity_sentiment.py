@@ -0,0 +1,271 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import datetime
+import threading
+from collections import deque
+import fundamentals_cache
+import news_archive
+import sentiment_scorer
+import storage
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+ENTITY_STATE_FILE = os.path.join(DATA_DIR, "entity_sentiment.json")
+ALIASES_FILE = os.path.join(DATA_DIR, "entity_aliases.json")   # Optional {"SYMBOL.NS": ["alias", ...]}
+
+HALF_LIFE_HOURS = 48.0  # An article's weight halves every this many hours
+LOOKBACK_DAYS = 14      # Older articles are ignored (weight below 1%)
+MAX_BIAS = 15           # Same [-15, 15] scale as the market-wide bias
+BIAS_DIVISOR = 3        # Lexicon points per bias point
+MIN_ALIAS_CHARS = 3     # Shorter one-word aliases match too much unrelated text
+
+DEFAULT_ALIASES = {
+    "RELIANCE.NS": ["Reliance Industries", "RIL"],
+    "TCS.NS": ["Tata Consultancy Services"],
+    "HDFCBANK.NS": ["HDFC Bank"],
+    "SBIN.NS": ["SBI", "State Bank of India"],
+    "SILVERBEES.NS": ["silver"],
+    "BSE.NS": ["Bombay Stock Exchange", "BSE Ltd", "BSE Limited", "BSE shares"],
+    "MCX.NS": ["Multi Commodity Exchange", "MCX Ltd", "MCX shares"],
+}
+NAME_SUFFIXES = {"ltd", "lt", "limited", "inc", "corp", "corporation", "co", "company", "plc", "the"}
+CONNECTORS = {"of", "and", "&", "the", "for", "de"}
+COMMON_WORDS = {"india", "indian", "bank", "power", "steel", "gold", "oil", "gas", "life", "auto", "energy",
+                "finance", "capital", "global", "market", "markets", "stock", "stocks", "share", "shares", "new",
+                "one", "best", "united", "national", "general", "international", "fund", "etf", "bees"}
+# Exchanges, indices and regulators: headlines use them for the whole market, so a ticker
+# that is one of these (BSE, MCX) only matches through a longer name or configured alias
+MARKET_WORDS = {"bse", "nse", "mcx", "sensex", "nifty", "banknifty", "finnifty", "sebi", "rbi"}
+# Other companies and indices that start with a watchlist alias ("SBI Life" is not SBI).
+# A longer match covers the shorter one, and these link to no symbol.
+NON_ENTITIES = ["BSE Sensex", "S&P BSE", "NSE Nifty", "Nifty Bank", "SBI Life", "SBI Card", "SBI Cards",
+                "SBI Mutual Fund", "SBI Funds", "SBI General", "HDFC Life", "HDFC AMC", "HDFC Securities",
+                "Reliance Power", "Reliance Infrastructure", "Reliance Capital", "Reliance Communications",
+                "Reliance Home Finance", "Reliance Nippon", "MCX Gold", "MCX Silver", "MCX Crude"]
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:&[a-z0-9]+)*")
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+def name_tokens(name):
+    """Tokens of a company name without legal suffixes ("Tata Steel Ltd." -> ("tata", "steel"))."""
+    toks = tokenize(name)
+    while toks and toks[-1] in NAME_SUFFIXES: toks.pop()
+    while toks and toks[0] == "the": toks.pop(0)
+    return tuple(toks)
+
+def aliases(symbol, info=None, extra=()):
+    """Token sequences that identify symbol in text: ticker, shortName, longName, their first two
+    words, and any configured aliases (taken verbatim). Ambiguous single words are dropped."""
+    names = [symbol.split(".")[0]]
+    if info: names += [info.get("shortName"), info.get("longName")]
+    found = {tuple(tokenize(a)) for a in extra} - {()}
+    for name in names:
+        toks = name_tokens(name)
+        if not toks: continue
+        found.add(toks)
+        if len(toks) >= 3 and toks[1] not in CONNECTORS: found.add(toks[:2])
+    return {a for a in found if len(a) > 1 or (len(a[0]) >= MIN_ALIAS_CHARS and not a[0].isdigit()
+                                                and a[0] not in COMMON_WORDS and a[0] not in MARKET_WORDS)}
+
+def load_aliases(path=ALIASES_FILE):
+    """DEFAULT_ALIASES plus the optional aliases file."""
+    merged = {s: list(a) for s, a in DEFAULT_ALIASES.items()}
+    try:
+        with open(path, "r") as f:
+            for sym, extra in json.load(f).items():
+                merged.setdefault(sym, []).extend(extra)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"[!] Ignoring unreadable aliases file {path}: {e}", file=sys.stderr)
+    return merged
+
+def alias_map(symbols):
+    """{symbol: set of alias token tuples}, with names taken from already-cached .info only."""
+    extra = load_aliases()
+    infos = fundamentals_cache.peek("info", symbols)
+    return {s: aliases(s, infos.get(s), extra.get(s, ())) for s in symbols}
+
+class Automaton:
+    """Aho-Corasick over word tokens: one pass over a text finds every alias of every symbol.
+
+    Where matches overlap, only the longest counts, so "SBI Life" (one of
+    NON_ENTITIES) hides the "SBI" inside it.
+    """
+    def __init__(self, alias_map, non_entities=NON_ENTITIES):
+        self.goto, self.fail, self.out = [{}], [0], [()]
+        outputs = {}
+        phrases = [(sym, seq) for sym, seqs in alias_map.items() for seq in seqs]
+        phrases += [(None, tuple(tokenize(p))) for p in non_entities]
+        for sym, seq in phrases:
+            node = 0
+            for tok in seq:
+                nxt = self.goto[node].get(tok)
+                if nxt is None:
+                    nxt = self.goto[node][tok] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                node = nxt
+            outputs.setdefault(node, (len(seq), set()))[1].add(sym)
+        for node, (n, syms) in outputs.items():
+            self.out[node] = ((n, frozenset(syms)),)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for tok, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and tok not in self.goto[f]: f = self.fail[f]
+                self.fail[child] = self.goto[f].get(tok, 0)
+                if self.out[self.fail[child]]: self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, tokens):
+        """Symbols with at least one alias in the token sequence."""
+        goto, fail, out = self.goto, self.fail, self.out
+        spans, node = [], 0
+        for i, tok in enumerate(tokens):
+            while node and tok not in goto[node]: node = fail[node]
+            node = goto[node].get(tok, 0)
+            for n, syms in out[node]: spans.append((i + 1 - n, i + 1, syms))
+        found = set()
+        for start, end, syms in spans:
+            if not any(s <= start and end <= e and e - s > end - start for s, e, _ in spans):
+                found |= syms
+        found.discard(None)
+        return found
+
+    def link(self, article):
+        return self.find(tokenize(f"{article.get('title') or ''} {article.get('snippet') or ''}"))
+
+_lock = threading.Lock()
+_automata = {}
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode()).hexdigest()[:12]
+
+def automaton(amap):
+    """Automaton for an alias map, built once per distinct watchlist/alias set."""
+    key = _digest(sorted((s, sorted(a)) for s, a in amap.items()))
+    with _lock:
+        hit = _automata.get(key)
+    if hit: return hit
+    built = Automaton(amap)
+    with _lock:
+        _automata.clear()
+        _automata[key] = built
+    return built
+
+# --- Incremental per-symbol scores ---
+
+def _utcnow():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+def _decay(hours):
+    return 0.5 ** (max(0.0, hours) / HALF_LIFE_HOURS)
+
+def _age_hours(now, date):
+    try:
+        return (now - datetime.datetime.fromisoformat(date)).total_seconds() / 3600
+    except (TypeError, ValueError):
+        return 0.0
+
+def load_state(version, path=ENTITY_STATE_FILE):
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+        if state.get("version") == version: return state
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"version": version, "symbols": {}}
+
+def update(symbols, db_path=news_archive.NEWS_DB_FILE, path=ENTITY_STATE_FILE, now=None):
+    """Brings each symbol's decayed news score up to date with the archive.
+
+    Every symbol keeps its own as_of and last article id, so a call for a few
+    symbols leaves the others' entries as they were. Only articles added since
+    a symbol's last update are linked and scored; a symbol that is new, or
+    whose aliases changed, is first backfilled from the lookback window.
+    Returns ({symbol: entry}, automaton), where entry holds the
+    recency-weighted "score" and "mentions" as of now.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    now = now or _utcnow()
+    lexicon = sentiment_scorer.load_lexicon()
+    version = _digest([sentiment_scorer.lexicon_version(lexicon), HALF_LIFE_HOURS, LOOKBACK_DAYS, NON_ENTITIES])
+    amap = alias_map(symbols)
+    keys = {s: _digest(sorted(amap[s])) for s in symbols}
+    full = automaton(amap)
+    start = (now - datetime.timedelta(days=LOOKBACK_DAYS)).isoformat(timespec="seconds")
+
+    with storage.exclusive(path):
+        state = load_state(version, path)
+        entries = {}
+        for s in symbols:
+            e = state["symbols"].get(s)
+            if e and e["aliases"] == keys[s] and (e.get("as_of") or "") >= start:
+                factor = _decay(_age_hours(now, e["as_of"]))
+                entries[s] = dict(e, score=e["score"] * factor, mentions=e["mentions"] * factor)
+        stale = [s for s in symbols if s not in entries]
+        since = min((entries[s]["last_id"] for s in entries), default=0)
+        for s in stale:
+            entries[s] = {"aliases": keys[s], "score": 0.0, "mentions": 0.0, "last_seen": None, "last_id": 0}
+
+        with news_archive.connect(db_path) as conn:
+            new = news_archive.articles_after(conn, since, start)
+            old = news_archive.articles_after(conn, 0, start, until_id=since) if stale and since else []
+
+        # A symbol updated more recently than `since` has already counted the older of the new articles
+        links = [(a, {s for s in full.link(a) if a["id"] > entries[s]["last_id"]}) for a in new]
+        if old:
+            backfill = Automaton({s: amap[s] for s in stale})
+            links += [(a, backfill.link(a)) for a in old]
+        linked = [(a, syms) for a, syms in links if syms]
+        for (a, syms), score in zip(linked, sentiment_scorer.score_articles([a for a, _ in linked], lexicon)):
+            w = _decay(_age_hours(now, a["date"]))
+            for s in syms:
+                e = entries[s]
+                e["score"] += score * w
+                e["mentions"] += w
+                if not e["last_seen"] or a["date"] > e["last_seen"]: e["last_seen"] = a["date"]
+
+        last_id = max([since] + [a["id"] for a in new])
+        as_of = now.isoformat(timespec="seconds")
+        for e in entries.values():
+            e.update(as_of=as_of, last_id=max(e["last_id"], last_id))
+        # Entries not refreshed within the lookback window would be backfilled anyway
+        kept = {s: e for s, e in state["symbols"].items() if (e.get("as_of") or "") >= start}
+        kept.update({s: dict(e, score=round(e["score"], 4), mentions=round(e["mentions"], 4)) for s, e in entries.items()})
+        state["symbols"] = kept
+        storage.atomic_write_json(state, path)
+    return entries, full
+
+def symbol_bias(symbols, articles, db_path=news_archive.NEWS_DB_FILE, path=ENTITY_STATE_FILE):
+    """(market bias, {symbol: bias}), both in [-MAX_BIAS, MAX_BIAS].
+
+    The market bias comes from the current articles that mention none of the
+    symbols; each symbol adds its own recency-weighted news on top of it.
+    """
+    entries, auto = update(symbols, db_path, path)
+    unlinked = [a for a in articles if not auto.link(a)]
+    market = sum(sentiment_scorer.score_articles(unlinked))
+
+    def clamp(x):
+        return round(max(-MAX_BIAS, min(MAX_BIAS, x / BIAS_DIVISOR)), 2)
+    return clamp(market), {s: clamp(market + e["score"]) for s, e in entries.items()}
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Per-symbol news sentiment from the news archive.")
+    ap.add_argument("symbols", nargs="+")
+    args = ap.parse_args()
+    entries, _ = update(args.symbols)
+    for s, e in sorted(entries.items(), key=lambda kv: -abs(kv[1]["score"])):
+        print(f"{s:<16} score {e['score']:>7.2f}  mentions {e['mentions']:>6.2f}  last {e['last_seen'] or '-'}")
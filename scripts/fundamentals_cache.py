@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+FUNDAMENTALS_DB_FILE = os.path.join(DATA_DIR, "fundamentals_cache.db")
+
+# Seconds an entry is served as fresh, per field group.
+TTL_SECONDS = {
+    "info": 12 * 3600,       # yfinance .info: PE, ROE, debt/equity, dividend yield, shortName
+    "nse_meta": 24 * 3600,   # nse_eq metadata: sector PE
+}
+# Past its TTL an entry is still served for this long while a background refresh runs.
+STALE_SECONDS = {
+    "info": 3 * 86400,
+    "nse_meta": 7 * 86400,
+}
+DEFAULT_TTL = 12 * 3600
+
+_lock = threading.Lock()
+_memory = {}
+_refreshing = set()
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fundamentals-refresh")
+_stats = {}
+
+def _count(group, outcome):
+    with _lock:
+        g = _stats.setdefault(group, {"hit": 0, "stale": 0, "miss": 0, "error": 0})
+        g[outcome] += 1
+    metrics.count(f"cache.{group}.{outcome}")
+
+def stats():
+    """Hit/stale/miss/error counters per field group since process start."""
+    with _lock:
+        return {g: dict(c) for g, c in _stats.items()}
+
+def _connect(db_path):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+        grp TEXT NOT NULL, key TEXT NOT NULL, fetched_at REAL NOT NULL, value TEXT NOT NULL,
+        PRIMARY KEY (grp, key)) WITHOUT ROWID""")
+    return conn
+
+def _read(group, key, db_path):
+    with _lock:
+        if (group, key) in _memory: return _memory[(group, key)]
+    conn = _connect(db_path)
+    try:
+        row = conn.execute("SELECT fetched_at, value FROM entries WHERE grp = ? AND key = ?", (group, key)).fetchone()
+    finally:
+        conn.close()
+    if not row: return None
+    entry = (row[0], json.loads(row[1]))
+    with _lock:
+        _memory[(group, key)] = entry
+    return entry
+
+def _write(group, key, value, db_path):
+    entry = (time.time(), value)
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                         (group, key, entry[0], json.dumps(value, default=str)))
+    finally:
+        conn.close()
+    with _lock:
+        _memory[(group, key)] = entry
+    return value
+
+def _refresh(group, key, loader, db_path):
+    try:
+        _write(group, key, loader(key), db_path)
+    except Exception as e:
+        _count(group, "error")
+        print(f"[!] Background refresh of {group}:{key} failed: {e}", file=sys.stderr)
+    finally:
+        with _lock:
+            _refreshing.discard((group, key))
+
+def is_fresh(group, key, db_path=FUNDAMENTALS_DB_FILE):
+    """True if get() would answer without a synchronous fetch."""
+    entry = _read(group, key, db_path)
+    return bool(entry) and time.time() - entry[0] < TTL_SECONDS.get(group, DEFAULT_TTL) + STALE_SECONDS.get(group, 0)
+
+def _peek(group, keys, db_path):
+    keys = list(dict.fromkeys(keys))
+    with _lock:
+        found = {k: _memory[(group, k)] for k in keys if (group, k) in _memory}
+    missing = [k for k in keys if k not in found]
+    if not missing: return found
+    conn = _connect(db_path)
+    try:
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            rows = conn.execute(f"SELECT key, fetched_at, value FROM entries WHERE grp = ? AND key IN ({','.join('?' * len(chunk))})",
+                                [group] + chunk).fetchall()
+            for key, fetched_at, value in rows:
+                with _lock:
+                    found[key] = _memory.setdefault((group, key), (fetched_at, json.loads(value)))
+    finally:
+        conn.close()
+    return found
+
+def peek(group, keys, db_path=FUNDAMENTALS_DB_FILE):
+    """{key: cached value} for those keys already cached, fresh or not. Never fetches."""
+    return {k: e[1] for k, e in _peek(group, keys, db_path).items()}
+
+def fetched_at(group, keys, db_path=FUNDAMENTALS_DB_FILE):
+    """{key: epoch seconds of the cached fetch} for those keys already cached."""
+    return {k: e[0] for k, e in _peek(group, keys, db_path).items()}
+
+def fresh(group, keys, db_path=FUNDAMENTALS_DB_FILE):
+    """The keys get() would answer without a synchronous fetch, from one batched read."""
+    oldest = time.time() - TTL_SECONDS.get(group, DEFAULT_TTL) - STALE_SECONDS.get(group, 0)
+    return {k for k, t in fetched_at(group, keys, db_path).items() if t > oldest}
+
+def get(group, key, loader, db_path=FUNDAMENTALS_DB_FILE):
+    """Returns the cached value for (group, key), calling loader(key) when needed.
+
+    Fresh entries are returned as-is. Entries within the stale window are
+    returned immediately and refreshed in the background. Anything older, or
+    missing, is loaded synchronously; if that load fails an expired entry is
+    still preferred over raising.
+    """
+    ttl = TTL_SECONDS.get(group, DEFAULT_TTL)
+    entry = _read(group, key, db_path)
+    age = time.time() - entry[0] if entry else None
+    if entry and age < ttl:
+        _count(group, "hit")
+        return entry[1]
+    if entry and age < ttl + STALE_SECONDS.get(group, 0):
+        _count(group, "stale")
+        with _lock:
+            start = (group, key) not in _refreshing
+            _refreshing.add((group, key))
+        if start: _refresher.submit(_refresh, group, key, loader, db_path)
+        return entry[1]
+    _count(group, "miss")
+    try:
+        return _write(group, key, loader(key), db_path)
+    except Exception:
+        _count(group, "error")
+        if entry: return entry[1]
+        raise
+
+def invalidate(group=None, key=None, db_path=FUNDAMENTALS_DB_FILE):
+    """Drops cached entries, all of them or those matching group/key."""
+    q, args = "DELETE FROM entries WHERE 1=1", []
+    if group: q, args = q + " AND grp = ?", args + [group]
+    if key: q, args = q + " AND key = ?", args + [key]
+    conn = _connect(db_path)
+    try:
+        with conn: conn.execute(q, args)
+    finally:
+        conn.close()
+    with _lock:
+        for k in [k for k in _memory if (not group or k[0] == group) and (not key or k[1] == key)]:
+            del _memory[k]
@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+
+# Same defaults pandas_ta used for df.ta.rsi / macd / bbands.
+RSI_LENGTH = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+BB_LENGTH = 5
+BB_STD = 2.0
+
+OUTPUTS = ["rsi", "macd", "macd_signal", "macd_hist", "bb_lower", "bb_mid", "bb_upper"]
+
+class _EMA:
+    """Exponential average per column, seeded with the SMA of the first `length` values.
+
+    alpha defaults to 2/(length+1); RSI passes 1/length for Wilder smoothing.
+    """
+    def __init__(self, n, length, alpha=None):
+        self.length = length
+        self.alpha = alpha if alpha is not None else 2.0 / (length + 1)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.acc = np.zeros(n)
+        self.value = np.full(n, np.nan)
+
+    def update(self, x, valid):
+        self.count += valid
+        warming = valid & (self.count <= self.length)
+        self.acc = np.where(warming, self.acc + np.where(warming, x, 0.0), self.acc)
+        seeded = warming & (self.count == self.length)
+        self.value = np.where(seeded, self.acc / self.length, self.value)
+        step = valid & (self.count > self.length)
+        self.value = np.where(step, self.value + self.alpha * (x - self.value), self.value)
+        return self.value
+
+    def state(self):
+        return {"count": self.count.tolist(), "acc": self.acc.tolist(), "value": self.value.tolist()}
+
+    def load(self, d):
+        self.count = np.asarray(d["count"], dtype=np.int64)
+        self.acc = np.asarray(d["acc"], dtype=float)
+        self.value = np.asarray(d["value"], dtype=float)
+
+class IndicatorState:
+    """Running RSI / MACD / Bollinger state for N symbols at once.
+
+    update() consumes one bar (a close per symbol, NaN where a symbol has no
+    bar) in O(N) work, so a new day only costs one step instead of a full
+    recomputation. compute() builds the state for a whole history at once.
+    """
+    def __init__(self, n):
+        self.n = n
+        self.prev_close = np.full(n, np.nan)
+        self.gain = _EMA(n, RSI_LENGTH, alpha=1.0 / RSI_LENGTH)
+        self.loss = _EMA(n, RSI_LENGTH, alpha=1.0 / RSI_LENGTH)
+        self.fast = _EMA(n, MACD_FAST)
+        self.slow = _EMA(n, MACD_SLOW)
+        self.signal = _EMA(n, MACD_SIGNAL)
+        self.window = np.full((n, BB_LENGTH), np.nan)
+        self.bars = np.zeros(n, dtype=np.int64)
+
+    def update(self, close):
+        close = np.asarray(close, dtype=float)
+        valid = ~np.isnan(close)
+        x = np.where(valid, close, 0.0)
+
+        # RSI (Wilder)
+        has_prev = valid & ~np.isnan(self.prev_close)
+        diff = np.where(has_prev, x - np.nan_to_num(self.prev_close), 0.0)
+        ag = self.gain.update(np.maximum(diff, 0.0), has_prev)
+        al = self.loss.update(np.maximum(-diff, 0.0), has_prev)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(al > 0, 100.0 - 100.0 / (1.0 + ag / al), np.where(ag > 0, 100.0, 50.0))
+        rsi = np.where(np.isnan(ag), np.nan, rsi)
+        self.prev_close = np.where(valid, close, self.prev_close)
+
+        # MACD
+        macd = self.fast.update(x, valid) - self.slow.update(x, valid)
+        sig = self.signal.update(np.nan_to_num(macd), valid & ~np.isnan(macd))
+
+        # Bollinger bands over the last BB_LENGTH bars
+        slot = self.bars % BB_LENGTH
+        rows = np.nonzero(valid)[0]
+        self.window[rows, slot[rows]] = close[rows]
+        self.bars += valid
+        full = self.bars >= BB_LENGTH
+        with np.errstate(invalid="ignore"):
+            mid = np.where(full, self.window.mean(axis=1), np.nan)
+            dev = np.where(full, self.window.std(axis=1), np.nan) * BB_STD
+
+        return {"rsi": rsi, "macd": macd, "macd_signal": sig, "macd_hist": macd - sig,
+                "bb_lower": mid - dev, "bb_mid": mid, "bb_upper": mid + dev}
+
+    def to_dict(self):
+        return {"n": self.n, "prev_close": self.prev_close.tolist(), "window": self.window.tolist(),
+                "bars": self.bars.tolist(), "gain": self.gain.state(), "loss": self.loss.state(),
+                "fast": self.fast.state(), "slow": self.slow.state(), "signal": self.signal.state()}
+
+    @classmethod
+    def from_dict(cls, d):
+        st = cls(d["n"])
+        st.prev_close = np.asarray(d["prev_close"], dtype=float)
+        st.window = np.asarray(d["window"], dtype=float).reshape(d["n"], BB_LENGTH)
+        st.bars = np.asarray(d["bars"], dtype=np.int64)
+        for name in ("gain", "loss", "fast", "slow", "signal"):
+            getattr(st, name).load(d[name])
+        return st
+
+def build_panel(frames, column="Close"):
+    """Aligns {symbol: OHLCV DataFrame} into (dates, symbols, T x N close array)."""
+    symbols = list(frames)
+    wide = pd.concat({s: frames[s][column] for s in symbols}, axis=1).sort_index() if symbols else pd.DataFrame()
+    return wide.index, symbols, wide.to_numpy(dtype=float)
+
+def _pack(panel):
+    """Moves each column's valid closes to the top, in order.
+
+    A symbol's indicators only advance on its own bars, so on the packed panel
+    every column warms up on the same rows and the recursions run column-wise
+    in one call. Returns (packed, valid, per-column bar count).
+    """
+    valid = ~np.isnan(panel)
+    order = np.argsort(~valid, axis=0, kind="stable")
+    return np.take_along_axis(panel, order, axis=0), valid, valid.sum(axis=0)
+
+def _ema(x, length, alpha=None, start=0):
+    """_EMA over packed rows start.. of x (T x N), seeded with the SMA of the first `length`.
+
+    All columns go through one pandas ewm call, laid end to end. Each column's
+    seed row then also carries (1 - alpha) * (previous column's last value -
+    seed); that term decays by (1 - alpha) per row and is subtracted again.
+    """
+    alpha = alpha if alpha is not None else 2.0 / (length + 1)
+    out = np.full(x.shape, np.nan)
+    seed_row = start + length - 1
+    if x.shape[0] <= seed_row or not x.shape[1]: return out
+    body = x[seed_row:].copy()
+    body[0] = x[start:seed_row + 1].mean(axis=0)
+    missing = np.isnan(body)
+    body[missing] = 0.0
+    rows, cols = body.shape
+    z = pd.Series(body.ravel(order="F")).ewm(alpha=alpha, adjust=False).mean().to_numpy().reshape(rows, cols, order="F")
+    carry = (1.0 - alpha) * (np.concatenate([body[0, :1], z[-1, :-1]]) - body[0])
+    y = z - carry * (1.0 - alpha) ** np.arange(rows)[:, None]
+    y[missing] = np.nan
+    out[seed_row:] = y
+    return out
+
+def _ema_state(x, length, out, count, start=0):
+    """The _EMA.state() a bar-by-bar run over the same inputs would end with."""
+    cols = np.arange(x.shape[1])
+    last = np.where(count > 0, start + count - 1, 0)
+    value = np.where(count >= length, out[np.minimum(last, len(out) - 1), cols] if len(out) else np.nan, np.nan)
+    return {"count": count.tolist(), "acc": np.nansum(x[start:start + length], axis=0).tolist(), "value": value.tolist()}
+
+def _compute_packed(packed, n):
+    """Indicators over a packed panel, plus the IndicatorState reached after its last bar."""
+    T, N = packed.shape
+    diff = np.full(packed.shape, np.nan)
+    diff[1:] = packed[1:] - packed[:-1]
+    gains, losses = np.maximum(diff, 0.0), np.maximum(-diff, 0.0)
+    gains[np.isnan(diff)] = losses[np.isnan(diff)] = np.nan
+    ag = _ema(gains, RSI_LENGTH, 1.0 / RSI_LENGTH, start=1)
+    al = _ema(losses, RSI_LENGTH, 1.0 / RSI_LENGTH, start=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(al > 0, 100.0 - 100.0 / (1.0 + ag / al), np.where(ag > 0, 100.0, 50.0))
+    rsi[np.isnan(ag)] = np.nan
+
+    fast = _ema(packed, MACD_FAST)
+    slow = _ema(packed, MACD_SLOW)
+    macd = fast - slow
+    sig = _ema(macd, MACD_SIGNAL, start=MACD_SLOW - 1)
+
+    mid, dev = np.full(packed.shape, np.nan), np.full(packed.shape, np.nan)
+    if T >= BB_LENGTH:
+        windows = np.lib.stride_tricks.sliding_window_view(packed, BB_LENGTH, axis=0)
+        mid[BB_LENGTH - 1:] = windows.mean(axis=2)
+        dev[BB_LENGTH - 1:] = windows.std(axis=2) * BB_STD
+    out = {"rsi": rsi, "macd": macd, "macd_signal": sig, "macd_hist": macd - sig,
+           "bb_lower": mid - dev, "bb_mid": mid, "bb_upper": mid + dev}
+
+    cols = np.arange(N)
+    window = np.full((N, BB_LENGTH), np.nan)
+    for i in range(BB_LENGTH):
+        # Bar k sits in slot k % BB_LENGTH of the ring; fill slots from the last BB_LENGTH bars
+        k = n - 1 - i
+        ok = k >= 0
+        window[cols[ok], k[ok] % BB_LENGTH] = packed[k[ok], cols[ok]]
+    state = IndicatorState.from_dict({
+        "n": N, "window": window.tolist(), "bars": n.tolist(),
+        "prev_close": np.where(n > 0, packed[np.maximum(n - 1, 0), cols] if T else np.nan, np.nan).tolist(),
+        "gain": _ema_state(gains, RSI_LENGTH, ag, np.maximum(n - 1, 0), start=1),
+        "loss": _ema_state(losses, RSI_LENGTH, al, np.maximum(n - 1, 0), start=1),
+        "fast": _ema_state(packed, MACD_FAST, fast, n),
+        "slow": _ema_state(packed, MACD_SLOW, slow, n),
+        "signal": _ema_state(macd, MACD_SIGNAL, sig, np.maximum(n - (MACD_SLOW - 1), 0), start=MACD_SLOW - 1)})
+    return out, state
+
+def compute(panel, state=None):
+    """Runs every indicator over a T x N close panel.
+
+    Without a state the whole history is computed at once, column-wise; with
+    one, the bars are appended to it one update() at a time. Returns
+    ({output: T x N array}, state); pass the state back with the next bars to
+    continue incrementally.
+    """
+    panel = np.asarray(panel, dtype=float)
+    if panel.ndim == 1: panel = panel.reshape(-1, 1)
+    if state is None:
+        packed, valid, n = _pack(panel)
+        packed_out, state = _compute_packed(packed, n)
+        # Row t of the panel takes the packed row of the symbol's latest bar so far,
+        # which is what update() reports on a day the symbol has no bar
+        idx = np.cumsum(valid, axis=0) - 1
+        rows = np.maximum(idx, 0)
+        out = {}
+        for k, v in packed_out.items():
+            o = np.take_along_axis(v, rows, axis=0)
+            o[idx < 0] = np.nan
+            out[k] = o
+        return out, state
+    out = {k: np.full(panel.shape, np.nan) for k in OUTPUTS}
+    for t in range(panel.shape[0]):
+        step = state.update(panel[t])
+        for k in OUTPUTS: out[k][t] = step[k]
+    return out, state
+
+def latest(closes):
+    """Last value of every indicator for a single close series."""
+    out, _ = compute(closes)
+    return {k: float(v[-1, 0]) for k, v in out.items()}
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import datetime
+import threading
+from zoneinfo import ZoneInfo
+import data_provider
+import storage
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+HOLIDAYS_FILE = os.path.join(DATA_DIR, "nse_holidays.json")
+
+IST = ZoneInfo("Asia/Kolkata")
+MARKET_OPEN = datetime.time(9, 15)
+MARKET_CLOSE = datetime.time(15, 30)
+HOLIDAY_SEGMENT = "CM"  # Capital market (equities) in NSE's holiday calendar
+
+_holidays = None
+_holidays_lock = threading.Lock()
+
+def fetch_holidays():
+    """Equity trading holidays from NSE via the data provider, as sorted YYYY-MM-DD strings."""
+    calendar = data_provider.get().holidays()
+    return sorted({datetime.datetime.strptime(h["tradingDate"], "%d-%b-%Y").date().isoformat()
+                   for h in calendar.get(HOLIDAY_SEGMENT, [])})
+
+def refresh_holidays(path=HOLIDAYS_FILE):
+    """Rewrites data/nse_holidays.json from NSE and returns the dates."""
+    days = fetch_holidays()
+    storage.atomic_write_json(days, path)
+    return {datetime.date.fromisoformat(d) for d in days}
+
+def load_holidays():
+    """Exchange holidays as a set of dates, read from data/nse_holidays.json (list of YYYY-MM-DD).
+
+    The file is fetched from NSE when it is missing or has no dates for the
+    current year. If that fails every weekday counts as a trading day, with a warning.
+    """
+    global _holidays
+    with _holidays_lock:
+        if _holidays is None:
+            try:
+                with open(HOLIDAYS_FILE, "r") as f:
+                    _holidays = {datetime.date.fromisoformat(d) for d in json.load(f)}
+            except (OSError, ValueError):
+                _holidays = set()
+            if not any(d.year == now_ist().year for d in _holidays):
+                try:
+                    _holidays = refresh_holidays() or _holidays
+                except Exception as e:
+                    print(f"[!] No NSE holidays for {now_ist().year} in {HOLIDAYS_FILE} and the refresh failed ({e}); "
+                          "every weekday is treated as a trading day", file=sys.stderr)
+    return _holidays
+
+def now_ist():
+    return datetime.datetime.now(IST)
+
+def to_ist(now):
+    if now is None: return now_ist()
+    if now.tzinfo is None: return now.replace(tzinfo=IST)
+    return now.astimezone(IST)
+
+def is_trading_day(day):
+    return day.weekday() < 5 and day not in load_holidays()
+
+def is_market_open(now=None):
+    now = to_ist(now)
+    return is_trading_day(now.date()) and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+def last_session_close(now=None):
+    """Close time of the most recent session that has already finished."""
+    now = to_ist(now)
+    day = now.date()
+    if now.time() < MARKET_CLOSE: day -= datetime.timedelta(days=1)
+    while not is_trading_day(day): day -= datetime.timedelta(days=1)
+    return datetime.datetime.combine(day, MARKET_CLOSE, tzinfo=IST)
+
+def next_session_open(now=None):
+    """Open time of the next session that has not started yet (or now, if the market is open)."""
+    now = to_ist(now)
+    if is_market_open(now): return now
+    day = now.date()
+    if now.time() >= MARKET_OPEN: day += datetime.timedelta(days=1)
+    while not is_trading_day(day): day += datetime.timedelta(days=1)
+    return datetime.datetime.combine(day, MARKET_OPEN, tzinfo=IST)
+
+if __name__ == "__main__":
+    print(f"[*] {len(refresh_holidays())} NSE holidays written to {HOLIDAYS_FILE}", file=sys.stderr)
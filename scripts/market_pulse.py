@@ -1,45 +1,171 @@
 import os
-import json
+import sys
+import time
+import argparse
 import datetime
-import yfinance as yf # Standard for fetching market data
+from collections import deque
+import pandas as pd
+import data_provider
+import market_calendar
+from storage import atomic_write_json
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+PULSE_FILE = os.path.join(DATA_DIR, "daily_pulse.json")
+
+# NSE and BSE Indices
+TICKERS = {
+    "NIFTY_50": "^NSEI",
+    "SENSEX": "^BSESN",
+    "SILVER_MCX": "SILVER1!", # Typical MCX Future ticker on many platforms
+    "MCX_STOCK": "MCX.NS"    # Multi Commodity Exchange of India Ltd.
+}
+
+BUFFER_SIZE = 390       # Ticks kept per instrument (a full session at one per minute)
+POLL_SECONDS = 60       # Tick interval while the market is open
+CLOSED_POLL_SECONDS = 1800  # Longest sleep while closed (woken early for the next open)
+MAX_ERROR_BACKOFF = 900
+TREND_ALPHA = 0.2       # Smoothing of the tick EMA that decides the trend
+
+def fetch_closes(tickers=TICKERS):
+    """Latest and previous close for every instrument in a single batched request.
+
+    During the session the last daily bar is the running one, so its close is the live price.
+    """
+    raw = data_provider.get().download(list(tickers.values()), "5d", auto_adjust=False)
+    out = {}
+    for name, symbol in tickers.items():
+        try:
+            closes = raw[symbol]["Close"].dropna() if isinstance(raw.columns, pd.MultiIndex) else raw["Close"].dropna()
+        except KeyError:
+            out[name] = {"error": f"no data for {symbol}"}
+            continue
+        if len(closes) < 2:
+            out[name] = {"error": f"no data for {symbol}"}
+            continue
+        out[name] = {"price": float(closes.iloc[-1]), "prev_close": float(closes.iloc[-2])}
+    return out
 
 def fetch_market_pulse():
     """Fetches basic data for Indian Market Indices and key commodities."""
-    # NSE and BSE Indices
-    tickers = {
-        "NIFTY_50": "^NSEI",
-        "SENSEX": "^BSESN",
-        "SILVER_MCX": "SILVER1!", # Typical MCX Future ticker on many platforms
-        "MCX_STOCK": "MCX.NS"    # Multi Commodity Exchange of India Ltd.
-    }
-    
     report = {
         "timestamp": datetime.datetime.now().isoformat(),
-        "market_status": "Closed" if datetime.datetime.now().hour > 15 or datetime.datetime.now().hour < 9 else "Open",
+        "market_status": "Open" if market_calendar.is_market_open() else "Closed",
         "data": {}
     }
-
-    for name, symbol in tickers.items():
-        try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="5d")
-            if not hist.empty:
-                last_price = hist['Close'].iloc[-1]
-                prev_price = hist['Close'].iloc[-2]
-                change = ((last_price - prev_price) / prev_price) * 100
-                report["data"][name] = {
-                    "price": round(last_price, 2),
-                    "change_pct": round(change, 2),
-                    "trend": "Up" if change > 0 else "Down"
-                }
-        except Exception as e:
-            report["data"][name] = {"error": str(e)}
-            
+    try:
+        closes = fetch_closes()
+    except Exception as e:
+        return {**report, "data": {name: {"error": str(e)} for name in TICKERS}}
+    for name, c in closes.items():
+        if "error" in c:
+            report["data"][name] = c
+            continue
+        change = ((c["price"] - c["prev_close"]) / c["prev_close"]) * 100
+        report["data"][name] = {
+            "price": round(c["price"], 2),
+            "change_pct": round(change, 2),
+            "trend": "Up" if change > 0 else "Down"
+        }
     return report
 
+class PulseMonitor:
+    """Fixed-size tick history per instrument with O(1) change and trend updates per tick."""
+    def __init__(self, tickers=TICKERS, size=BUFFER_SIZE):
+        self.tickers = dict(tickers)
+        self.buffers = {name: deque(maxlen=size) for name in self.tickers}
+        self.state = {name: {} for name in self.tickers}
+
+    def update(self, closes, ts=None):
+        ts = ts or datetime.datetime.now().isoformat(timespec="seconds")
+        for name, c in closes.items():
+            st = self.state.setdefault(name, {})
+            if "error" in c:
+                st["error"] = c["error"]
+                continue
+            price, prev_close = c["price"], c["prev_close"]
+            last = st.get("price")
+            ema = st.get("ema")
+            st.update({
+                "price": price,
+                "prev_close": prev_close,
+                "change_pct": (price - prev_close) / prev_close * 100,
+                "tick_change_pct": (price - last) / last * 100 if last else 0.0,
+                "ema": price if ema is None else ema + TREND_ALPHA * (price - ema),
+                "error": None,
+            })
+            self.buffers.setdefault(name, deque(maxlen=BUFFER_SIZE)).append((ts, round(price, 2)))
+
+    def snapshot(self):
+        data = {}
+        for name, st in self.state.items():
+            if "price" not in st:
+                data[name] = {"error": st.get("error", "no data yet")}
+                continue
+            # Session direction from the close, intraday direction from price vs its tick EMA
+            data[name] = {
+                "price": round(st["price"], 2),
+                "change_pct": round(st["change_pct"], 2),
+                "trend": "Up" if st["change_pct"] > 0 else "Down",
+                "intraday_trend": "Up" if st["price"] >= st["ema"] else "Down",
+                "tick_change_pct": round(st["tick_change_pct"], 3),
+                "ticks": list(self.buffers[name]),
+            }
+            if st.get("error"): data[name]["error"] = st["error"]
+        return {"timestamp": datetime.datetime.now().isoformat(),
+                "market_status": "Open" if market_calendar.is_market_open() else "Closed",
+                "data": data}
+
+    def publish(self, path=PULSE_FILE):
+        snap = self.snapshot()
+        atomic_write_json(snap, path)
+        return snap
+
+def stream(path=PULSE_FILE, interval=POLL_SECONDS, max_ticks=None):
+    """Polls on a schedule and republishes the snapshot after every tick.
+
+    Outside trading hours it sleeps until the next session opens (in chunks of
+    at most CLOSED_POLL_SECONDS); failed ticks back off exponentially.
+    """
+    monitor = PulseMonitor()
+    ticks = errors = 0
+    while max_ticks is None or ticks < max_ticks:
+        now = market_calendar.now_ist()
+        open_now = market_calendar.is_market_open(now)
+        if open_now or ticks == 0:
+            try:
+                monitor.update(fetch_closes(monitor.tickers))
+                monitor.publish(path)
+                errors = 0
+            except Exception as e:
+                errors += 1
+                print(f"[!] Pulse tick failed ({errors} in a row): {e}", file=sys.stderr)
+            ticks += 1
+        if errors:
+            delay = min(MAX_ERROR_BACKOFF, interval * 2 ** errors)
+        elif open_now:
+            delay = interval
+        else:
+            until_open = (market_calendar.next_session_open(now) - now).total_seconds()
+            delay = max(interval, min(CLOSED_POLL_SECONDS, until_open))
+            print(f"[*] Market closed; next check in {delay / 60:.0f} min", file=sys.stderr)
+        if max_ticks is not None and ticks >= max_ticks: break
+        time.sleep(delay)
+    return monitor
+
 if __name__ == "__main__":
-    pulse = fetch_market_pulse()
-    output_path = "market_oracle/data/daily_pulse.json"
-    with open(output_path, "w") as f:
-        json.dump(pulse, f, indent=2)
-    print(f"Market Pulse saved to {output_path}")
+    ap = argparse.ArgumentParser(description="Index and commodity pulse.")
+    ap.add_argument("--stream", action="store_true", help="keep polling and publishing while the market is open")
+    ap.add_argument("--interval", type=int, default=POLL_SECONDS)
+    args = ap.parse_args()
+    if args.stream:
+        try:
+            stream(interval=args.interval)
+        except KeyboardInterrupt:
+            pass
+    else:
+        pulse = fetch_market_pulse()
+        atomic_write_json(pulse, PULSE_FILE)
+        print(f"Market Pulse saved to {PULSE_FILE}")
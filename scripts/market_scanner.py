@@ -1,37 +1,78 @@
-import yfinance as yf
 import pandas as pd
-import pandas_ta as ta
 import json
 import os
 import datetime
-import re
 import sys
 import contextlib
-from nsepython import nse_eq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import data_client
+import data_provider
+import metrics
+import price_cache
+import fundamentals_cache
+import indicators
+import sentiment_engine
+import entity_sentiment
+import storage
+import scoring
+import calibration
+import screener
+import strategies
+import snapshots
 
-# --- Configuration ---
-BASE_DIR = "/Users/abhisheksonkar/Project/gemini personality"
-DATA_DIR = os.path.join(BASE_DIR, "market_oracle/data")
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
 SCAN_RESULTS_FILE = os.path.join(DATA_DIR, "scan_results.json")
-PORTFOLIO_FILE = os.path.join(DATA_DIR, "portfolio.json")
 PREDICTION_LOG_FILE = os.path.join(DATA_DIR, "prediction_log.json")
-HISTORY_FILE = os.path.join(DATA_DIR, "historical_predictions.json")
 LATEST_NEWS_FILE = os.path.join(DATA_DIR, "latest_news.json")
 WATCHLIST_FILE = os.path.join(DATA_DIR, "watchlist.json")
+SCAN_ERRORS_FILE = os.path.join(DATA_DIR, "scan_errors.json")
+PIPELINE_LOCK_PATH = os.path.join(DATA_DIR, "pipeline")  # pipeline.lock: one portfolio-writing run at a time
 
-STARTING_CASH = 100000.0
+STARTING_CASH = scoring.STARTING_CASH
 DEFAULT_TICKERS = ["RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "SBIN.NS", "MCX.NS", "SILVERBEES.NS", "BSE.NS"]
 
+# --- Concurrency ---
+SCAN_WORKERS = 8        # Parallel analyze_ticker calls
+TICKER_TIMEOUT = 60.0   # Seconds a single symbol may run before it is reported as timed out
+
+_silenced = threading.local()
+
+class _StdoutRouter:
+    """Stands in for sys.stdout and sends writes from silenced threads to stderr."""
+    def __init__(self, stdout):
+        self._stdout = stdout
+
+    def _target(self):
+        return sys.stderr if getattr(_silenced, "depth", 0) else self._stdout
+
+    def write(self, s):
+        return self._target().write(s)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
 @contextlib.contextmanager
 def silence_stdout():
-    """Redirects stdout to stderr to prevent breaking JSON output."""
-    new_target = sys.stderr
-    old_target = sys.stdout
-    sys.stdout = new_target
+    """Redirects stdout to stderr to prevent breaking JSON output.
+
+    The redirect is per thread, so scan workers (including ones abandoned after
+    a timeout) never swallow output printed by the main thread.
+    """
+    if not isinstance(sys.stdout, _StdoutRouter):
+        sys.stdout = _StdoutRouter(sys.stdout)
+    _silenced.depth = getattr(_silenced, "depth", 0) + 1
     try:
-        yield new_target
+        yield sys.stderr
     finally:
-        sys.stdout = old_target
+        _silenced.depth -= 1
 
 def load_json(file_path, default=None):
     if os.path.exists(file_path):
@@ -42,43 +83,47 @@ def load_json(file_path, default=None):
     return default
 
 def save_json(data, file_path):
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
-
-def get_news_sentiment():
-    news = load_json(LATEST_NEWS_FILE)
-    if not news or 'categories' not in news: return 0
-    score = 0
-    text_blob = ""
-    for items in news['categories'].values():
-        if isinstance(items, list):
-            for item in items:
-                if isinstance(item, dict):
-                    text_blob += f" {item.get('title', '')} {item.get('snippet', '')}".lower()
-    pos = ['surge', 'growth', 'bullish', 'profit', 'high', 'recovery', 'stable', 'uptick']
-    neg = ['drop', 'crash', 'bearish', 'loss', 'war', 'crisis', 'decline', 'inflation']
-    for w in pos: score += len(re.findall(w, text_blob))
-    for w in neg: score -= len(re.findall(w, text_blob))
-    return round(max(-15, min(15, score / 3)), 2)
+    storage.atomic_write_json(data, file_path)
+
+def get_symbol_sentiment(symbols, news=None):
+    """(market bias, {symbol: bias}): news about no listed symbol moves all of them, news linked
+    to a company (by name, shortName or alias) only moves that symbol."""
+    news = news or load_json(LATEST_NEWS_FILE)
+    articles = [item for items in (news or {}).get('categories', {}).values() if isinstance(items, list)
+                for item in items if isinstance(item, dict)]
+    return entity_sentiment.symbol_bias(symbols, articles)
+
+def _load_info(symbol):
+    with silence_stdout(), metrics.span("fetch.info"):
+        return data_provider.get().info(symbol)
+
+def _load_nse_meta(clean_sym):
+    with silence_stdout(), metrics.span("fetch.nse_eq"):
+        return data_provider.get().nse_eq(clean_sym).get('metadata', {})
+
+def get_info(symbol):
+    """yfinance .info for symbol, shared through the fundamentals cache."""
+    return fundamentals_cache.get("info", symbol, _load_info)
 
 def get_fundamental_score(symbol):
     """Calculates a fundamental score (0-100) using yfinance and nsepython."""
-    with silence_stdout():
+    with silence_stdout(), metrics.span("fundamentals"):
         try:
             # 1. Clean symbol for NSE
-            clean_sym = symbol.replace(".NS", "")
+            clean_sym = screener.nse_symbol(symbol)
             
             # 2. Get Sector PE from NSE
             sector_pe = 20 # Default
             try:
-                meta = nse_eq(clean_sym).get('metadata', {})
+                meta = fundamentals_cache.get("nse_meta", clean_sym, _load_nse_meta)
                 sector_pe = meta.get('pdSectorPe', 20)
-            except: pass
+            except data_client.Throttled:
+                raise
+            except Exception as e:
+                metrics.error("nse_meta", e)
             
             # 3. Get Key Metrics from yfinance
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = get_info(symbol)
             
             pe = info.get('forwardPE') or info.get('trailingPE') or 30
             roe = info.get('returnOnEquity', 0)
@@ -109,67 +154,55 @@ def get_fundamental_score(symbol):
                 "roe_pct": round(roe * 100, 2),
                 "debt_to_equity": round(debt_to_eq, 2)
             }
-        except:
+        except data_client.FetchError:
+            raise  # Throttled or unreachable: fail the symbol rather than invent a neutral score
+        except Exception as e:
+            metrics.error("fundamentals", e)
             return {"score": 50, "pe": "N/A", "sector_pe": "N/A", "roe_pct": "N/A", "debt_to_equity": "N/A"}
 
-def analyze_ticker(symbol, rsi_buy_thresh, rsi_sell_thresh, sentiment_bias):
+def analyze_ticker(symbol, rsi_buy_thresh, rsi_sell_thresh, sentiment_bias, raise_errors=False, weights=None):
+    """Scores one symbol. With raise_errors the failure reason is raised instead of logged."""
     try:
         if symbol.isdigit(): symbol = f"{symbol}.BO"
         
-        with silence_stdout():
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period="1y")
+        with silence_stdout(), metrics.span("history"):
+            df = price_cache.get_history(symbol)
             
-        if df is None or len(df) < 30: return None
+        if df is None or len(df) < 30:
+            if raise_errors: raise ValueError(f"insufficient history ({0 if df is None else len(df)} bars)")
+            return None
             
-        df.ta.rsi(append=True)
-        df.ta.macd(append=True)
-        df.ta.bbands(append=True)
-        
-        cols = df.columns
-        bb_upper_col = [c for c in cols if 'BBU' in c][0]
-        bb_lower_col = [c for c in cols if 'BBL' in c][0]
-        rsi_col = [c for c in cols if 'RSI' in c][0]
-        macd_col = [c for c in cols if 'MACD_' in c and not 's_' in c and not 'h_' in c][0]
-        macds_col = [c for c in cols if 'MACDs_' in c][0]
+        with metrics.span("indicators"):
+            ind = indicators.latest(df['Close'].to_numpy())
         
         last_row = df.iloc[-1]
         price = round(last_row['Close'], 2)
-        rsi = last_row[rsi_col]
-        macd = last_row[macd_col]
-        macd_s = last_row[macds_col]
+        rsi = ind['rsi']
+        macd = ind['macd']
+        macd_s = ind['macd_signal']
         
         # Technical Score (0-100)
-        t_score = 50
-        if rsi < rsi_buy_thresh: t_score += 25
-        elif rsi > rsi_sell_thresh: t_score -= 25
-        if macd > macd_s: t_score += 10
-        else: t_score -= 10
+        t_score = int(scoring.technical_score(rsi, macd, macd_s, rsi_buy_thresh, rsi_sell_thresh))
         
         # Fundamental Score
         f_data = get_fundamental_score(symbol)
         f_score = f_data['score']
         
         # Master Oracle Score
-        # 40% Technical, 30% Sentiment, 30% Fundamental
-        master_score = (t_score * 0.4) + (50 + sentiment_bias * 2) * 0.3 + (f_score * 0.3)
+        # 40% Technical, 30% Sentiment, 30% Fundamental unless calibration has found better weights
+        master_score = float(scoring.master_score(t_score, sentiment_bias, f_score, weights))
+        action, priority = scoring.classify(master_score)
         
-        action = "HOLD"
-        if master_score > 65: action = "BUY"
-        elif master_score < 35: action = "SELL"
-
-        priority = "HIGH" if master_score >= 75 or master_score <= 25 else "MEDIUM" if master_score >= 60 or master_score <= 40 else "LOW"
-        
-        target_price = round(last_row[bb_upper_col] if action == "BUY" else price * 0.95, 2)
-        stop_loss = round(last_row[bb_lower_col] if action == "BUY" else price * 1.05, 2)
+        target_price = round(ind['bb_upper'] if action == "BUY" else price * 0.95, 2)
+        stop_loss = round(ind['bb_lower'] if action == "BUY" else price * 1.05, 2)
         if action == "BUY" and target_price <= price: target_price = round(price * 1.05, 2)
         if action == "SELL" and target_price >= price: target_price = round(price * 0.95, 2)
         
         profit_pct = round(((target_price - price) / price) * 100, 2) if action == "BUY" else round(((price - target_price) / price) * 100, 2)
         loss_pct = round(((price - stop_loss) / price) * 100, 2) if action == "BUY" else round(((stop_loss - price) / price) * 100, 2)
 
-        with silence_stdout():
-            short_name = ticker.info.get('shortName', symbol)
+        with silence_stdout(), metrics.span("info"):
+            short_name = get_info(symbol).get('shortName', symbol)
 
         return {
             "symbol": symbol,
@@ -180,38 +213,151 @@ def analyze_ticker(symbol, rsi_buy_thresh, rsi_sell_thresh, sentiment_bias):
             "rsi": round(rsi, 2),
             "score": round(master_score, 2),
             "fundamentals": f_data,
+            "components": {"technical": t_score, "macd_bullish": bool(macd > macd_s), "sentiment_bias": sentiment_bias, "fundamental": f_score},
             "potential_profit_pct": max(0, profit_pct),
             "potential_loss_pct": max(0, loss_pct),
             "timestamp": datetime.datetime.now().isoformat()
         }
     except Exception as e:
+        if raise_errors: raise
+        metrics.error("analyze", e, symbol)
         print(f"Error analyzing {symbol}: {e}", file=sys.stderr)
         return None
 
-def run_pipeline(custom_tickers=None):
-    python_exe = sys.executable
-    os.system(f'"{python_exe}" "{os.path.join(os.path.dirname(__file__), "sentiment_engine.py")}" > /dev/null 2>&1')
-    
-    sentiment_bias = get_news_sentiment()
-    portfolio = load_json(PORTFOLIO_FILE, {"cash": 100000.0, "invested": 0.0, "total_value": 100000.0, "holdings": {}, "total_profit_loss": 0.0, "trade_history": []})
-    pred_log = load_json(PREDICTION_LOG_FILE, {"buy_rsi_threshold": 30.0, "sell_rsi_threshold": 70.0, "accuracy_score": 50.0})
-    
-    target_tickers = custom_tickers if custom_tickers else load_json(WATCHLIST_FILE, DEFAULT_TICKERS)
-    current_scan = [res for s in target_tickers if (res := analyze_ticker(s, pred_log["buy_rsi_threshold"], pred_log["sell_rsi_threshold"], sentiment_bias))]
+def scan_tickers(symbols, rsi_buy_thresh, rsi_sell_thresh, sentiment_bias, workers=SCAN_WORKERS, timeout=TICKER_TIMEOUT, progress=None, weights=None):
+    """Runs analyze_ticker over symbols on a bounded thread pool.
+
+    sentiment_bias is one bias for every symbol or a {symbol: bias} mapping
+    (symbols missing from it score a neutral 0).
+
+    Returns (results, errors): results keep the input order (failed symbols are
+    dropped) and errors maps each failed symbol to its reason. The timeout is
+    counted from the moment a worker picks the symbol up, so queued symbols are
+    never penalised for a slow neighbour. A timed-out call cannot be killed; its
+    thread is abandoned and its late result ignored. progress, if given, is
+    called as progress("scan", finished, total) after every symbol.
+    """
+    symbols = list(symbols)
+    slots = [None] * len(symbols)
+    errors = {}
+    started = {}
+
+    def task(idx, sym):
+        started[idx] = time.monotonic()
+        with metrics.symbol(sym):
+            bias = sentiment_bias.get(sym, 0) if isinstance(sentiment_bias, dict) else sentiment_bias
+            return analyze_ticker(sym, rsi_buy_thresh, rsi_sell_thresh, bias, raise_errors=True, weights=weights)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="scan")
+    futures = {pool.submit(task, i, s): i for i, s in enumerate(symbols)}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx = futures[fut]
+                try:
+                    slots[idx] = fut.result()
+                except Exception as e:
+                    errors[symbols[idx]] = f"{type(e).__name__}: {e}"
+                    metrics.error("analyze", e, symbols[idx])
+            now = time.monotonic()
+            for fut in list(pending):
+                idx = futures[fut]
+                if idx in started and now - started[idx] > timeout:
+                    errors[symbols[idx]] = f"Timeout: no result after {timeout:.0f}s"
+                    metrics.error("timeout", TimeoutError(errors[symbols[idx]]), symbols[idx])
+                    pending.discard(fut)
+            if progress: progress("scan", len(symbols) - len(pending), len(symbols))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    for sym, reason in errors.items():
+        print(f"Error analyzing {sym}: {reason}", file=sys.stderr)
+    return [r for r in slots if r], errors
+
+def load_pred_log():
+    return load_json(PREDICTION_LOG_FILE, {"buy_rsi_threshold": 30.0, "sell_rsi_threshold": 70.0, "accuracy_score": 50.0})
+
+def run_pipeline(custom_tickers=None, workers=SCAN_WORKERS, timeout=TICKER_TIMEOUT, progress=None, screen=False, profile=None,
+                 select=None, sync_news=True):
+    """Full sync: news, scan, paper trades and persistence (scan only for custom_tickers).
+
+    With screen=True the watchlist is replaced by the universe screener's
+    candidates (plus current holdings, so exits are still evaluated).
+
+    select(symbols, symbol_bias, pred_log) -> (symbols to score, results to reuse)
+    restricts the scan to symbols whose inputs changed; only their predictions
+    are recorded. When it leaves nothing to score the run stops there and
+    writes nothing. With sync_news=False the last saved news is used.
+
+    progress(stage, done, total) is reported for the "news", "scan" and "portfolio" stages.
+    Stage timings, cache counters and per-symbol failures go to data/metrics/run_<id>.json;
+    profile=True (or ORACLE_PROFILE=1) also dumps a cProfile file next to it.
+
+    Runs that trade hold data/pipeline.lock from loading the portfolio to
+    recording it, so the scanner service and the scheduler take turns
+    instead of overwriting each other's trades.
+    """
+    with contextlib.nullcontext() if custom_tickers else storage.exclusive(PIPELINE_LOCK_PATH):
+        metrics.start_run("custom" if custom_tickers else "incremental" if select else "screen" if screen else "sync", profile)
+        current_scan, scan_errors, scored = [], {}, None
+        try:
+            current_scan, scan_errors, scored = _run_pipeline(custom_tickers, workers, timeout, progress, screen, select, sync_news)
+        finally:
+            if scored == 0:
+                metrics.discard_run()
+            else:
+                summary = metrics.finish_run(scanned=len(current_scan) + len(scan_errors), failed=len(scan_errors))
+                if summary and summary["profile"]:
+                    print(f"[*] Profile written to {summary['profile']}", file=sys.stderr)
+    return current_scan
+
+def _run_pipeline(custom_tickers, workers, timeout, progress, screen, select=None, sync_news=True):
+    """Returns (scan, errors, number of symbols scored this run)."""
+    news = None
+    if sync_news:
+        if progress: progress("news", 0, 1)
+        try:
+            with silence_stdout(), metrics.span("news"):
+                news = sentiment_engine.run_sentiment_pipeline()
+        except Exception as e:
+            metrics.error("news", e)
+            print(f"[!] News sync failed, falling back to the last saved news: {e}", file=sys.stderr)
+
+    portfolio = storage.load_portfolio()
+    pred_log = load_pred_log()
     
+    if custom_tickers:
+        target_tickers = custom_tickers
+    elif screen:
+        if progress: progress("screen", 0, 1)
+        with metrics.span("screen"):
+            target_tickers, _ = screener.screen(rsi_buy=pred_log["buy_rsi_threshold"], rsi_sell=pred_log["sell_rsi_threshold"],
+                                                always=list(portfolio.get("holdings", {})))
+    else:
+        target_tickers = load_json(WATCHLIST_FILE, DEFAULT_TICKERS)
+    with metrics.span("news_sentiment"):
+        sentiment_bias, symbol_bias = get_symbol_sentiment(target_tickers, news)
+    to_score, reused = (target_tickers, []) if select is None else select(target_tickers, symbol_bias, pred_log)
+    if select is not None and not to_score: return reused, {}, 0
+    metrics.count("scan.reused", len(reused))
+    with metrics.span("scan"):
+        scored, scan_errors = scan_tickers(to_score, pred_log["buy_rsi_threshold"], pred_log["sell_rsi_threshold"], symbol_bias, workers=workers, timeout=timeout, progress=progress, weights=pred_log.get("weights"))
+    order = {s: i for i, s in enumerate(target_tickers)}
+    current_scan = sorted(reused + scored, key=lambda x: order.get(x["symbol"], len(order)))
+
     if not custom_tickers:
-        history = load_json(HISTORY_FILE, [])
-        history.append({"date": datetime.datetime.now().isoformat(), "predictions": current_scan, "sentiment_bias": sentiment_bias})
-        save_json(history[-10:], HISTORY_FILE)
-        
+        if progress: progress("portfolio", 0, 1)
         holdings = portfolio.get("holdings", {})
         cash = portfolio.get("cash", STARTING_CASH)
-        trade_history = portfolio.get("trade_history", [])
+        trade_history = []  # Only this run's trades; storage keeps the full ledger
+        by_symbol = {x["symbol"]: x for x in current_scan}
         
         for symbol, h in list(holdings.items()):
-            curr = next((x for x in current_scan if x["symbol"] == symbol), None)
+            curr = by_symbol.get(symbol)
             if not curr: continue
-            if curr["action"] == "SELL" or curr["price"] < h["avg_price"] * 0.95 or curr["price"] > h["avg_price"] * 1.15:
+            if curr["action"] == "SELL" or curr["price"] < h["avg_price"] * scoring.STOP_LOSS or curr["price"] > h["avg_price"] * scoring.TAKE_PROFIT:
                 val = h["qty"] * curr["price"]
                 cash += val
                 trade_history.append({"date": datetime.datetime.now().isoformat(), "type": "SELL", "symbol": symbol, "qty": h["qty"], "price": curr["price"], "profit": round(val - (h["qty"] * h["avg_price"]), 2)})
@@ -219,27 +365,54 @@ def run_pipeline(custom_tickers=None):
 
         for item in current_scan:
             if item["action"] == "BUY" and item["priority"] == "HIGH" and item["symbol"] not in holdings:
-                alloc = cash * 0.20
-                if alloc > 2000:
+                alloc = cash * scoring.ALLOCATION
+                if alloc > scoring.MIN_ALLOCATION:
                     qty = int(alloc / item["price"])
                     if qty > 0:
                         cash -= (qty * item["price"])
                         holdings[item["symbol"]] = {"qty": qty, "avg_price": item["price"], "date_bought": datetime.datetime.now().isoformat()}
                         trade_history.append({"date": datetime.datetime.now().isoformat(), "type": "BUY", "symbol": item["symbol"], "qty": qty, "price": item["price"]})
 
-        current_inv = sum(h['qty']*next((x['price'] for x in current_scan if x['symbol']==s), h['avg_price']) for s, h in holdings.items())
-        portfolio.update({"cash": round(cash, 2), "invested": round(current_inv, 2), "total_value": round(cash + current_inv, 2), "holdings": holdings, "total_profit_loss": round((cash + current_inv) - STARTING_CASH, 2), "trade_history": trade_history})
+        current_inv = sum(h['qty'] * (by_symbol[s]['price'] if s in by_symbol else h['avg_price']) for s, h in holdings.items())
+        portfolio.update({"cash": round(cash, 2), "invested": round(current_inv, 2), "total_value": round(cash + current_inv, 2), "holdings": holdings, "total_profit_loss": round((cash + current_inv) - STARTING_CASH, 2)})
         
+        # Run, predictions, trades and portfolio commit together or not at all
+        with metrics.span("record_run"):
+            run_id = storage.record_run(scored, portfolio, trade_history, sentiment_bias)
+        try:
+            with metrics.span("strategies"):
+                strategies.run(current_scan)
+        except Exception as e:
+            metrics.error("strategies", e)
+            print(f"[!] Strategy books not updated: {e}", file=sys.stderr)
+        try:
+            with metrics.span("snapshot"):
+                snapshots.write(current_scan, run_id)
+        except Exception as e:
+            metrics.error("snapshot", e)
+            print(f"[!] Scan snapshot not written: {e}", file=sys.stderr)
         save_json(current_scan, SCAN_RESULTS_FILE)
-        save_json(portfolio, PORTFOLIO_FILE)
-        save_json(pred_log, PREDICTION_LOG_FILE)
-        print(f"[*] Pipeline Complete. Value: ₹{portfolio['total_value']}", file=sys.stderr)
+        save_json({"date": datetime.datetime.now().isoformat(), "scanned": len(target_tickers), "failed": len(scan_errors), "errors": scan_errors}, SCAN_ERRORS_FILE)
+        try:
+            with metrics.span("calibration"):
+                cal = calibration.calibrate(pred_log_file=PREDICTION_LOG_FILE)
+            print(f"[*] Calibration: {cal['status']} ({cal['samples']} evaluated, {cal['pending']} pending)", file=sys.stderr)
+        except Exception as e:
+            metrics.error("calibration", e)
+            print(f"[!] Calibration failed: {e}", file=sys.stderr)
+        print(f"[*] Pipeline Complete. Value: ₹{portfolio['total_value']} ({len(current_scan)} scored, {len(scan_errors)} failed)", file=sys.stderr)
+        print(f"[*] Fundamentals cache: {fundamentals_cache.stats()}", file=sys.stderr)
         
-    return current_scan
+    return current_scan, scan_errors, len(scored)
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        results = run_pipeline(custom_tickers=sys.argv[1:])
+    args = sys.argv[1:]
+    profile = "--profile" in args or None
+    args = [a for a in args if a != "--profile"]
+    if args == ["--screen"]:
+        run_pipeline(screen=True, profile=profile)
+    elif args:
+        results = run_pipeline(custom_tickers=args, profile=profile)
         print(json.dumps(results, indent=2))
     else:
-        run_pipeline()
+        run_pipeline(profile=profile)
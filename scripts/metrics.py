@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import glob
+import time
+import cProfile
+import pstats
+import datetime
+import threading
+import contextlib
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+METRICS_DIR = os.path.join(DATA_DIR, "metrics")
+
+PROFILE = os.environ.get("ORACLE_PROFILE", "") not in ("", "0")  # Default for start_run(profile=None)
+MAX_RUN_FILES = 200     # Older metrics/profile files are pruned when a run finishes
+MAX_ERROR_CHARS = 300
+PER_THREAD_PROFILERS = sys.version_info < (3, 12)   # 3.12+ allows one active profiler, covering all threads
+
+_lock = threading.Lock()
+_local = threading.local()
+_run = None
+
+def _new_run(kind, profile):
+    now = datetime.datetime.now()
+    return {"run_id": now.strftime("%Y%m%d_%H%M%S_%f"), "kind": kind, "started": now.isoformat(),
+            "t0": time.perf_counter(), "stages": {}, "counters": {}, "symbols": {},
+            "profile": profile, "profilers": []}
+
+def start_run(kind="sync", profile=None):
+    """Starts collecting. Spans and counters outside a run are ignored."""
+    global _run
+    with _lock:
+        _run = _new_run(kind, PROFILE if profile is None else profile)
+    if _run["profile"]: _start_profiler()
+
+def active():
+    return _run is not None
+
+def _symbol_entry(run, sym):
+    return run["symbols"].setdefault(sym, {"total_ms": 0.0, "stages": {}, "counters": {}, "errors": []})
+
+def _record(name, ms):
+    run, sym = _run, getattr(_local, "symbol", None)
+    if run is None: return
+    with _lock:
+        s = run["stages"].setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        s["count"] += 1
+        s["total_ms"] += ms
+        s["max_ms"] = max(s["max_ms"], ms)
+        if sym:
+            st = _symbol_entry(run, sym)["stages"]
+            st[name] = st.get(name, 0.0) + ms
+
+@contextlib.contextmanager
+def span(name):
+    """Times the enclosed block under `name` (and under the current symbol, if any)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, (time.perf_counter() - t0) * 1000)
+
+def count(name, n=1):
+    """Adds n to a run-wide counter and to the current symbol's counter."""
+    run, sym = _run, getattr(_local, "symbol", None)
+    if run is None: return
+    with _lock:
+        run["counters"][name] = run["counters"].get(name, 0) + n
+        if sym:
+            c = _symbol_entry(run, sym)["counters"]
+            c[name] = c.get(name, 0) + n
+
+def error(stage, exc, symbol=None):
+    """Counts a failure and keeps its message, instead of it only reaching stderr."""
+    count(f"failure.{stage}")
+    run, sym = _run, symbol or getattr(_local, "symbol", None)
+    if run is None or not sym: return
+    with _lock:
+        _symbol_entry(run, sym)["errors"].append(f"{stage}: {type(exc).__name__}: {exc}"[:MAX_ERROR_CHARS])
+
+@contextlib.contextmanager
+def symbol(sym):
+    """Attributes spans and counters in this thread to sym and times it as a whole.
+
+    With profiling on, before Python 3.12 the thread also gets its own
+    profiler: cProfile only sees the thread that enabled it, so worker
+    profiles are merged at the end. From 3.12 the run's profiler already sees
+    every thread, and a second one cannot be enabled.
+    """
+    prev = getattr(_local, "symbol", None)
+    _local.symbol = sym
+    prof = (_start_profiler() if _run and _run["profile"] and PER_THREAD_PROFILERS
+            and not getattr(_local, "profiler", None) else None)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        if prof:
+            prof.disable()
+            _local.profiler = None
+        _local.symbol = prev
+        run = _run
+        if run is not None:
+            with _lock:
+                _symbol_entry(run, sym)["total_ms"] += ms
+
+def _start_profiler():
+    prof = cProfile.Profile()
+    with _lock:
+        if _run is None: return None
+        _run["profilers"].append(prof)
+    try:
+        prof.enable()
+    except ValueError as e:
+        # Another profiler (or debugger) is already active; the run goes on unprofiled here
+        with _lock:
+            if _run is not None: _run["profilers"].remove(prof)
+        print(f"[!] Profiler not started: {e}", file=sys.stderr)
+        return None
+    _local.profiler = prof
+    return prof
+
+def discard_run():
+    """Stops collecting without writing anything (e.g. a scheduler cycle with nothing to do)."""
+    global _run
+    with _lock:
+        _run = None
+    prof = getattr(_local, "profiler", None)
+    if prof:
+        prof.disable()
+        _local.profiler = None
+
+def finish_run(path_dir=METRICS_DIR, **extra):
+    """Stops collecting and writes metrics/run_<id>.json (plus run_<id>.prof when profiling). Returns the summary."""
+    global _run
+    with _lock:
+        run, _run = _run, None
+    if run is None: return None
+    prof = getattr(_local, "profiler", None)
+    if prof:
+        prof.disable()
+        _local.profiler = None
+    os.makedirs(path_dir, exist_ok=True)
+    profile_file = None
+    stats = None
+    for p in run.pop("profilers"):
+        try:
+            if stats is None: stats = pstats.Stats(p)
+            else: stats.add(p)
+        except TypeError:
+            pass  # Nothing was collected (e.g. a worker abandoned before it started)
+    if stats is not None:
+        profile_file = os.path.join(path_dir, f"run_{run['run_id']}.prof")
+        stats.dump_stats(profile_file)
+    summary = {
+        "run_id": run["run_id"], "kind": run["kind"], "started": run["started"],
+        "finished": datetime.datetime.now().isoformat(),
+        "duration_ms": round((time.perf_counter() - run.pop("t0")) * 1000, 1),
+        "stages": {k: {"count": v["count"], "total_ms": round(v["total_ms"], 1), "max_ms": round(v["max_ms"], 1)}
+                   for k, v in sorted(run["stages"].items(), key=lambda kv: -kv[1]["total_ms"])},
+        "counters": dict(sorted(run["counters"].items())),
+        "symbols": {s: {"total_ms": round(v["total_ms"], 1), "stages": {k: round(ms, 1) for k, ms in v["stages"].items()},
+                        "counters": v["counters"], "errors": v["errors"]} for s, v in run["symbols"].items()},
+        "profile": profile_file,
+        **extra,
+    }
+    from storage import atomic_write_json  # storage imports this module
+    atomic_write_json(summary, os.path.join(path_dir, f"run_{run['run_id']}.json"))
+    _prune(path_dir)
+    return summary
+
+def _prune(path_dir, keep=MAX_RUN_FILES):
+    for pattern in ("run_*.json", "run_*.prof"):
+        for old in sorted(glob.glob(os.path.join(path_dir, pattern)))[:-keep]:
+            try: os.remove(old)
+            except OSError: pass
+
+def load_runs(limit=50, path_dir=METRICS_DIR):
+    """The newest `limit` run summaries, oldest first."""
+    runs = []
+    for path in sorted(glob.glob(os.path.join(path_dir, "run_*.json")))[-limit:]:
+        try:
+            with open(path, "r") as f:
+                runs.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"[!] Skipping unreadable metrics file {path}: {e}", file=sys.stderr)
+    return runs
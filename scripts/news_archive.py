@@ -0,0 +1,180 @@
+import os
+import re
+import sys
+import json
+import sqlite3
+import argparse
+import datetime
+import contextlib
+from sentiment_scorer import article_key
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+NEWS_DB_FILE = os.path.join(DATA_DIR, "news_archive.db")
+LEGACY_NEWS_DIR = os.path.join(DATA_DIR, "news_archive")   # One JSON snapshot per run, from before the archive DB
+
+SEARCH_LIMIT = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, url TEXT, title TEXT, snippet TEXT,
+    source TEXT, category TEXT, date TEXT NOT NULL, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1);
+CREATE INDEX IF NOT EXISTS articles_date ON articles(date);
+CREATE INDEX IF NOT EXISTS articles_source ON articles(source, date);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, snippet, content='articles', content_rowid='id', tokenize='porter unicode61');
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+END;
+CREATE TABLE IF NOT EXISTS imported_files (name TEXT PRIMARY KEY, articles INTEGER, imported_at TEXT);
+"""
+
+@contextlib.contextmanager
+def connect(db_path=NEWS_DB_FILE, legacy_dir=LEGACY_NEWS_DIR):
+    """Opens the archive, creating the schema and importing legacy per-run files on first use."""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        if not conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_files'").fetchone():
+            migrate_files(conn, legacy_dir)
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_files', ?)", (datetime.datetime.now().isoformat(),))
+        yield conn
+    finally:
+        conn.close()
+
+def _normalize_date(value, fallback):
+    """Article dates as naive UTC 'YYYY-MM-DDTHH:MM:SS', so they sort and range-filter as text."""
+    if value:
+        try:
+            d = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+            if d.tzinfo: d = d.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            return d.isoformat(timespec="seconds")
+        except ValueError:
+            pass
+    return fallback
+
+def ingest(conn, categories, seen_at=None):
+    """Adds {category: [article, ...]} to the archive. Returns {category: [articles not seen before]}.
+
+    An article already stored (same URL, or same title and snippet) only has its
+    last_seen and seen_count updated. seen_at (now by default) is stored as naive
+    UTC, like article dates; a naive seen_at is taken as local time.
+    """
+    seen_at = seen_at.astimezone(datetime.timezone.utc) if seen_at else datetime.datetime.now(datetime.timezone.utc)
+    seen_at = seen_at.replace(tzinfo=None).isoformat(timespec="seconds")
+    new = {}
+    with conn:
+        for cat, items in categories.items():
+            new[cat] = []
+            for item in items if isinstance(items, list) else []:
+                if not isinstance(item, dict): continue
+                key = article_key(item)
+                cur = conn.execute("""INSERT OR IGNORE INTO articles
+                    (key, url, title, snippet, source, category, date, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (key, item.get("url"), item.get("title"), item.get("snippet"), item.get("source"), cat,
+                     _normalize_date(item.get("date"), seen_at), seen_at, seen_at))
+                if cur.rowcount:
+                    new[cat].append(item)
+                else:
+                    conn.execute("""UPDATE articles SET seen_count = seen_count + 1, last_seen = MAX(last_seen, ?)
+                                    WHERE key = ?""", (seen_at, key))
+    return new
+
+def migrate_files(conn, legacy_dir=LEGACY_NEWS_DIR, remove=False):
+    """Ingests every news_*.json snapshot not imported yet, oldest first. Returns (files, new articles)."""
+    if not os.path.isdir(legacy_dir): return 0, 0
+    done = {r[0] for r in conn.execute("SELECT name FROM imported_files")}
+    files = added = 0
+    for name in sorted(os.listdir(legacy_dir)):
+        path = os.path.join(legacy_dir, name)
+        if not name.endswith(".json"): continue
+        if name not in done:
+            try:
+                with open(path, "r") as f:
+                    snap = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[!] Skipping unreadable news snapshot {name}: {e}", file=sys.stderr)
+                continue
+            try:
+                seen_at = datetime.datetime.fromisoformat(snap.get("timestamp", ""))
+            except ValueError:
+                seen_at = datetime.datetime.fromtimestamp(os.path.getmtime(path))
+            n = sum(map(len, ingest(conn, snap.get("categories", {}), seen_at).values()))
+            with conn:
+                conn.execute("INSERT INTO imported_files VALUES (?, ?, ?)", (name, n, datetime.datetime.now().isoformat()))
+            files, added = files + 1, added + n
+        if remove: os.remove(path)
+    if files: print(f"[*] News archive: imported {files} snapshot files ({added} unique articles)", file=sys.stderr)
+    return files, added
+
+def fts_query(text):
+    """Turns free text into an FTS5 query: every word must match; a trailing * keeps prefix search."""
+    terms = re.findall(r"[\w']+\*?", text or "")
+    return " ".join(f'"{t.rstrip("*")}"' + ("*" if t.endswith("*") else "") for t in terms)
+
+def search(conn, text=None, start=None, end=None, source=None, category=None, limit=SEARCH_LIMIT):
+    """Articles matching all words of `text` (best match first), or newest first without text.
+
+    start/end are inclusive dates; source matches exactly (case-insensitive).
+    """
+    where, args = [], []
+    if start: where, args = where + ["a.date >= ?"], args + [str(start)]
+    if end:
+        end = end + datetime.timedelta(days=1) if isinstance(end, datetime.date) else end
+        where, args = where + ["a.date < ?"], args + [str(end)]
+    if source: where, args = where + ["a.source = ? COLLATE NOCASE"], args + [source]
+    if category: where, args = where + ["a.category = ?"], args + [category]
+    match = fts_query(text)
+    if match:
+        q = ("SELECT a.*, bm25(articles_fts) AS rank FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+             "WHERE articles_fts MATCH ?" + "".join(f" AND {w}" for w in where) + " ORDER BY rank LIMIT ?")
+        args = [match] + args
+    else:
+        q = "SELECT a.* FROM articles a" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY a.date DESC LIMIT ?"
+    return [dict(r) for r in conn.execute(q, args + [int(limit)])]
+
+def articles_after(conn, last_id=0, start=None, until_id=None):
+    """Articles with id > last_id (and <= until_id), published on or after start, in id order."""
+    q, args = "SELECT id, key, url, title, snippet, source, category, date FROM articles WHERE id > ?", [last_id]
+    if until_id is not None: q, args = q + " AND id <= ?", args + [until_id]
+    if start: q, args = q + " AND date >= ?", args + [str(start)]
+    return [dict(r) for r in conn.execute(q + " ORDER BY id", args)]
+
+def sources(conn):
+    return [r[0] for r in conn.execute("SELECT DISTINCT source FROM articles WHERE source IS NOT NULL ORDER BY source")]
+
+def stats(conn):
+    row = conn.execute("SELECT COUNT(*), MIN(date), MAX(date), SUM(seen_count) FROM articles").fetchone()
+    files = conn.execute("SELECT COUNT(*) FROM imported_files").fetchone()[0]
+    return {"articles": row[0], "oldest": row[1], "newest": row[2], "sightings": row[3] or 0, "imported_files": files}
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Search the deduplicated news archive.")
+    ap.add_argument("text", nargs="?", help="keywords (all must match; word* for prefixes)")
+    ap.add_argument("--since", help="YYYY-MM-DD")
+    ap.add_argument("--until", help="YYYY-MM-DD")
+    ap.add_argument("--source")
+    ap.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    ap.add_argument("--migrate", action="store_true", help=f"import any snapshots in {LEGACY_NEWS_DIR} not imported yet")
+    ap.add_argument("--prune", action="store_true", help="with --migrate, delete snapshot files once imported")
+    args = ap.parse_args()
+    with connect() as conn:
+        if args.migrate:
+            migrate_files(conn, remove=args.prune)
+            print(json.dumps(stats(conn), indent=2))
+        else:
+            until = datetime.date.fromisoformat(args.until) if args.until else None
+            for a in search(conn, args.text, args.since, until, args.source, limit=args.limit):
+                print(f"{a['date'][:10]}  {a['source'] or '?':<20.20}  {a['title']}")
@@ -0,0 +1,190 @@
+import os
+import sys
+import sqlite3
+import datetime
+import pandas as pd
+import data_provider
+import metrics
+import market_calendar
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+PRICE_DB_FILE = os.path.join(DATA_DIR, "price_cache.db")
+
+HISTORY_DAYS = 365              # Window served to analyze_ticker (matches the old period="1y")
+INTRADAY_FRESH_SECONDS = 900    # While the market is open, reuse a fetch this young
+FULL_REFRESH_DAYS = 30          # Re-download the whole window this often to pick up split/dividend adjustments
+ADJUST_TOLERANCE = 1e-4         # Relative close change at the overlap that counts as a new adjustment
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+def connect(db_path=PRICE_DB_FILE):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS bars (
+        symbol TEXT NOT NULL, date TEXT NOT NULL,
+        open REAL, high REAL, low REAL, close REAL, volume REAL,
+        PRIMARY KEY (symbol, date)) WITHOUT ROWID""")
+    conn.execute("""CREATE TABLE IF NOT EXISTS fetches (
+        symbol TEXT PRIMARY KEY, fetched_at TEXT NOT NULL, full_fetched_at TEXT NOT NULL)""")
+    return conn
+
+def is_fresh(fetched_at, now=None):
+    """True when nothing newer than fetched_at can exist yet."""
+    now = market_calendar.to_ist(now)
+    fetched_at = market_calendar.to_ist(fetched_at)
+    if market_calendar.is_market_open(now):
+        return (now - fetched_at).total_seconds() < INTRADAY_FRESH_SECONDS
+    return fetched_at >= market_calendar.last_session_close(now)
+
+def _insert_bars(conn, symbol, df):
+    # No commit: callers group this with the delete and fetch bookkeeping in one transaction
+    if df is None or df.empty: return 0
+    dates = pd.DatetimeIndex(df.index).strftime("%Y-%m-%d")
+    rows = [(symbol, d, *(None if pd.isna(v) else float(v) for v in vals))
+            for d, vals in zip(dates, df[COLUMNS].itertuples(index=False, name=None))]
+    conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+def _replace_from(conn, symbol, df):
+    """Replaces bars from df's first date on; older bars are kept and rescaled to df's adjustment.
+
+    A full refresh only covers HISTORY_DAYS, so bars before it are history the
+    store would otherwise lose. If a split or dividend changed the adjusted
+    closes, the first overlapping close gives the ratio to rescale them by.
+    No commit, like _insert_bars.
+    """
+    if df is None or df.empty: return 0
+    first = pd.DatetimeIndex(df.index).strftime("%Y-%m-%d")
+    close = pd.Series(df["Close"].to_numpy(dtype=float), index=first).dropna()
+    row = conn.execute("SELECT date, close FROM bars WHERE symbol = ? AND date >= ? AND close > 0 ORDER BY date LIMIT 1",
+                       (symbol, first[0])).fetchone()
+    if row and row[0] in close.index:
+        ratio = close[row[0]] / row[1]
+        if abs(ratio - 1) > ADJUST_TOLERANCE:
+            conn.execute("""UPDATE bars SET open = open * ?1, high = high * ?1, low = low * ?1, close = close * ?1,
+                            volume = volume / ?1 WHERE symbol = ?2 AND date < ?3""", (ratio, symbol, first[0]))
+    conn.execute("DELETE FROM bars WHERE symbol = ? AND date >= ?", (symbol, first[0]))
+    return _insert_bars(conn, symbol, df)
+
+def store_bars(conn, symbol, df):
+    """Upserts a yfinance-style OHLCV frame for symbol."""
+    with conn:
+        return _insert_bars(conn, symbol, df)
+
+def read_bars(conn, symbol, start=None):
+    q = "SELECT date, open, high, low, close, volume FROM bars WHERE symbol = ?"
+    args = [symbol]
+    if start:
+        q += " AND date >= ?"
+        args.append(str(start))
+    rows = conn.execute(q + " ORDER BY date", args).fetchall()
+    df = pd.DataFrame(rows, columns=["Date"] + COLUMNS)
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("Date")), name="Date")
+    return df
+
+def fetch_times(symbols, db_path=PRICE_DB_FILE):
+    """{symbol: time of its last successful history fetch} for symbols fetched before."""
+    symbols = list(symbols)
+    conn = connect(db_path)
+    try:
+        found = {}
+        for i in range(0, len(symbols), 500):
+            chunk = symbols[i:i + 500]
+            for sym, ts in conn.execute(f"SELECT symbol, fetched_at FROM fetches WHERE symbol IN ({','.join('?' * len(chunk))})", chunk):
+                found[sym] = datetime.datetime.fromisoformat(ts)
+        return found
+    finally:
+        conn.close()
+
+def _mark_fetched(conn, symbol, now, full):
+    conn.execute("""INSERT INTO fetches VALUES (?, ?, ?)
+        ON CONFLICT(symbol) DO UPDATE SET fetched_at = excluded.fetched_at,
+        full_fetched_at = CASE WHEN ? THEN excluded.full_fetched_at ELSE fetches.full_fetched_at END""",
+        (symbol, now.isoformat(), now.isoformat(), int(full)))
+
+def save_history(symbol, df, db_path=PRICE_DB_FILE):
+    """Stores a full-window frame fetched elsewhere (e.g. a batched download) and marks it fresh."""
+    if df is None or df.empty: return 0
+    now = market_calendar.now_ist()
+    conn = connect(db_path)
+    try:
+        # Replace the bars and mark the fetch in one transaction, so a failure keeps the old bars
+        with conn:
+            n = _replace_from(conn, symbol, df)
+            _mark_fetched(conn, symbol, now, True)
+        return n
+    finally:
+        conn.close()
+
+def get_history(symbol, days=HISTORY_DAYS, db_path=PRICE_DB_FILE):
+    """Daily OHLCV for the last `days` days, fetching only bars missing from disk.
+
+    The last stored bar is always re-requested because it may have been an
+    unfinished intraday bar. If the network fails, whatever is on disk is served.
+    """
+    now = market_calendar.now_ist()
+    start = (now - datetime.timedelta(days=days)).date()
+    conn = connect(db_path)
+    try:
+        meta = conn.execute("SELECT fetched_at, full_fetched_at FROM fetches WHERE symbol = ?", (symbol,)).fetchone()
+        last = conn.execute("SELECT MAX(date) FROM bars WHERE symbol = ?", (symbol,)).fetchone()[0]
+        if meta and last and is_fresh(datetime.datetime.fromisoformat(meta[0]), now):
+            metrics.count("cache.history.hit")
+            return read_bars(conn, symbol, start)
+
+        full = (not meta or not last or last < str(start)
+                or now - datetime.datetime.fromisoformat(meta[1]) > datetime.timedelta(days=FULL_REFRESH_DAYS))
+        source = data_provider.get()
+        end = now.date() + datetime.timedelta(days=1)
+        metrics.count("cache.history.full" if full else "cache.history.incremental")
+        try:
+            with metrics.span("fetch.history"):
+                df = source.history(symbol, start if full else last, end)
+            with conn:
+                if full: _replace_from(conn, symbol, df)
+                else: _insert_bars(conn, symbol, df)
+                _mark_fetched(conn, symbol, now, full)
+        except Exception as e:
+            if not last: raise
+            metrics.error("history", e)
+            metrics.count("fallback.history")
+            print(f"[!] Price refresh failed for {symbol}, serving cached bars: {e}", file=sys.stderr)
+        return read_bars(conn, symbol, start)
+    finally:
+        conn.close()
+
+def backfill(symbol, days, db_path=PRICE_DB_FILE):
+    """Fetches bars older than the earliest stored one, back to `days` ago. Returns the number added.
+
+    get_history keeps what it has stored, so this only needs to run once per
+    symbol to give backtests and charts more than HISTORY_DAYS of bars.
+    """
+    now = market_calendar.now_ist()
+    start = (now - datetime.timedelta(days=days)).date()
+    conn = connect(db_path)
+    try:
+        row = conn.execute("SELECT MIN(date), (SELECT close FROM bars WHERE symbol = ?1 AND close > 0 ORDER BY date LIMIT 1) "
+                           "FROM bars WHERE symbol = ?1", (symbol,)).fetchone()
+        earliest, earliest_close = row
+        if earliest and earliest <= str(start): return 0
+        end = (datetime.date.fromisoformat(earliest) + datetime.timedelta(days=1)) if earliest else now.date() + datetime.timedelta(days=1)
+        with metrics.span("fetch.history"):
+            df = data_provider.get().history(symbol, start, end)
+        if df is None or df.empty: return 0
+        if earliest:
+            dates = pd.DatetimeIndex(df.index).strftime("%Y-%m-%d")
+            # Express the older bars in the stored bars' adjustment
+            overlap = df["Close"].to_numpy(dtype=float)[dates == earliest]
+            df = df[dates < earliest].copy()
+            if len(overlap) and earliest_close and overlap[0] > 0:
+                ratio = earliest_close / overlap[0]
+                df[["Open", "High", "Low", "Close"]] *= ratio
+                df["Volume"] = df["Volume"] / ratio
+        with conn:
+            return _insert_bars(conn, symbol, df)
+    finally:
+        conn.close()
@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Configuration ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+SERVICE_LOG_FILE = os.path.join(DATA_DIR, "scanner_service.log")   # stdout/stderr of a service start_background() spawned
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = int(os.environ.get("ORACLE_SERVICE_PORT", 8765))
+STARTUP_WAIT = 20.0     # Seconds start_background() waits for the service to answer
+MAX_JOBS = 20           # Finished jobs kept for status queries
+LOG_MAX_BYTES = 5 * 1024 * 1024   # A larger log is moved to .log.1 when the service is next started
+
+# --- Client (imported by the dashboard; stays free of heavy imports) ---
+
+class ServiceError(Exception):
+    pass
+
+def call(method, path, payload=None, timeout=120.0):
+    """One JSON request to the service. Raises ServiceError if it is unreachable or answers with an error."""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(f"http://{SERVICE_HOST}:{SERVICE_PORT}{path}", data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        try: msg = json.loads(e.read()).get("error", str(e))
+        except ValueError: msg = str(e)
+        raise ServiceError(msg)
+    except (urllib.error.URLError, OSError) as e:
+        raise ServiceError(f"scanner service unreachable: {e}")
+
+def is_running():
+    try:
+        return call("GET", "/health", timeout=1.0).get("status") == "ok"
+    except ServiceError:
+        return False
+
+def start_background(python_exe=sys.executable):
+    """Starts the service as a detached process unless it is already up. Returns True once it answers.
+
+    Its output is appended to SERVICE_LOG_FILE.
+    """
+    if is_running(): return True
+    os.makedirs(DATA_DIR, exist_ok=True)
+    try:
+        if os.path.getsize(SERVICE_LOG_FILE) > LOG_MAX_BYTES: os.replace(SERVICE_LOG_FILE, SERVICE_LOG_FILE + ".1")
+    except OSError:
+        pass
+    with open(SERVICE_LOG_FILE, "a") as log:
+        subprocess.Popen([python_exe, "-u", os.path.abspath(__file__)], stdout=log, stderr=subprocess.STDOUT,
+                         stdin=subprocess.DEVNULL, start_new_session=True, cwd=SCRIPT_DIR)
+    deadline = time.monotonic() + STARTUP_WAIT
+    while time.monotonic() < deadline:
+        if is_running(): return True
+        time.sleep(0.25)
+    return False
+
+def analyze(tickers):
+    """Scores tickers with the current thresholds and news bias. Returns {"results": [...], "errors": {...}}."""
+    return call("POST", "/analyze", {"tickers": [tickers] if isinstance(tickers, str) else list(tickers)})
+
+def submit_sync():
+    """Queues a full market & news sync. Returns the job dict (an already running sync is reused)."""
+    return call("POST", "/sync", {})
+
+def job_status(job_id):
+    return call("GET", f"/jobs/{job_id}", timeout=5.0)
+
+# --- Server ---
+
+class ScannerService:
+    """Keeps market_scanner imported with warm caches and runs full syncs one at a time."""
+    def __init__(self):
+        import market_scanner  # Heavy import (pandas, yfinance, nsepython) paid once per process
+        self.scanner = market_scanner
+        self.started = time.time()
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.sync_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sync")
+
+    def health(self):
+        return {"status": "ok", "pid": os.getpid(), "uptime_s": round(time.time() - self.started),
+                "fundamentals_cache": self.scanner.fundamentals_cache.stats()}
+
+    def analyze(self, tickers):
+        if not isinstance(tickers, list) or not tickers or not all(isinstance(t, str) and t.strip() for t in tickers):
+            raise ValueError("tickers must be a non-empty list of symbols")
+        pred_log = self.scanner.load_pred_log()
+        tickers = [t.strip().upper() for t in tickers]
+        _, bias = self.scanner.get_symbol_sentiment(tickers)
+        results, errors = self.scanner.scan_tickers(tickers,
+                                                    pred_log["buy_rsi_threshold"], pred_log["sell_rsi_threshold"], bias,
+                                                    weights=pred_log.get("weights"))
+        return {"results": results, "errors": errors}
+
+    def submit_sync(self):
+        with self.lock:
+            for job in self.jobs.values():
+                if job["status"] in ("queued", "running"): return dict(job)
+            job = {"id": uuid.uuid4().hex[:12], "status": "queued", "submitted": time.time(),
+                   "progress": {"stage": None, "done": 0, "total": 0}, "result": None, "error": None}
+            self.jobs[job["id"]] = job
+            for old in [j["id"] for j in self.jobs.values() if j["status"] in ("done", "failed")][:-MAX_JOBS]:
+                del self.jobs[old]
+        self.sync_pool.submit(self._run_sync, job)
+        return dict(job)
+
+    def _run_sync(self, job):
+        def progress(stage, done, total):
+            job["progress"] = {"stage": stage, "done": done, "total": total}
+        job["status"] = "running"
+        try:
+            scan = self.scanner.run_pipeline(progress=progress)
+            job["result"] = {"scored": len(scan), "buys": sum(1 for x in scan if x["action"] == "BUY"),
+                             "sells": sum(1 for x in scan if x["action"] == "SELL")}
+            job["status"] = "done"
+        except Exception as e:
+            job["error"] = f"{type(e).__name__}: {e}"
+            job["status"] = "failed"
+        job["finished"] = time.time()
+
+    def job(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, code, body):
+        raw = json.dumps(body, default=str).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        if not isinstance(body, dict): raise ValueError("request body must be a JSON object")
+        return body
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send(200, self.service.health())
+        if self.path.startswith("/jobs/"):
+            job = self.service.job(self.path[len("/jobs/"):])
+            return self._send(200, job) if job else self._send(404, {"error": "unknown job"})
+        self._send(404, {"error": f"no route {self.path}"})
+
+    def do_POST(self):
+        try:
+            body = self._body()
+            if self.path == "/analyze":
+                return self._send(200, self.service.analyze(body.get("tickers")))
+            if self.path == "/sync":
+                return self._send(202, self.service.submit_sync())
+            self._send(404, {"error": f"no route {self.path}"})
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, fmt, *args):
+        print(f"[service] {self.address_string()} {fmt % args}", file=sys.stderr)
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT):
+    _Handler.service = ScannerService()
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    print(f"[*] Scanner service listening on http://{host}:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import datetime
+import fundamentals_cache
+import market_calendar
+import market_scanner
+import price_cache
+import storage
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+SCHEDULER_STATE_FILE = os.path.join(DATA_DIR, "scheduler_state.json")
+CHANGES_FILE = os.path.join(DATA_DIR, "scan_changes.jsonl")
+
+OPEN_INTERVAL = 300         # Seconds between cycles while the market is open
+CLOSED_INTERVAL = 1800      # ...and while it is closed (cut short by the next open)
+NEWS_INTERVAL_OPEN = 900    # Seconds between news syncs while the market is open
+NEWS_INTERVAL_CLOSED = 3600
+SENTIMENT_TOLERANCE = 0.5   # A bias move smaller than this does not re-score a symbol
+MAX_ERROR_BACKOFF = 1800
+MAX_FEED_LINES = 5000       # The change feed is compacted to its newest half beyond this
+
+def _norm(symbol):
+    # analyze_ticker reports bare BSE codes as <code>.BO
+    return f"{symbol}.BO" if symbol.isdigit() else symbol
+
+def config_key(pred_log):
+    """Changes when recalibration moves the thresholds or weights every score depends on."""
+    blob = json.dumps([pred_log.get("buy_rsi_threshold"), pred_log.get("sell_rsi_threshold"), pred_log.get("weights")], sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:12]
+
+class DirtyTracker:
+    """Remembers the inputs each symbol was last scored on and picks the symbols whose inputs moved.
+
+    A symbol is dirty when it has no usable result, the scoring config changed,
+    its price history is due a refresh (a new bar, or a newer intraday price),
+    its fundamentals were refreshed or expired since it was scored, or its news
+    bias moved by SENTIMENT_TOLERANCE or more.
+    """
+    def __init__(self, path=SCHEDULER_STATE_FILE, scan_path=market_scanner.SCAN_RESULTS_FILE):
+        self.path, self.scan_path = path, scan_path
+        self.state = market_scanner.load_json(path, None) or {"seq": 0, "symbols": {}}
+        self.reasons = {}
+
+    def save(self):
+        storage.atomic_write_json(self.state, self.path)
+
+    def dirty(self, symbols, symbol_bias, pred_log, now=None):
+        """{symbol: reason} for every symbol that has to be re-scored."""
+        now = now or time.time()
+        prev = {x["symbol"] for x in market_scanner.load_json(self.scan_path, [])}
+        config = config_key(pred_log)
+        syms = [_norm(s) for s in symbols]
+        fetched = price_cache.fetch_times(syms)
+        info = fundamentals_cache.fetched_at("info", syms)
+        meta = fundamentals_cache.fetched_at("nse_meta", [s.replace(".NS", "") for s in syms])
+        ttl_info = fundamentals_cache.TTL_SECONDS["info"]
+        ttl_meta = fundamentals_cache.TTL_SECONDS["nse_meta"]
+
+        def refreshed_or_expired(ts, seen, ttl, scored_at):
+            # No entry then and none now (ETFs, .BO codes, failed NSE lookups) is unchanged
+            if ts != seen: return True
+            return ts is not None and now > ts + ttl and scored_at < ts + ttl
+
+        reasons = {}
+        for raw, sym in zip(symbols, syms):
+            st = self.state["symbols"].get(sym)
+            if sym not in prev or not st: reasons[raw] = "new"
+            elif st["config"] != config: reasons[raw] = "config"
+            elif sym not in fetched or not price_cache.is_fresh(fetched[sym]): reasons[raw] = "bars"
+            elif (refreshed_or_expired(info.get(sym), st["info"], ttl_info, st["scored_at"])
+                  or refreshed_or_expired(meta.get(sym.replace(".NS", "")), st["nse_meta"], ttl_meta, st["scored_at"])):
+                reasons[raw] = "fundamentals"
+            elif abs(symbol_bias.get(raw, 0) - st["bias"]) >= SENTIMENT_TOLERANCE: reasons[raw] = "news"
+        return reasons
+
+    def select(self, symbols, symbol_bias, pred_log):
+        """run_pipeline's select hook: (dirty symbols, reused results for the rest)."""
+        self.reasons = self.dirty(symbols, symbol_bias, pred_log)
+        keep = {_norm(s) for s in symbols if s not in self.reasons}
+        reused = [x for x in market_scanner.load_json(self.scan_path, []) if x["symbol"] in keep]
+        self.config = config_key(pred_log)
+        return [s for s in symbols if s in self.reasons], reused
+
+    def commit(self, results):
+        """Records the inputs the freshly scored results were built on."""
+        syms = [x["symbol"] for x in results]
+        fetched = price_cache.fetch_times(syms)
+        info = fundamentals_cache.fetched_at("info", syms)
+        meta = fundamentals_cache.fetched_at("nse_meta", [s.replace(".NS", "") for s in syms])
+        now = time.time()
+        for x in results:
+            sym = x["symbol"]
+            self.state["symbols"][sym] = {"config": self.config, "scored_at": now,
+                                          "fetched": fetched[sym].isoformat() if sym in fetched else None,
+                                          "info": info.get(sym), "nse_meta": meta.get(sym.replace(".NS", "")),
+                                          "bias": x["components"]["sentiment_bias"]}
+
+# --- Change feed ---
+
+def diff(before, after):
+    """Action/priority changes between two scans, plus symbols that appeared or dropped out."""
+    old = {x["symbol"]: x for x in before}
+    new = {x["symbol"]: x for x in after}
+    changes = []
+    for sym, x in new.items():
+        p = old.get(sym)
+        if p is None:
+            changes.append({"symbol": sym, "to": [x["action"], x["priority"]], "score": x["score"], "price": x["price"]})
+        elif (p["action"], p["priority"]) != (x["action"], x["priority"]):
+            changes.append({"symbol": sym, "from": [p["action"], p["priority"]], "to": [x["action"], x["priority"]],
+                            "score": x["score"], "price": x["price"]})
+    changes += [{"symbol": sym, "from": [p["action"], p["priority"]]} for sym, p in old.items() if sym not in new]
+    return changes
+
+def publish(entry, path=CHANGES_FILE):
+    """Appends one cycle's entry as a JSON line, compacting the feed when it grows past MAX_FEED_LINES."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    with open(path, "r") as f:
+        lines = f.readlines()
+    if len(lines) > MAX_FEED_LINES:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.writelines(lines[-(MAX_FEED_LINES // 2):])
+        os.replace(tmp, path)
+
+def read_changes(after_seq=0, path=CHANGES_FILE):
+    """Feed entries newer than after_seq, oldest first; a consumer keeps the last seq it has seen."""
+    entries = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # A line still being written
+                if entry.get("seq", 0) > after_seq: entries.append(entry)
+    except FileNotFoundError:
+        pass
+    return entries
+
+# --- Daemon ---
+
+def cycle(tracker, sync_news=True, screen=False):
+    """One differential run. Returns the published feed entry, or None when nothing was dirty."""
+    before = market_scanner.load_json(market_scanner.SCAN_RESULTS_FILE, [])
+    tracker.reasons = {}
+    t0 = time.perf_counter()
+    scan = market_scanner.run_pipeline(select=tracker.select, sync_news=sync_news, screen=screen)
+    if not tracker.reasons: return None
+    scored = [x for x in scan if x["symbol"] in {_norm(s) for s in tracker.reasons}]
+    tracker.commit(scored)
+    tracker.state["seq"] += 1
+    reasons = {}
+    for r in tracker.reasons.values(): reasons[r] = reasons.get(r, 0) + 1
+    entry = {"seq": tracker.state["seq"], "time": datetime.datetime.now().isoformat(timespec="seconds"),
+             "rescored": len(scored), "failed": len(tracker.reasons) - len(scored), "reused": len(scan) - len(scored),
+             "reasons": reasons, "ms": round((time.perf_counter() - t0) * 1000), "changes": diff(before, scan)}
+    tracker.save()
+    publish(entry)
+    return entry
+
+def next_wait(now=None):
+    """Seconds until the next cycle: OPEN_INTERVAL in session, else CLOSED_INTERVAL or until the next open."""
+    now = market_calendar.to_ist(now)
+    if market_calendar.is_market_open(now): return OPEN_INTERVAL
+    return max(1.0, min(CLOSED_INTERVAL, (market_calendar.next_session_open(now) - now).total_seconds()))
+
+def run(max_cycles=None, screen=False):
+    tracker = DirtyTracker()
+    last_news, cycles, failures = 0.0, 0, 0
+    while True:
+        news_every = NEWS_INTERVAL_OPEN if market_calendar.is_market_open() else NEWS_INTERVAL_CLOSED
+        sync_news = time.time() - last_news >= news_every
+        try:
+            entry = cycle(tracker, sync_news, screen)
+            failures = 0
+            if sync_news: last_news = time.time()
+            if entry:
+                print(f"[*] Cycle {entry['seq']}: re-scored {entry['rescored']} ({entry['reasons']}), reused {entry['reused']}, "
+                      f"{len(entry['changes'])} changes in {entry['ms']} ms", file=sys.stderr)
+            else:
+                print("[*] Nothing dirty", file=sys.stderr)
+            wait = next_wait()
+        except Exception as e:
+            failures += 1
+            wait = min(MAX_ERROR_BACKOFF, OPEN_INTERVAL * 2 ** (failures - 1))
+            print(f"[!] Cycle failed ({e}); retrying in {wait:.0f}s", file=sys.stderr)
+        cycles += 1
+        if max_cycles and cycles >= max_cycles: return
+        time.sleep(wait)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Re-scores only symbols whose bars, fundamentals or news changed, on an NSE-aware schedule.")
+    ap.add_argument("--once", action="store_true", help="run one cycle and exit")
+    ap.add_argument("--screen", action="store_true", help="score the screener's candidates instead of the watchlist")
+    ap.add_argument("--full", action="store_true", help="forget what was scored before, so the first cycle re-scores everything")
+    args = ap.parse_args()
+    if args.full and os.path.exists(SCHEDULER_STATE_FILE): os.remove(SCHEDULER_STATE_FILE)
+    try:
+        run(max_cycles=1 if args.once else None, screen=args.screen)
+    except KeyboardInterrupt:
+        pass
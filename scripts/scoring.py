@@ -0,0 +1,48 @@
+import numpy as np
+
+# --- Oracle scoring rules (shared by the live scanner, backtester and calibration) ---
+WEIGHTS = {"technical": 0.4, "sentiment": 0.3, "fundamental": 0.3}
+BUY_SCORE = 65          # master score above this is a BUY
+SELL_SCORE = 35         # master score below this is a SELL
+
+# --- Paper trading rules ---
+STARTING_CASH = 100000.0
+ALLOCATION = 0.20       # Fraction of cash committed to each new position
+MIN_ALLOCATION = 2000   # Skip buys when the allocation would be this small
+STOP_LOSS = 0.95        # Exit below 95% of average price
+TAKE_PROFIT = 1.15      # Exit above 115% of average price
+
+ACTIONS = np.array(["SELL", "HOLD", "BUY"])
+PRIORITIES = np.array(["LOW", "MEDIUM", "HIGH"])
+
+def technical_score(rsi, macd, macd_signal, rsi_buy_thresh, rsi_sell_thresh):
+    """0-100 technical score; works on scalars or NumPy arrays (NaN inputs score as neutral RSI / bearish MACD)."""
+    rsi = np.asarray(rsi, dtype=float)
+    with np.errstate(invalid="ignore"):
+        t = 50 + np.where(rsi < rsi_buy_thresh, 25, np.where(rsi > rsi_sell_thresh, -25, 0))
+        t = t + np.where(np.asarray(macd, dtype=float) > np.asarray(macd_signal, dtype=float), 10, -10)
+    return t
+
+def sentiment_score(sentiment_bias):
+    """Maps a [-15, 15] news bias onto the 0-100 scale used by the master score."""
+    return 50 + np.asarray(sentiment_bias, dtype=float) * 2
+
+def master_score(t_score, sentiment_bias, f_score, weights=None):
+    w = weights or WEIGHTS
+    return t_score * w["technical"] + sentiment_score(sentiment_bias) * w["sentiment"] + np.asarray(f_score, dtype=float) * w["fundamental"]
+
+def action_code(score, buy_score=BUY_SCORE, sell_score=SELL_SCORE):
+    """+1 BUY, -1 SELL, 0 HOLD."""
+    score = np.asarray(score, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.where(score > buy_score, 1, np.where(score < sell_score, -1, 0))
+
+def priority_code(score):
+    """2 HIGH, 1 MEDIUM, 0 LOW."""
+    score = np.asarray(score, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.where((score >= 75) | (score <= 25), 2, np.where((score >= 60) | (score <= 40), 1, 0))
+
+def classify(score, buy_score=BUY_SCORE, sell_score=SELL_SCORE):
+    """(action, priority) labels for one master score."""
+    return str(ACTIONS[action_code(score, buy_score, sell_score) + 1]), str(PRIORITIES[priority_code(score)])
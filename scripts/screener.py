@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+import data_provider
+import metrics
+import fundamentals_cache
+import indicators
+import price_cache
+import scoring
+from storage import atomic_write_json
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+UNIVERSE_FILE = os.path.join(DATA_DIR, "universe.json")   # NSE symbols and/or BSE numeric codes
+SCREEN_RESULTS_FILE = os.path.join(DATA_DIR, "screen_results.json")
+
+DOWNLOAD_CHUNK = 200    # Symbols per batched download call
+TOP_N = 50              # Candidates escalated to the fundamentals/sentiment stage
+LOOKUP_BUDGET = 50      # Uncached fundamentals lookups one run may spend (yfinance info and nse_eq each count)
+CACHE_CHECK_CHUNK = 500 # Symbols per batched fundamentals-cache freshness check
+CROSSOVER_BARS = 3      # A MACD cross within this many bars counts as fresh
+
+def nse_symbol(sym):
+    """The bare symbol nse_eq is queried, and its metadata cached, under."""
+    return sym.replace(".NS", "")
+
+def normalize_symbol(sym):
+    """BSE numeric codes get .BO (as analyze_ticker does); bare NSE symbols get .NS."""
+    sym = str(sym).strip().upper()
+    if sym.isdigit(): return f"{sym}.BO"
+    return sym if "." in sym or sym.startswith("^") else f"{sym}.NS"
+
+def load_universe(path=UNIVERSE_FILE):
+    try:
+        with open(path, "r") as f:
+            return list(dict.fromkeys(normalize_symbol(s) for s in json.load(f)))
+    except (OSError, ValueError):
+        return []
+
+def refresh_universe(path=UNIVERSE_FILE):
+    """Writes the current NSE equity list (via nsepython) to the universe file."""
+    from nsepython import nse_eq_symbols
+    symbols = [normalize_symbol(s) for s in nse_eq_symbols()]
+    atomic_write_json(symbols, path)
+    return symbols
+
+def batch_download(symbols, chunk=DOWNLOAD_CHUNK, store=True):
+    """One year of daily bars for many symbols in a handful of batched requests.
+
+    Each symbol's frame is also written to the price store, so escalated
+    symbols are served from disk by analyze_ticker.
+    """
+    frames = {}
+    for i in range(0, len(symbols), chunk):
+        batch = symbols[i:i + chunk]
+        try:
+            with metrics.span("fetch.download"):
+                raw = data_provider.get().download(batch, "1y", auto_adjust=True)
+        except Exception as e:
+            metrics.count("failure.download")
+            print(f"[!] Batch {i // chunk + 1} failed: {e}", file=sys.stderr)
+            continue
+        if raw is None or raw.empty: continue
+        top = raw.columns.get_level_values(0) if isinstance(raw.columns, pd.MultiIndex) else []
+        for sym in batch:
+            if sym not in top: continue
+            df = raw[sym].dropna(how="all")
+            if len(df) < 30: continue
+            frames[sym] = df
+            if store: price_cache.save_history(sym, df)
+    return frames
+
+def prefilter(frames, rsi_buy=30.0, rsi_sell=70.0):
+    """Cheap technical ranking of every downloaded symbol in one vectorized pass.
+
+    rank_score is the scanner's technical score, plus 10 for a MACD cross up
+    within CROSSOVER_BARS (minus 10 for a cross down), plus up to +/-10 for
+    how far price sits below/above the middle of its Bollinger band.
+    """
+    if not frames: return pd.DataFrame()
+    dates, symbols, close = indicators.build_panel(frames)
+    out, _ = indicators.compute(close)
+    last = pd.DataFrame(close).ffill().to_numpy()[-1]
+    rsi, macd, sig = out["rsi"][-1], out["macd"][-1], out["macd_signal"][-1]
+    t_score = scoring.technical_score(rsi, macd, sig, rsi_buy, rsi_sell)
+
+    above = out["macd"][-(CROSSOVER_BARS + 1):] > out["macd_signal"][-(CROSSOVER_BARS + 1):]
+    cross = np.where(above[-1] & ~above[:-1].all(axis=0), 1, np.where(~above[-1] & above[:-1].any(axis=0), -1, 0))
+    width = out["bb_upper"][-1] - out["bb_lower"][-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        band_pos = np.where(width > 0, (last - out["bb_lower"][-1]) / width, 0.5)
+    rank = t_score + 10 * cross + np.clip((0.5 - band_pos) * 20, -10, 10)
+    df = pd.DataFrame({"symbol": symbols, "price": np.round(last, 2), "rsi": np.round(rsi, 2),
+                       "macd_cross": cross, "band_pos": np.round(band_pos, 3), "t_score": t_score,
+                       "rank_score": np.round(rank, 2)})
+    return df.dropna(subset=["rsi"]).sort_values("rank_score", ascending=False, kind="stable").reset_index(drop=True)
+
+def _lookup_costs(symbols, chunk):
+    """Yields (symbol, uncached lookups it would need), checking the cache a chunk at a time."""
+    for i in range(0, len(symbols), chunk):
+        part = symbols[i:i + chunk]
+        info = fundamentals_cache.fresh("info", part)
+        meta = fundamentals_cache.fresh("nse_meta", [nse_symbol(s) for s in part])
+        for sym in part:
+            yield sym, (sym not in info) + (nse_symbol(sym) not in meta)
+
+def select_candidates(ranked, top_n=TOP_N, budget=LOOKUP_BUDGET, always=()):
+    """Picks up to top_n symbols to escalate, spending at most `budget` uncached fundamentals lookups.
+
+    Symbols in `always` (e.g. current holdings) are taken first, whatever the
+    budget, so their exits are always checked; their lookups still count
+    against it and they take up top_n slots. A symbol costs one lookup for
+    each of its yfinance info and nse_eq metadata that is not cached.
+    """
+    always = list(dict.fromkeys(always))
+    pool = list(dict.fromkeys(always + list(ranked["symbol"] if len(ranked) else [])))
+    pinned = set(always)
+    chosen, spent = [], 0
+    for sym, cost in _lookup_costs(pool, CACHE_CHECK_CHUNK):
+        if sym not in pinned:
+            if len(chosen) >= top_n: break
+            if spent + cost > budget: continue
+        spent += cost
+        chosen.append(sym)
+    return chosen, spent
+
+def screen(universe=None, rsi_buy=30.0, rsi_sell=70.0, top_n=TOP_N, budget=LOOKUP_BUDGET, always=()):
+    """Stage one of a universe scan: batched prices and a technical prefilter.
+
+    Returns (symbols to escalate, report).
+    """
+    universe = universe or load_universe()
+    frames = batch_download(universe)
+    ranked = prefilter(frames, rsi_buy, rsi_sell)
+    chosen, spent = select_candidates(ranked, top_n, budget, always)
+    report = {"universe": len(universe), "downloaded": len(frames), "ranked": len(ranked),
+              "escalated": len(chosen), "lookups_spent": spent, "budget": budget,
+              "top": ranked.head(top_n).to_dict(orient="records")}
+    print(f"[*] Screener: {len(frames)}/{len(universe)} downloaded, {len(chosen)} escalated, {spent}/{budget} lookups", file=sys.stderr)
+    return chosen, report
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Batched technical prefilter over the NSE/BSE universe.")
+    ap.add_argument("--refresh-universe", action="store_true", help="rebuild data/universe.json from the NSE equity list")
+    ap.add_argument("--top", type=int, default=TOP_N)
+    ap.add_argument("--budget", type=int, default=LOOKUP_BUDGET)
+    args = ap.parse_args()
+    universe = refresh_universe() if args.refresh_universe else load_universe()
+    if not universe:
+        print(f"[!] No universe found at {UNIVERSE_FILE}; run with --refresh-universe", file=sys.stderr)
+        sys.exit(1)
+    chosen, report = screen(universe, top_n=args.top, budget=args.budget)
+    atomic_write_json(report, SCREEN_RESULTS_FILE)
+    print(json.dumps(chosen, indent=2))
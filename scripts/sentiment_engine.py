@@ -1,57 +1,95 @@
 import os
+import sys
 import json
+import time
 import datetime
-import subprocess
-from duckduckgo_search import DDGS
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import data_provider
+import metrics
+import news_archive
 
 # --- Configuration (Relative Paths) ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(SCRIPT_DIR)
-NEWS_DIR = os.path.join(BASE_DIR, "data/news_archive")
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+LATEST_NEWS_FILE = os.path.join(DATA_DIR, "latest_news.json")
 
-def fetch_and_save_news(query, category):
-    print(f"[*] Searching {category} news: {query}")
-    results = []
+TOPICS = {
+    "finance": "Indian stock market NSE BSE news today",
+    "international": "global geopolitical events market impact",
+    "tech": "AI tech industry trends February 2026",
+    "commodities": "silver prices MCX news India"
+}
+FETCH_WORKERS = 4       # Topics fetched in parallel
+QUERY_TIMEOUT = 20.0    # Seconds before a topic is reported as timed out
+
+def fetch_news(query, max_results=10):
+    """One news query through the active data provider, in the archive's article shape. Raises on failure."""
+    with metrics.span("fetch.news"):
+        return data_provider.get().news(query, max_results)
+
+def fetch_topics(topics=TOPICS, workers=FETCH_WORKERS, timeout=QUERY_TIMEOUT):
+    """Fetches every topic concurrently.
+
+    Returns ({category: articles}, {category: {"latency_ms", "count", "error"}}).
+    A failed or timed-out topic yields an empty list and its error in the report.
+    """
+    results, report = {}, {}
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="news")
+    t0 = time.monotonic()
+
+    def timed(query):
+        start = time.monotonic()
+        items = fetch_news(query)
+        return items, time.monotonic() - start
+
+    futures = {cat: pool.submit(timed, query) for cat, query in topics.items()}
     try:
-        with DDGS() as ddgs:
-            search_results = list(ddgs.news(query, max_results=10))
-            for r in search_results:
-                results.append({
-                    "title": r.get('title'),
-                    "snippet": r.get('body'),
-                    "source": r.get('source'),
-                    "date": r.get('date'),
-                    "url": r.get('url')
-                })
-    except Exception as e:
-        print(f"Error fetching {category}: {e}")
-        return []
-    return results
-
-def run_sentiment_pipeline():
-    os.makedirs(NEWS_DIR, exist_ok=True)
-    topics = {
-        "finance": "Indian stock market NSE BSE news today",
-        "international": "global geopolitical events market impact",
-        "tech": "AI tech industry trends February 2026",
-        "commodities": "silver prices MCX news India"
-    }
-    
-    news_report = {"timestamp": datetime.datetime.now().isoformat(), "categories": {}}
-    for cat, query in topics.items():
-        news_report["categories"][cat] = fetch_and_save_news(query, cat)
-        
-    filename = f"news_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    filepath = os.path.join(NEWS_DIR, filename)
-    with open(filepath, "w") as f:
-        json.dump(news_report, f, indent=2)
-        
-    latest_path = os.path.join(BASE_DIR, "data/latest_news.json")
-    with open(latest_path, "w") as f:
+        for cat, fut in futures.items():
+            try:
+                items, elapsed = fut.result(timeout=max(0.0, t0 + timeout - time.monotonic()))
+                results[cat] = items
+                report[cat] = {"latency_ms": round(elapsed * 1000), "count": len(items), "error": None}
+            except FutureTimeout:
+                results[cat] = []
+                report[cat] = {"latency_ms": round(timeout * 1000), "count": 0, "error": f"Timeout after {timeout:.0f}s"}
+            except Exception as e:
+                results[cat] = []
+                report[cat] = {"latency_ms": round((time.monotonic() - t0) * 1000), "count": 0, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results, report
+
+def run_sentiment_pipeline(topics=TOPICS, workers=FETCH_WORKERS, timeout=QUERY_TIMEOUT):
+    """Fetches all topics, adds them to the news archive and refreshes latest_news.json.
+
+    The returned report carries the full current article set plus a per-topic
+    fetch_report (latency, article count, articles new to the archive, error).
+    """
+    categories, fetch_report = fetch_topics(topics, workers, timeout)
+    if fetch_report and all(r["error"] for r in fetch_report.values()):
+        raise RuntimeError("every news topic failed: " + "; ".join(f"{c}: {r['error']}" for c, r in fetch_report.items()))
+
+    now = datetime.datetime.now()
+    with news_archive.connect() as conn:
+        fresh = news_archive.ingest(conn, categories, now)
+    for cat in categories:
+        fetch_report[cat]["new"] = len(fresh[cat])
+        if fetch_report[cat]["error"]:
+            metrics.count("failure.news")
+            print(f"[!] {cat} news failed: {fetch_report[cat]['error']}", file=sys.stderr)
+
+    news_report = {"timestamp": now.isoformat(), "categories": categories, "fetch_report": fetch_report}
+    added = sum(map(len, fresh.values()))
+    print(f"[*] {added} new articles archived to {news_archive.NEWS_DB_FILE}" if added else "[*] No new articles since the last run", file=sys.stderr)
+
+    tmp = LATEST_NEWS_FILE + ".tmp"
+    with open(tmp, "w") as f:
         json.dump(news_report, f, indent=2)
-        
-    print(f"[*] News archived to {filepath}")
+    os.replace(tmp, LATEST_NEWS_FILE)
     return news_report
 
 if __name__ == "__main__":
-    run_sentiment_pipeline()
+    report = run_sentiment_pipeline()
+    for cat, r in report["fetch_report"].items():
+        print(f"{cat:>14}: {r['count']:>3} articles, {r['new']:>3} new, {r['latency_ms']:>6} ms" + (f"  [{r['error']}]" if r['error'] else ""))
@@ -0,0 +1,133 @@
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import threading
+from storage import atomic_write_json
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+LEXICON_FILE = os.path.join(DATA_DIR, "sentiment_lexicon.json")   # Optional {"word": weight} override
+SENTIMENT_CACHE_FILE = os.path.join(DATA_DIR, "sentiment_cache.json")
+
+# Whole-word weights; inflections are listed explicitly because matching is exact per token.
+DEFAULT_LEXICON = {
+    "surge": 1, "surges": 1, "surged": 1, "surging": 1,
+    "growth": 1, "bullish": 1, "profit": 1, "profits": 1,
+    "high": 1, "highs": 1, "recovery": 1, "recovers": 1, "recovered": 1,
+    "stable": 1, "uptick": 1,
+    "drop": -1, "drops": -1, "dropped": -1,
+    "crash": -1, "crashes": -1, "crashed": -1,
+    "bearish": -1, "loss": -1, "losses": -1,
+    "war": -1, "crisis": -1,
+    "decline": -1, "declines": -1, "declined": -1,
+    "inflation": -1,
+}
+NEGATIONS = {"not", "no", "never", "without", "nor", "hardly", "barely"}
+NEGATION_WINDOW = 3        # A negation flips the next N tokens
+MAX_CACHE_ENTRIES = 50000
+SAVE_INTERVAL = 30.0       # Seconds between cache rewrites; anything newer is flushed at exit
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?|[.,;:!?]")   # Punctuation ends a negation scope
+
+def load_lexicon(path=LEXICON_FILE):
+    try:
+        with open(path, "r") as f:
+            return {k.lower(): float(v) for k, v in json.load(f).items()}
+    except (OSError, ValueError, AttributeError):
+        return dict(DEFAULT_LEXICON)
+
+def lexicon_version(lexicon):
+    blob = json.dumps(sorted(lexicon.items())) + json.dumps(sorted(NEGATIONS)) + str(NEGATION_WINDOW)
+    return hashlib.sha1(blob.encode()).hexdigest()[:12]
+
+def score_text(text, lexicon):
+    """Sum of lexicon weights over the tokens of text, in a single left-to-right pass.
+
+    Tokens within NEGATION_WINDOW after a negation ("not", "no", "...n't")
+    count with the opposite sign, unless punctuation closes the clause first.
+    """
+    score = 0.0
+    negate = 0
+    for tok in TOKEN_RE.findall(text.lower().replace("\u2019", "'")):
+        if tok in ".,;:!?":
+            negate = 0
+            continue
+        if tok in NEGATIONS or tok.endswith("n't"):
+            negate = NEGATION_WINDOW
+            continue
+        w = lexicon.get(tok)
+        if w: score += -w if negate else w
+        if negate: negate -= 1
+    return score
+
+def article_key(item):
+    url = item.get('url')
+    if url: return url
+    blob = f"{item.get('title', '')}\n{item.get('snippet', '')}"
+    return "sha1:" + hashlib.sha1(blob.encode()).hexdigest()
+
+class ScoreCache:
+    """Per-article scores persisted to disk; a lexicon change invalidates everything."""
+    def __init__(self, lexicon, path=SENTIMENT_CACHE_FILE):
+        self.path = path
+        self.version = lexicon_version(lexicon)
+        self.scores = {}
+        self.dirty = False
+        self.saved_at = None
+        self.lock = threading.Lock()
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == self.version: self.scores = data.get("scores", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def save(self, force=False):
+        """Rewrites the file if scores were added, at most once per SAVE_INTERVAL unless forced."""
+        with self.lock:
+            if not self.dirty: return
+            if not force and self.saved_at is not None and time.monotonic() - self.saved_at < SAVE_INTERVAL: return
+            if len(self.scores) > MAX_CACHE_ENTRIES:
+                self.scores = dict(list(self.scores.items())[-MAX_CACHE_ENTRIES:])
+            atomic_write_json({"version": self.version, "scores": self.scores}, self.path, indent=None)
+            self.dirty = False
+            self.saved_at = time.monotonic()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache(lexicon, path=SENTIMENT_CACHE_FILE):
+    """The process-wide ScoreCache, read from disk once (again only if the lexicon or path changes)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.version != lexicon_version(lexicon) or _cache.path != path:
+            if _cache is not None: _cache.save(force=True)
+            _cache = ScoreCache(lexicon, path)
+        return _cache
+
+@atexit.register
+def flush():
+    """Writes out scores still held back by SAVE_INTERVAL."""
+    if _cache is not None: _cache.save(force=True)
+
+def score_articles(items, lexicon=None, cache=None):
+    """Scores each article dict (title + snippet), reusing cached scores by URL/content hash."""
+    lexicon = lexicon or load_lexicon()
+    cache = cache or get_cache(lexicon)
+    scores = []
+    with cache.lock:
+        for item in items:
+            key = article_key(item)
+            s = cache.scores.get(key)
+            if s is None:
+                s = score_text(f"{item.get('title') or ''} {item.get('snippet') or ''}", lexicon)
+                cache.scores[key] = s
+                cache.dirty = True
+            scores.append(s)
+    cache.save()
+    return scores
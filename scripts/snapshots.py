@@ -0,0 +1,181 @@
+import os
+import sys
+import json
+import argparse
+import datetime
+import pyarrow as pa
+import pyarrow.compute as pc
+from storage import atomic_write_json, exclusive
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
+MANIFEST_FILE = os.path.join(SNAPSHOT_DIR, "manifest.json")
+
+# Uncompressed Arrow IPC files, so readers can memory-map them without copying.
+# Runs from earlier months are merged into one file per month (runs_YYYYMM.arrow).
+SCHEMA = pa.schema([
+    ("run_id", pa.int64()), ("date", pa.timestamp("us")),
+    ("symbol", pa.string()), ("name", pa.string()),
+    ("price", pa.float64()), ("action", pa.dictionary(pa.int8(), pa.string())),
+    ("priority", pa.dictionary(pa.int8(), pa.string())),
+    ("score", pa.float64()), ("rsi", pa.float64()),
+    ("technical", pa.float64()), ("macd_bullish", pa.bool_()), ("sentiment_bias", pa.float64()),
+    ("f_score", pa.float64()), ("pe", pa.float64()), ("sector_pe", pa.float64()),
+    ("roe_pct", pa.float64()), ("debt_to_equity", pa.float64()),
+    ("potential_profit_pct", pa.float64()), ("potential_loss_pct", pa.float64()),
+])
+HISTORY_COLUMNS = ["date", "run_id", "price", "action", "priority", "score", "rsi", "sentiment_bias", "f_score"]
+
+def _num(v):
+    # Fundamentals fall back to "N/A" strings when a fetch fails
+    return float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else None
+
+def flatten(scan, run_id, date):
+    """Scan records (nested fundamentals/components dicts) -> one typed Arrow table."""
+    cols = {f.name: [] for f in SCHEMA}
+    for x in scan:
+        f = x.get("fundamentals") if isinstance(x.get("fundamentals"), dict) else {}
+        c = x.get("components") if isinstance(x.get("components"), dict) else {}
+        cols["symbol"].append(x["symbol"])
+        cols["name"].append(x.get("name"))
+        cols["action"].append(x.get("action"))
+        cols["priority"].append(x.get("priority"))
+        cols["macd_bullish"].append(c.get("macd_bullish"))
+        for k in ("price", "score", "rsi", "potential_profit_pct", "potential_loss_pct"): cols[k].append(_num(x.get(k)))
+        for k in ("technical", "sentiment_bias"): cols[k].append(_num(c.get(k)))
+        cols["f_score"].append(_num(f.get("score")))
+        for k in ("pe", "sector_pe", "roe_pct", "debt_to_equity"): cols[k].append(_num(f.get(k)))
+    cols["run_id"] = [run_id] * len(scan)
+    cols["date"] = [date] * len(scan)
+    return pa.table(cols, schema=SCHEMA)
+
+def _write_table(table, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+def open_table(path):
+    """Memory-maps an IPC file; columns are read straight from the page cache."""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+def load_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def write(scan, run_id, date=None, root=SNAPSHOT_DIR):
+    """Stores one run's scan as run_<id>.arrow and records it in the manifest. Returns the manifest entry."""
+    date = date or datetime.datetime.now()
+    table = flatten(scan, run_id, date)
+    os.makedirs(root, exist_ok=True)
+    name = f"run_{run_id:08d}.arrow"
+    _write_table(table, os.path.join(root, name))
+    entry = {"run_id": run_id, "date": date.isoformat(timespec="seconds"), "file": name, "rows": len(table),
+             "buys": sum(x.get("action") == "BUY" for x in scan), "sells": sum(x.get("action") == "SELL" for x in scan)}
+    manifest_path = os.path.join(root, "manifest.json")
+    # Manifest updates are serialized across threads and processes (the scanner service and the scheduler)
+    with exclusive(manifest_path):
+        manifest = [e for e in load_manifest(manifest_path) if e["run_id"] != run_id] + [entry]
+        atomic_write_json(manifest, manifest_path, indent=None)
+        _compact(root, before=date.strftime("%Y%m"))
+    return entry
+
+def compact(root=SNAPSHOT_DIR, before=None):
+    """Merges per-run files of months earlier than `before` (YYYYMM) into runs_<YYYYMM>.arrow."""
+    manifest_path = os.path.join(root, "manifest.json")
+    with exclusive(manifest_path):
+        _compact(root, before)
+
+def _compact(root, before):
+    manifest_path = os.path.join(root, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    months = {}
+    for e in manifest:
+        month = e["date"][:7].replace("-", "")
+        if e["file"].startswith("run_") and (before is None or month < before):
+            months.setdefault(month, []).append(e)
+    for month, entries in sorted(months.items()):
+        name = f"runs_{month}.arrow"
+        path = os.path.join(root, name)
+        parts = [open_table(path)] if os.path.exists(path) else []
+        parts += [open_table(os.path.join(root, e["file"])) for e in entries]
+        _write_table(pa.concat_tables(parts, promote_options="permissive").unify_dictionaries().combine_chunks(), path)
+        merged = {e["run_id"] for e in entries}
+        manifest = [dict(e, file=name) if e["run_id"] in merged else e for e in manifest]
+        atomic_write_json(manifest, manifest_path, indent=None)
+        for e in entries:
+            try: os.remove(os.path.join(root, e["file"]))
+            except OSError: pass
+        print(f"[*] Compacted {len(entries)} scan snapshots into {name}", file=sys.stderr)
+
+# --- Queries ---
+
+def read_run(entry, columns=None, root=SNAPSHOT_DIR):
+    """One run as an Arrow table (a slice of its monthly file once compacted)."""
+    table = open_table(os.path.join(root, entry["file"]))
+    if entry["file"].startswith("runs_"):
+        table = table.filter(pc.equal(table["run_id"], entry["run_id"]))
+    return table.select(columns) if columns else table
+
+def latest(root=SNAPSHOT_DIR):
+    """(manifest entry, table) for the newest run, or (None, None)."""
+    manifest = load_manifest(os.path.join(root, "manifest.json"))
+    if not manifest: return None, None
+    return manifest[-1], read_run(manifest[-1], root=root)
+
+def diff(a, b, root=SNAPSHOT_DIR):
+    """Symbols whose action or priority differ between runs a and b (manifest entries), plus
+    symbols present in only one of them, with score and price moves."""
+    cols = ["symbol", "price", "action", "priority", "score", "rsi"]
+    old = read_run(a, cols, root).to_pandas()
+    new = read_run(b, cols, root).to_pandas()
+    for df in (old, new):
+        df[["action", "priority"]] = df[["action", "priority"]].astype(object)
+    m = old.merge(new, on="symbol", how="outer", suffixes=("_a", "_b"), indicator=True)
+    changed = ((m["_merge"] != "both") | (m["action_a"] != m["action_b"]) | (m["priority_a"] != m["priority_b"]))
+    m = m[changed].copy()
+    m["score_change"] = (m["score_b"] - m["score_a"]).round(2)
+    m["price_change_pct"] = ((m["price_b"] / m["price_a"] - 1) * 100).round(2)
+    m["status"] = m["_merge"].map({"left_only": "dropped", "right_only": "new", "both": "changed"}).astype(object)
+    return m.drop(columns="_merge").sort_values("score_change", key=lambda s: -s.abs(), na_position="last").reset_index(drop=True)
+
+def history(symbol, start=None, end=None, columns=HISTORY_COLUMNS, root=SNAPSHOT_DIR):
+    """symbol's row from every run between start and end (dates), oldest first, as a DataFrame."""
+    manifest = load_manifest(os.path.join(root, "manifest.json"))
+    lo = str(start) if start else ""
+    hi = str(end + datetime.timedelta(days=1)) if isinstance(end, datetime.date) else (str(end) if end else "9999")
+    files = list(dict.fromkeys(e["file"] for e in manifest if lo <= e["date"] < hi))
+    parts = []
+    for name in files:
+        t = open_table(os.path.join(root, name))
+        parts.append(t.filter(pc.equal(t["symbol"], symbol)).select(columns))
+    if not parts: return pa.table({c: [] for c in columns}).to_pandas()
+    df = pa.concat_tables(parts, promote_options="permissive").to_pandas()
+    df[["action", "priority"]] = df[["action", "priority"]].astype(object)
+    if start: df = df[df["date"] >= str(start)]
+    if end: df = df[df["date"] < hi]
+    return df.sort_values("date").reset_index(drop=True)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Query the per-run scan snapshots.")
+    ap.add_argument("--history", metavar="SYMBOL", help="score/action/RSI of SYMBOL across runs")
+    ap.add_argument("--diff", nargs=2, type=int, metavar=("RUN_A", "RUN_B"), help="action/priority changes between two runs")
+    ap.add_argument("--compact", action="store_true", help="merge every per-run file into its monthly file")
+    args = ap.parse_args()
+    manifest = load_manifest()
+    if args.history:
+        print(history(args.history).to_string(index=False))
+    elif args.diff:
+        runs = {e["run_id"]: e for e in manifest}
+        print(diff(runs[args.diff[0]], runs[args.diff[1]]).to_string(index=False))
+    elif args.compact:
+        compact(before=None)
+    else:
+        for e in manifest[-20:]:
+            print(f"run {e['run_id']:>6}  {e['date']}  {e['rows']:>5} symbols  {e['buys']:>4} BUY  {e['sells']:>4} SELL  {e['file']}")
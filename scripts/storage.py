@@ -0,0 +1,286 @@
+import os
+import json
+import sqlite3
+import datetime
+import threading
+import contextlib
+try:
+    import fcntl
+except ImportError:  # Windows: locks only serialize within one process
+    fcntl = None
+import metrics
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+ORACLE_DB_FILE = os.path.join(DATA_DIR, "oracle.db")
+LEGACY_PORTFOLIO_FILE = os.path.join(DATA_DIR, "portfolio.json")
+LEGACY_HISTORY_FILE = os.path.join(DATA_DIR, "historical_predictions.json")
+
+STARTING_CASH = 100000.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS portfolio (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    cash REAL NOT NULL, invested REAL NOT NULL, total_value REAL NOT NULL,
+    total_profit_loss REAL NOT NULL, updated_at TEXT);
+CREATE TABLE IF NOT EXISTS holdings (
+    symbol TEXT PRIMARY KEY, qty INTEGER NOT NULL, avg_price REAL NOT NULL, date_bought TEXT);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, sentiment_bias REAL);
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, run_id INTEGER REFERENCES runs(run_id),
+    date TEXT NOT NULL, type TEXT NOT NULL, symbol TEXT NOT NULL,
+    qty INTEGER NOT NULL, price REAL NOT NULL, profit REAL, reason TEXT);
+CREATE INDEX IF NOT EXISTS trades_date ON trades(date);
+CREATE INDEX IF NOT EXISTS trades_symbol ON trades(symbol, date);
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    date TEXT NOT NULL, symbol TEXT NOT NULL, action TEXT, priority TEXT,
+    price REAL, score REAL, rsi REAL, record TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS predictions_date ON predictions(date);
+CREATE INDEX IF NOT EXISTS predictions_symbol ON predictions(symbol, date);
+CREATE TABLE IF NOT EXISTS prediction_outcomes (
+    prediction_id INTEGER NOT NULL REFERENCES predictions(id), horizon INTEGER NOT NULL,
+    fwd_return REAL NOT NULL, evaluated_at TEXT,
+    PRIMARY KEY (prediction_id, horizon));
+CREATE TABLE IF NOT EXISTS strategies (
+    name TEXT PRIMARY KEY, params TEXT NOT NULL, cash REAL NOT NULL, created_at TEXT, updated_at TEXT);
+CREATE TABLE IF NOT EXISTS strategy_holdings (
+    strategy TEXT NOT NULL REFERENCES strategies(name), symbol TEXT NOT NULL,
+    qty INTEGER NOT NULL, avg_price REAL NOT NULL, date_bought TEXT,
+    PRIMARY KEY (strategy, symbol));
+CREATE TABLE IF NOT EXISTS strategy_trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, strategy TEXT NOT NULL REFERENCES strategies(name),
+    date TEXT NOT NULL, type TEXT NOT NULL, symbol TEXT NOT NULL,
+    qty INTEGER NOT NULL, price REAL NOT NULL, profit REAL);
+CREATE INDEX IF NOT EXISTS strategy_trades_strategy ON strategy_trades(strategy, date);
+CREATE TABLE IF NOT EXISTS strategy_equity (
+    strategy TEXT NOT NULL REFERENCES strategies(name), date TEXT NOT NULL,
+    cash REAL NOT NULL, invested REAL NOT NULL, total_value REAL NOT NULL,
+    PRIMARY KEY (strategy, date));
+"""
+
+def atomic_write_json(data, path, indent=2):
+    """Writes JSON to a temp file in the same directory and renames it over path."""
+    with metrics.span("write_json"):
+        _atomic_write_json(data, path, indent)
+
+def _atomic_write_json(data, path, indent):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=indent, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+@contextlib.contextmanager
+def exclusive(path):
+    """Holds path + ".lock" exclusively across threads and processes (the scanner service and the scheduler)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _path_locks_guard:
+        lock = _path_locks.setdefault(os.path.abspath(path), threading.Lock())
+    with lock, open(path + ".lock", "a") as f:
+        if fcntl: fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl: fcntl.flock(f, fcntl.LOCK_UN)
+
+@contextlib.contextmanager
+def connect(db_path=ORACLE_DB_FILE):
+    """Opens the database, creating the schema and importing legacy JSON state on first use."""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(SCHEMA)
+        migrated = "SELECT 1 FROM meta WHERE key = 'migrated_json'"
+        if not conn.execute(migrated).fetchone():
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                if not conn.execute(migrated).fetchone(): migrate_json(conn)
+        yield conn
+    finally:
+        conn.close()
+
+def _load_legacy(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def migrate_json(conn, portfolio_file=LEGACY_PORTFOLIO_FILE, history_file=LEGACY_HISTORY_FILE):
+    """One-time import of portfolio.json and historical_predictions.json, inside the caller's transaction.
+
+    The JSON files are left in place.
+    """
+    portfolio = _load_legacy(portfolio_file, {})
+    history = _load_legacy(history_file, [])
+    for run in history if isinstance(history, list) else []:
+        cur = conn.execute("INSERT INTO runs (date, sentiment_bias) VALUES (?, ?)",
+                           (run.get("date"), run.get("sentiment_bias")))
+        _insert_predictions(conn, cur.lastrowid, run.get("date"), run.get("predictions", []))
+    for t in portfolio.get("trade_history", []):
+        _insert_trade(conn, None, t)
+    for sym, h in portfolio.get("holdings", {}).items():
+        conn.execute("INSERT OR REPLACE INTO holdings VALUES (?, ?, ?, ?)",
+                     (sym, h["qty"], h["avg_price"], h.get("date_bought")))
+    if portfolio:
+        _write_portfolio_row(conn, portfolio)
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_json', ?)", (datetime.datetime.now().isoformat(),))
+
+def _insert_trade(conn, run_id, t):
+    conn.execute("INSERT INTO trades (run_id, date, type, symbol, qty, price, profit, reason) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                 (run_id, t["date"], t["type"], t["symbol"], t["qty"], t["price"], t.get("profit"), t.get("reason")))
+
+def _insert_predictions(conn, run_id, date, predictions):
+    conn.executemany(
+        "INSERT INTO predictions (run_id, date, symbol, action, priority, price, score, rsi, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(run_id, p.get("timestamp") or date, p["symbol"], p.get("action"), p.get("priority"),
+          p.get("price"), p.get("score"), p.get("rsi"), json.dumps(p, default=str)) for p in predictions])
+
+def _write_portfolio_row(conn, p):
+    conn.execute("INSERT OR REPLACE INTO portfolio VALUES (1, ?, ?, ?, ?, ?)",
+                 (p.get("cash", STARTING_CASH), p.get("invested", 0.0), p.get("total_value", STARTING_CASH),
+                  p.get("total_profit_loss", 0.0), datetime.datetime.now().isoformat()))
+
+def load_portfolio(db_path=ORACLE_DB_FILE):
+    """Current cash/value figures plus holdings, in the shape portfolio.json used (without trade_history)."""
+    with connect(db_path) as conn:
+        row = conn.execute("SELECT * FROM portfolio WHERE id = 1").fetchone()
+        holdings = {r["symbol"]: {"qty": r["qty"], "avg_price": r["avg_price"], "date_bought": r["date_bought"]}
+                    for r in conn.execute("SELECT * FROM holdings ORDER BY symbol")}
+    base = {"cash": STARTING_CASH, "invested": 0.0, "total_value": STARTING_CASH, "total_profit_loss": 0.0}
+    if row: base.update({k: row[k] for k in base})
+    base["holdings"] = holdings
+    return base
+
+def _range_query(table, start=None, end=None, symbol=None, limit=None, offset=None, select="*"):
+    q, args = f"SELECT {select} FROM {table} WHERE 1=1", []
+    if start: q, args = q + " AND date >= ?", args + [str(start)]
+    if end: q, args = q + " AND date < ?", args + [str(end + datetime.timedelta(days=1)) if isinstance(end, datetime.date) else str(end)]
+    if symbol: q, args = q + " AND symbol = ?", args + [symbol]
+    if select != "*": return q, args
+    q += " ORDER BY date DESC, id DESC"
+    if limit: q, args = q + " LIMIT ?", args + [int(limit)]
+    if offset: q, args = q + (" OFFSET ?" if limit else " LIMIT -1 OFFSET ?"), args + [int(offset)]
+    return q, args
+
+def load_trades(start=None, end=None, symbol=None, limit=None, offset=None, db_path=ORACLE_DB_FILE):
+    """Trades newest first; start/end are inclusive dates. limit/offset page through them."""
+    with connect(db_path) as conn:
+        return [dict(r) for r in conn.execute(*_range_query("trades", start, end, symbol, limit, offset))]
+
+def load_predictions(start=None, end=None, symbol=None, limit=None, db_path=ORACLE_DB_FILE):
+    """Stored scan records newest first, each with its run_id and the full prediction dict."""
+    with connect(db_path) as conn:
+        rows = conn.execute(*_range_query("predictions", start, end, symbol, limit)).fetchall()
+    return [{"id": r["id"], "run_id": r["run_id"], **json.loads(r["record"])} for r in rows]
+
+def count_trades(start=None, end=None, symbol=None, db_path=ORACLE_DB_FILE):
+    with connect(db_path) as conn:
+        return conn.execute(*_range_query("trades", start, end, symbol, select="COUNT(*)")).fetchone()[0]
+
+def record_run(predictions, portfolio, new_trades, sentiment_bias=None, db_path=ORACLE_DB_FILE):
+    """Commits one pipeline run atomically: the run, its predictions, its trades and the resulting portfolio.
+
+    Returns the new run_id.
+    """
+    now = datetime.datetime.now().isoformat()
+    with connect(db_path) as conn:
+        with conn:
+            run_id = conn.execute("INSERT INTO runs (date, sentiment_bias) VALUES (?, ?)", (now, sentiment_bias)).lastrowid
+            _insert_predictions(conn, run_id, now, predictions)
+            for t in new_trades:
+                _insert_trade(conn, run_id, t)
+            conn.execute("DELETE FROM holdings")
+            conn.executemany("INSERT INTO holdings VALUES (?, ?, ?, ?)",
+                             [(s, h["qty"], h["avg_price"], h.get("date_bought")) for s, h in portfolio["holdings"].items()])
+            _write_portfolio_row(conn, portfolio)
+    return run_id
+
+def pending_outcomes(horizon, db_path=ORACLE_DB_FILE):
+    """Predictions that have no realized forward return at this horizon yet, oldest first."""
+    with connect(db_path) as conn:
+        rows = conn.execute("""SELECT p.id, p.date, p.symbol, p.price FROM predictions p
+            LEFT JOIN prediction_outcomes o ON o.prediction_id = p.id AND o.horizon = ?
+            WHERE o.prediction_id IS NULL AND p.price IS NOT NULL ORDER BY p.date""", (horizon,)).fetchall()
+    return [dict(r) for r in rows]
+
+def save_outcomes(outcomes, horizon, db_path=ORACLE_DB_FILE):
+    """outcomes: iterable of (prediction_id, fwd_return)."""
+    now = datetime.datetime.now().isoformat()
+    with connect(db_path) as conn:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO prediction_outcomes VALUES (?, ?, ?, ?)",
+                             [(pid, horizon, float(r), now) for pid, r in outcomes])
+
+def load_outcomes(horizon, db_path=ORACLE_DB_FILE):
+    """Every evaluated prediction at this horizon as (prediction record, run sentiment_bias, fwd_return)."""
+    with connect(db_path) as conn:
+        rows = conn.execute("""SELECT p.record, r.sentiment_bias, o.fwd_return FROM prediction_outcomes o
+            JOIN predictions p ON p.id = o.prediction_id JOIN runs r ON r.run_id = p.run_id
+            WHERE o.horizon = ? ORDER BY p.date""", (horizon,)).fetchall()
+    return [(json.loads(r["record"]), r["sentiment_bias"], r["fwd_return"]) for r in rows]
+
+# --- Strategy books (paper portfolios evaluated side by side) ---
+
+def load_strategy_books(db_path=ORACLE_DB_FILE):
+    """{name: {"params": {...}, "cash": float, "holdings": {symbol: {"qty", "avg_price", "date_bought"}}}}."""
+    with connect(db_path) as conn:
+        books = {r["name"]: {"params": json.loads(r["params"]), "cash": r["cash"], "holdings": {}}
+                 for r in conn.execute("SELECT * FROM strategies ORDER BY name")}
+        for r in conn.execute("SELECT * FROM strategy_holdings"):
+            books[r["strategy"]]["holdings"][r["symbol"]] = {"qty": r["qty"], "avg_price": r["avg_price"], "date_bought": r["date_bought"]}
+    return books
+
+def save_strategy_books(books, new_trades, equity, date, db_path=ORACLE_DB_FILE):
+    """Commits one evaluation of every strategy atomically.
+
+    books as returned by load_strategy_books; new_trades carry a "strategy" key;
+    equity maps name to (cash, invested, total_value) as of date.
+    """
+    now = datetime.datetime.now().isoformat()
+    with connect(db_path) as conn:
+        with conn:
+            conn.executemany("""INSERT INTO strategies VALUES (?, ?, ?, ?, ?) ON CONFLICT(name) DO UPDATE SET
+                params = excluded.params, cash = excluded.cash, updated_at = excluded.updated_at""",
+                             [(n, json.dumps(b["params"], sort_keys=True), b["cash"], now, now) for n, b in books.items()])
+            conn.executemany("DELETE FROM strategy_holdings WHERE strategy = ?", [(n,) for n in books])
+            conn.executemany("INSERT INTO strategy_holdings VALUES (?, ?, ?, ?, ?)",
+                             [(n, s, h["qty"], h["avg_price"], h.get("date_bought")) for n, b in books.items() for s, h in b["holdings"].items()])
+            conn.executemany("INSERT INTO strategy_trades (strategy, date, type, symbol, qty, price, profit) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             [(t["strategy"], t["date"], t["type"], t["symbol"], t["qty"], t["price"], t.get("profit")) for t in new_trades])
+            conn.executemany("INSERT OR REPLACE INTO strategy_equity VALUES (?, ?, ?, ?, ?)",
+                             [(n, date, *v) for n, v in equity.items()])
+
+def reset_strategies(names=None, db_path=ORACLE_DB_FILE):
+    """Deletes the books, ledgers and equity history of the named strategies (all when names is None)."""
+    with connect(db_path) as conn:
+        with conn:
+            names = names or [r[0] for r in conn.execute("SELECT name FROM strategies")]
+            for table, col in (("strategy_equity", "strategy"), ("strategy_trades", "strategy"),
+                               ("strategy_holdings", "strategy"), ("strategies", "name")):
+                conn.executemany(f"DELETE FROM {table} WHERE {col} = ?", [(n,) for n in names])
+
+def load_strategy_equity(db_path=ORACLE_DB_FILE):
+    """Every strategy's equity snapshots, oldest first."""
+    with connect(db_path) as conn:
+        return [dict(r) for r in conn.execute("SELECT * FROM strategy_equity ORDER BY date, strategy")]
+
+def load_strategy_trade_stats(db_path=ORACLE_DB_FILE):
+    """{name: {"buys", "sells", "wins", "realized"}} over each strategy's whole ledger."""
+    with connect(db_path) as conn:
+        rows = conn.execute("""SELECT strategy, SUM(type = 'BUY') AS buys, SUM(type = 'SELL') AS sells,
+            SUM(profit > 0) AS wins, COALESCE(SUM(profit), 0) AS realized FROM strategy_trades GROUP BY strategy""").fetchall()
+    return {r["strategy"]: {k: r[k] for k in ("buys", "sells", "wins", "realized")} for r in rows}
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import argparse
+import datetime
+import numpy as np
+import scoring
+import storage
+from backtest import expand_grid
+
+# --- Configuration (Relative Paths) ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.environ.get("ORACLE_DATA_DIR") or os.path.join(BASE_DIR, "data")
+STRATEGIES_FILE = os.path.join(DATA_DIR, "strategies.json")   # Optional; replaces DEFAULT_STRATEGIES
+
+# The live paper trader's rules; every strategy overrides some of them.
+DEFAULT_PARAMS = {
+    "buy_score": scoring.BUY_SCORE, "sell_score": scoring.SELL_SCORE,
+    "high_priority_only": True,
+    "allocation": scoring.ALLOCATION, "min_allocation": scoring.MIN_ALLOCATION,
+    "stop_loss": scoring.STOP_LOSS, "take_profit": scoring.TAKE_PROFIT,
+    "starting_cash": scoring.STARTING_CASH,
+}
+
+# An entry with a "grid" expands to one strategy per combination, e.g.
+# {"name": "exits", "grid": {"stop_loss": [0.9, 0.95], "take_profit": [1.1, 1.2]}}
+DEFAULT_STRATEGIES = [
+    {"name": "live"},
+    {"name": "medium_priority", "high_priority_only": False},
+    {"name": "strict_entry", "buy_score": 70},
+    {"name": "small_bets", "allocation": 0.10, "min_allocation": 1000},
+    {"name": "exits", "grid": {"stop_loss": [0.90, 0.95, 0.97], "take_profit": [1.08, 1.15, 1.30]}},
+]
+
+def expand(entries):
+    """[(name, params)] with defaults filled in and grids expanded."""
+    out = []
+    for e in entries:
+        base = {k: v for k, v in e.items() if k not in ("name", "grid")}
+        if "grid" not in e:
+            out.append((e["name"], {**DEFAULT_PARAMS, **base}))
+            continue
+        for combo in expand_grid(e["grid"]):
+            label = ",".join(f"{k}={v}" for k, v in combo.items())
+            out.append((f"{e['name']}[{label}]", {**DEFAULT_PARAMS, **base, **combo}))
+    return out
+
+def load_strategies(path=STRATEGIES_FILE):
+    try:
+        with open(path, "r") as f:
+            return expand(json.load(f))
+    except FileNotFoundError:
+        return expand(DEFAULT_STRATEGIES)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[!] Ignoring unreadable strategies file {path}: {e}", file=sys.stderr)
+        return expand(DEFAULT_STRATEGIES)
+
+def step(params, cash, qty, avg, price, score, action=None, priority=None):
+    """One evaluation of S strategies over N symbols, in place.
+
+    params: {key: (S,) array}; cash (S,); qty, avg (S, N); price, score (N,),
+    NaN for symbols missing from the scan. action/priority (N,) are the scan's
+    own codes, used by strategies on the default thresholds so they match the
+    live trader exactly.
+
+    Exits and mark-to-market are whole-matrix operations. Entries walk the
+    buy candidates in scan order, as the live trader does (each buy spends a
+    share of the cash left), with every strategy handled at once per symbol.
+    Returns ((S, N) quantities sold, (S, N) realized profits, [(symbol index, (S,) quantities bought)],
+    (S,) holdings value).
+    """
+    buy_t, sell_t = params["buy_score"][:, None], params["sell_score"][:, None]
+    act = scoring.action_code(score[None, :], buy_t, sell_t)
+    prio = scoring.priority_code(score)[None, :]
+    if action is not None:
+        default = ((params["buy_score"] == scoring.BUY_SCORE) & (params["sell_score"] == scoring.SELL_SCORE))[:, None]
+        act = np.where(default, action[None, :], act)
+        prio = np.where(default, priority[None, :], prio)
+    valid = ~np.isnan(price)[None, :]
+
+    held = qty > 0
+    with np.errstate(invalid="ignore"):
+        exit_ = held & valid & ((act == -1) | (price < avg * params["stop_loss"][:, None]) | (price > avg * params["take_profit"][:, None]))
+    sold = np.where(exit_, qty, 0)
+    proceeds = sold * np.nan_to_num(price)
+    profits = proceeds - sold * avg
+    cash += proceeds.sum(axis=1)
+    qty[exit_] = 0
+    avg[exit_] = 0.0
+
+    want = valid & (act == 1) & (~params["high_priority_only"][:, None] | (prio == 2))
+    buys = []
+    for j in np.nonzero(want.any(axis=0))[0]:
+        alloc = cash * params["allocation"]
+        go = want[:, j] & (qty[:, j] == 0) & (alloc > params["min_allocation"])
+        q = np.where(go, np.floor(alloc / price[j]), 0).astype(np.int64)
+        go &= q > 0
+        if not go.any(): continue
+        cash -= q * price[j]
+        qty[go, j] = q[go]
+        avg[go, j] = price[j]
+        buys.append((j, np.where(go, q, 0)))
+
+    mark = np.where(valid, price, avg)
+    return sold, profits, buys, (qty * mark).sum(axis=1)
+
+def run(scan, strategies=None, db_path=storage.ORACLE_DB_FILE, now=None):
+    """Evaluates every strategy against one shared scan and commits their books. Returns the summaries."""
+    strategies = strategies or load_strategies()
+    now = (now or datetime.datetime.now()).isoformat()
+    books = storage.load_strategy_books(db_path)
+    names = [n for n, _ in strategies]
+    params = {n: p for n, p in strategies}
+
+    by_symbol = {x["symbol"]: x for x in scan}
+    held = sorted({s for n in names for s in books.get(n, {}).get("holdings", {})} - set(by_symbol))
+    symbols = list(by_symbol) + held
+    col = {s: j for j, s in enumerate(symbols)}
+    S, N = len(names), len(symbols)
+
+    price = np.full(N, np.nan)
+    score = np.full(N, np.nan)
+    price[:len(scan)] = [x["price"] for x in by_symbol.values()]
+    score[:len(scan)] = [x["score"] for x in by_symbol.values()]
+    action = np.zeros(N, dtype=np.int64)
+    priority = np.zeros(N, dtype=np.int64)
+    action[:len(scan)] = [{"BUY": 1, "SELL": -1}.get(x["action"], 0) for x in by_symbol.values()]
+    priority[:len(scan)] = [{"HIGH": 2, "MEDIUM": 1}.get(x["priority"], 0) for x in by_symbol.values()]
+
+    p = {k: np.array([params[n][k] for n in names], dtype=bool if k == "high_priority_only" else float) for k in DEFAULT_PARAMS}
+    cash = np.array([books[n]["cash"] if n in books else params[n]["starting_cash"] for n in names], dtype=float)
+    qty = np.zeros((S, N), dtype=np.int64)
+    avg = np.zeros((S, N))
+    bought = {}
+    for i, n in enumerate(names):
+        for s, h in books.get(n, {}).get("holdings", {}).items():
+            qty[i, col[s]], avg[i, col[s]] = h["qty"], h["avg_price"]
+            bought[(i, col[s])] = h.get("date_bought")
+
+    sold, profits, buys, invested = step(p, cash, qty, avg, price, score, action, priority)
+
+    trades = [{"strategy": names[i], "date": now, "type": "SELL", "symbol": symbols[j], "qty": int(sold[i, j]),
+               "price": float(price[j]), "profit": round(float(profits[i, j]), 2)} for i, j in zip(*np.nonzero(sold))]
+    for j, q in buys:
+        for i in np.nonzero(q)[0]:
+            bought[(i, j)] = now
+            trades.append({"strategy": names[i], "date": now, "type": "BUY", "symbol": symbols[j], "qty": int(q[i]), "price": float(price[j])})
+
+    out, equity = {}, {}
+    for i, n in enumerate(names):
+        cols = np.nonzero(qty[i])[0]
+        out[n] = {"params": params[n], "cash": round(float(cash[i]), 2),
+                  "holdings": {symbols[j]: {"qty": int(qty[i, j]), "avg_price": float(avg[i, j]), "date_bought": bought.get((i, j))} for j in cols}}
+        equity[n] = (out[n]["cash"], round(float(invested[i]), 2), round(float(cash[i] + invested[i]), 2))
+    storage.save_strategy_books(out, trades, equity, now, db_path)
+    return [{"strategy": n, "cash": equity[n][0], "invested": equity[n][1], "total_value": equity[n][2],
+             "return_pct": round((equity[n][2] / params[n]["starting_cash"] - 1) * 100, 2),
+             "positions": len(out[n]["holdings"]), "trades": sum(1 for t in trades if t["strategy"] == n)} for n in names]
+
+def compare(db_path=storage.ORACLE_DB_FILE):
+    """One row per strategy: value, return, drawdown over its equity history, ledger stats."""
+    books = storage.load_strategy_books(db_path)
+    stats = storage.load_strategy_trade_stats(db_path)
+    curves = {}
+    for r in storage.load_strategy_equity(db_path):
+        curves.setdefault(r["strategy"], []).append(r["total_value"])
+    rows = []
+    for n, b in books.items():
+        curve = np.asarray(curves.get(n) or [b["cash"]], dtype=float)
+        start = b["params"].get("starting_cash", scoring.STARTING_CASH)
+        peak = np.maximum.accumulate(np.concatenate([[start], curve]))[1:]
+        st = stats.get(n, {})
+        rows.append({"strategy": n, "total_value": round(float(curve[-1]), 2),
+                     "return_pct": round(float(curve[-1] / start - 1) * 100, 2),
+                     "max_drawdown_pct": round(float(((curve - peak) / peak).min()) * 100, 2),
+                     "positions": len(b["holdings"]), "buys": st.get("buys") or 0, "sells": st.get("sells") or 0,
+                     "hit_rate_pct": round(st["wins"] / st["sells"] * 100, 1) if st.get("sells") else None,
+                     "realized": round(st.get("realized") or 0, 2), "evaluations": len(curves.get(n, []))})
+    return sorted(rows, key=lambda r: -r["return_pct"])
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compare the paper-trading strategies evaluated on every sync.")
+    ap.add_argument("--reset", nargs="*", metavar="NAME", help="clear the named strategies' books (all if no name)")
+    args = ap.parse_args()
+    if args.reset is not None:
+        storage.reset_strategies(args.reset or None)
+    for r in compare():
+        print(f"{r['strategy']:<48} ₹{r['total_value']:>12,.2f} {r['return_pct']:>7.2f}%  dd {r['max_drawdown_pct']:>6.2f}%  "
+              f"{r['positions']:>3} open  {r['sells']:>4} closed  hit {r['hit_rate_pct'] if r['hit_rate_pct'] is not None else '-'}")
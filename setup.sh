@@ -21,10 +21,10 @@ if [ -f "requirements.txt" ]; then
     pip install -r requirements.txt
 else
     echo "[!] requirements.txt not found, installing manually..."
-    pip install pandas pandas_ta streamlit plotly yfinance duckduckgo_search matplotlib
+    pip install pandas numpy streamlit plotly yfinance duckduckgo_search matplotlib
 fi
 
 echo "[*] Creating data directories..."
-mkdir -p data/news_archive
+mkdir -p data
 
 echo "[*] Setup complete. Run ./run.sh to start the dashboard."
@@ -0,0 +1,82 @@
+import os
+import sys
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import data_client
+
+class _Stub(BaseHTTPRequestHandler):
+    """Answers 429 for the first `throttle` hits of a path, then 200 (after `delay` seconds)."""
+    throttle, delay, hits = {}, 0.0, {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            n = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if n <= self.throttle.get(self.path, 0):
+            self.send_response(429)
+            self.end_headers()
+            return
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        time.sleep(self.delay)
+        body = json.dumps({"path": self.path, "hit": n}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub():
+    _Stub.throttle, _Stub.delay, _Stub.hits = {}, 0.0, {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client():
+    return data_client.Client(limits={"stub": (1000.0, 1000)}, retries=3, sleep=lambda s: None)
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return json.loads(resp.read())
+
+def test_retries_throttled_requests_until_they_succeed(stub, client):
+    _Stub.throttle = {"/quote": 2}
+    assert client.call("stub", "quote", _get, stub + "/quote") == {"path": "/quote", "hit": 3}
+    assert _Stub.hits["/quote"] == 3
+
+def test_raises_throttled_once_retries_run_out(stub, client):
+    _Stub.throttle = {"/quote": 100}
+    with pytest.raises(data_client.Throttled):
+        client.call("stub", "quote", _get, stub + "/quote")
+    assert _Stub.hits["/quote"] == 4
+
+def test_does_not_retry_other_errors(stub, client):
+    with pytest.raises(urllib.error.HTTPError):
+        client.call("stub", "missing", _get, stub + "/missing")
+    assert _Stub.hits["/missing"] == 1
+
+def test_coalesces_concurrent_calls_for_the_same_key(stub, client):
+    _Stub.delay = 0.3
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.call("stub", "slow", _get, stub + "/slow")))
+               for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len(results) == 8 and all(r == results[0] for r in results)
+    assert _Stub.hits["/slow"] == 1
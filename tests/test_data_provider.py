@@ -0,0 +1,28 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import duckduckgo_search
+import data_client
+import data_provider
+
+class _FakeDDGS:
+    created = 0
+
+    def __init__(self):
+        type(self).created += 1
+
+    def news(self, query, max_results=10):
+        return [{"title": f"{query} {i}", "body": "b", "source": "s", "date": "2026-01-01", "url": f"u{i}"} for i in range(max_results)]
+
+def test_news_reuses_one_ddgs_session(monkeypatch):
+    monkeypatch.setattr(duckduckgo_search, "DDGS", _FakeDDGS)
+    provider = data_provider.LiveProvider(data_client.Client(limits={"ddg": (1000.0, 1000)}))
+    threads = [threading.Thread(target=provider.news, args=(f"q{i}", 2)) for i in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    items = provider.news("tcs", 3)
+    assert _FakeDDGS.created == 1
+    assert [a["title"] for a in items] == ["tcs 0", "tcs 1", "tcs 2"]
+    assert set(items[0]) == {"title", "snippet", "source", "date", "url"}
@@ -0,0 +1,40 @@
+import os
+import sys
+import json
+import datetime
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, "scripts")
+
+CHECK = """
+import json, datetime, market_calendar
+day = datetime.date(market_calendar.now_ist().year, 1, 26)
+print(json.dumps({"holidays": len(market_calendar.load_holidays()), "republic_day_open": market_calendar.is_trading_day(day) if day.weekday() < 5 else None}))
+"""
+
+def run(tmp_path):
+    env = dict(os.environ, ORACLE_DATA_DIR=str(tmp_path), ORACLE_DATA_MODE="replay",
+               ORACLE_FIXTURES=str(tmp_path / "fixtures"))
+    proc = subprocess.run([sys.executable, "-c", CHECK], cwd=SCRIPTS, env=env, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+def test_holidays_fetched_when_file_missing(tmp_path):
+    year = datetime.date.today().year
+    fixture = tmp_path / "fixtures" / "holidays" / "trading.json"
+    fixture.parent.mkdir(parents=True)
+    fixture.write_text(json.dumps({"CM": [{"tradingDate": f"26-Jan-{year}", "description": "Republic Day"},
+                                          {"tradingDate": f"15-Aug-{year}", "description": "Independence Day"}],
+                                   "FO": [{"tradingDate": f"02-Oct-{year}", "description": "Gandhi Jayanti"}]}))
+    out, err = run(tmp_path)
+    assert out["holidays"] == 2
+    assert out["republic_day_open"] in (False, None)
+    assert json.loads((tmp_path / "nse_holidays.json").read_text()) == [f"{year}-01-26", f"{year}-08-15"]
+    assert "[!]" not in err
+
+def test_missing_holidays_warn(tmp_path):
+    out, err = run(tmp_path)
+    assert out["holidays"] == 0
+    assert "[!] No NSE holidays" in err
+    assert not (tmp_path / "nse_holidays.json").exists()
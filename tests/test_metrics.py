@@ -0,0 +1,42 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, "scripts")
+
+# Run in a child process: the scripts read ORACLE_DATA_DIR / ORACLE_DATA_MODE at import time
+SCAN = """
+import json, sys, threading, cProfile
+import benchmark, data_provider, metrics
+metrics.PER_THREAD_PROFILERS = sys.argv[1] != "0"
+if sys.argv[1] == "busy":
+    # What Python 3.12+ does when a second profiler is enabled while one is active
+    class Profile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            if threading.current_thread() is not threading.main_thread():
+                raise ValueError("Another profiling tool is already active")
+            return super().enable(*args, **kwargs)
+    metrics.cProfile.Profile = Profile
+symbols = benchmark.synthetic_symbols(6)
+benchmark.write_synthetic(data_provider.FIXTURE_DIR, symbols)
+import market_scanner
+metrics.start_run("test", profile=True)
+results, errors = market_scanner.scan_tickers(symbols, 30.0, 70.0, 0, workers=3)
+summary = metrics.finish_run()
+print(json.dumps({"scored": len(results), "errors": errors, "profile": summary["profile"]}))
+"""
+
+@pytest.mark.parametrize("per_thread", ["1", "0", "busy"])
+def test_scan_tickers_with_profiling(tmp_path, per_thread):
+    env = dict(os.environ, ORACLE_DATA_DIR=str(tmp_path), ORACLE_DATA_MODE="replay",
+               ORACLE_FIXTURES=str(tmp_path / "fixtures"))
+    proc = subprocess.run([sys.executable, "-c", SCAN, per_thread], cwd=SCRIPTS, env=env,
+                          capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert out["errors"] == {}
+    assert out["scored"] == 6
+    assert out["profile"] and os.path.exists(out["profile"])
@@ -0,0 +1,24 @@
+import os
+import sys
+import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import news_archive
+
+def _utcnow():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+def test_seen_at_stored_as_utc(tmp_path):
+    local = datetime.datetime(2026, 3, 2, 10, 0, 0)
+    ist = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+    with news_archive.connect(str(tmp_path / "news.db"), str(tmp_path / "legacy")) as conn:
+        before = _utcnow().replace(microsecond=0)
+        news_archive.ingest(conn, {"markets": [{"url": "u1", "title": "undated"}]})
+        after = _utcnow()
+        news_archive.ingest(conn, {"markets": [{"url": "u2", "title": "local"}]}, local)
+        news_archive.ingest(conn, {"markets": [{"url": "u3", "title": "ist"}]}, datetime.datetime(2026, 3, 2, 15, 30, tzinfo=ist))
+        rows = {r["url"]: r for r in conn.execute("SELECT url, date, first_seen FROM articles")}
+    assert before <= datetime.datetime.fromisoformat(rows["u1"]["first_seen"]) <= after
+    assert rows["u1"]["date"] == rows["u1"]["first_seen"]
+    assert rows["u2"]["first_seen"] == local.astimezone(datetime.timezone.utc).replace(tzinfo=None).isoformat()
+    assert rows["u3"]["first_seen"] == "2026-03-02T10:00:00"
@@ -0,0 +1,37 @@
+import os
+import sys
+import json
+import fcntl
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, "scripts")
+
+SYNC = """
+import json
+import benchmark, data_provider
+symbols = benchmark.synthetic_symbols(4)
+benchmark.write_synthetic(data_provider.FIXTURE_DIR, symbols)
+import market_scanner
+market_scanner.save_json(symbols, market_scanner.WATCHLIST_FILE)
+print(json.dumps(len(market_scanner.run_pipeline(sync_news=False))))
+"""
+
+def test_run_pipeline_waits_for_another_process(tmp_path):
+    env = dict(os.environ, ORACLE_DATA_DIR=str(tmp_path), ORACLE_DATA_MODE="replay",
+               ORACLE_FIXTURES=str(tmp_path / "fixtures"))
+    with open(tmp_path / "pipeline.lock", "a") as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        proc = subprocess.Popen([sys.executable, "-c", SYNC], cwd=SCRIPTS, env=env,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            proc.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            pass
+        assert proc.poll() is None, proc.stderr.read()
+        assert not os.path.exists(tmp_path / "scan_results.json")
+        fcntl.flock(held, fcntl.LOCK_UN)
+    out, err = proc.communicate(timeout=300)
+    assert proc.returncode == 0, err
+    assert json.loads(out.strip().splitlines()[-1]) == 4
+    assert os.path.exists(tmp_path / "scan_results.json")
@@ -0,0 +1,20 @@
+import os
+import sys
+import socket
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import scanner_service
+
+def test_start_background_logs_a_failed_start(tmp_path, monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    monkeypatch.setattr(scanner_service, "SERVICE_PORT", port)
+    monkeypatch.setattr(scanner_service, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(scanner_service, "SERVICE_LOG_FILE", str(tmp_path / "scanner_service.log"))
+    monkeypatch.setattr(scanner_service, "STARTUP_WAIT", 2.0)
+    crash = tmp_path / "crash.sh"
+    crash.write_text("#!/bin/sh\necho starting\necho 'Traceback: boom' >&2\nexit 1\n")
+    crash.chmod(0o755)
+    assert scanner_service.start_background(str(crash)) is False
+    assert (tmp_path / "scanner_service.log").read_text() == "starting\nTraceback: boom\n"
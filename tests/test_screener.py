@@ -0,0 +1,35 @@
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, "scripts")
+
+# Child process: FUNDAMENTALS_DB_FILE follows ORACLE_DATA_DIR at import time
+SELECT = """
+import json, pandas as pd
+import fundamentals_cache, screener
+ranked = pd.DataFrame({"symbol": [f"S{i:04d}.NS" for i in range(2000)]})
+for i in range(0, 2000, 10):  # Every tenth symbol fully cached, the fifth one only for info
+    fundamentals_cache._write("info", f"S{i:04d}.NS", {}, fundamentals_cache.FUNDAMENTALS_DB_FILE)
+    fundamentals_cache._write("nse_meta", f"S{i:04d}", {}, fundamentals_cache.FUNDAMENTALS_DB_FILE)
+    fundamentals_cache._write("info", f"S{i + 5:04d}.NS", {}, fundamentals_cache.FUNDAMENTALS_DB_FILE)
+fundamentals_cache._memory.clear()
+connects = []
+connect = fundamentals_cache._connect
+fundamentals_cache._connect = lambda db_path: connects.append(db_path) or connect(db_path)
+chosen, spent = screener.select_candidates(ranked, top_n=8, budget=4, always=["HELD1.NS", "HELD2.NS", "HELD1.NS"])
+print(json.dumps({"chosen": chosen, "spent": spent, "connects": len(connects)}))
+"""
+
+def test_select_candidates_batches_cache_checks(tmp_path):
+    env = dict(os.environ, ORACLE_DATA_DIR=str(tmp_path), ORACLE_DATA_MODE="replay")
+    proc = subprocess.run([sys.executable, "-c", SELECT], cwd=SCRIPTS, env=env, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+    # Holdings cost 2 lookups each and exhaust the budget; only fully cached symbols fit after them
+    assert out["chosen"] == ["HELD1.NS", "HELD2.NS", "S0000.NS", "S0010.NS", "S0020.NS", "S0030.NS", "S0040.NS", "S0050.NS"]
+    assert out["spent"] == 4
+    # One query per field group for the first chunk; the scan stops once top_n is filled
+    assert out["connects"] == 2
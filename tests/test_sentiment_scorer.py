@@ -0,0 +1,31 @@
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, "scripts")
+
+# Child process: SENTIMENT_CACHE_FILE follows ORACLE_DATA_DIR at import time
+SCORE = """
+import json, sys, builtins, sentiment_scorer
+reads = []
+real_open = builtins.open
+def counting_open(path, mode="r", *args, **kwargs):
+    if str(path) == sentiment_scorer.SENTIMENT_CACHE_FILE and "r" in mode: reads.append(path)
+    return real_open(path, mode, *args, **kwargs)
+builtins.open = counting_open
+scores = [sentiment_scorer.score_articles([{"url": f"u{i}", "title": "profits surge", "snippet": "not a crash"}])[0] for i in range(20)]
+print(json.dumps({"scores": sorted(set(scores)), "reads": len(reads)}))
+"""
+
+def test_scores_cached_across_calls_and_flushed_at_exit(tmp_path):
+    env = dict(os.environ, ORACLE_DATA_DIR=str(tmp_path))
+    for run in range(2):
+        proc = subprocess.run([sys.executable, "-c", SCORE], cwd=SCRIPTS, env=env, capture_output=True, text=True, timeout=60)
+        assert proc.returncode == 0, proc.stderr
+        out = json.loads(proc.stdout.strip().splitlines()[-1])
+        assert out == {"scores": [3.0], "reads": 1}
+        cache = json.loads((tmp_path / "sentiment_cache.json").read_text())
+        assert len(cache["scores"]) == 20
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
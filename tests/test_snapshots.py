@@ -0,0 +1,25 @@
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, "scripts")
+
+WRITE = """
+import sys, snapshots
+first, root = int(sys.argv[1]), sys.argv[2]
+scan = [{"symbol": "TCS.NS", "price": 1.0, "action": "BUY", "priority": "HIGH", "score": 1.0}]
+for run_id in range(first, first + 25):
+    snapshots.write(scan, run_id, root=root)
+"""
+
+def test_concurrent_writers_keep_every_run(tmp_path):
+    root = str(tmp_path / "snapshots")
+    procs = [subprocess.Popen([sys.executable, "-c", WRITE, str(first), root], cwd=SCRIPTS, stderr=subprocess.PIPE, text=True)
+             for first in (1, 101, 201)]
+    for p in procs:
+        _, err = p.communicate(timeout=120)
+        assert p.returncode == 0, err
+    manifest = json.loads((tmp_path / "snapshots" / "manifest.json").read_text())
+    assert sorted(e["run_id"] for e in manifest) == [*range(1, 26), *range(101, 126), *range(201, 226)]